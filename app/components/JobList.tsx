@@ -43,6 +43,7 @@ interface JobMatch {
   top_strengths: string[];
   main_concerns: string[];
   recommendation: string;
+  scored_by?: 'llm' | 'embedding' | 'rules' | 'skill_coverage';
   candidate_name?: string;
   candidate_email?: string;
   candidate_experience?: number;
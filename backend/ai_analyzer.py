@@ -1,29 +1,675 @@
 import openai
+import httpx
+import asyncio
 import json
 import re
+import string
+import hashlib
+import heapq
+import sys
 from typing import Dict, List, Optional
 import logging
 from dotenv import load_dotenv
 import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from operator import itemgetter
+from concurrent.futures import Future, ThreadPoolExecutor
+import numpy as np
+try:
+    import tiktoken
+except ImportError:  # Token counts fall back to a character estimate
+    tiktoken = None
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:  # Falls back to HTTP/1.1 keep-alive
+    HTTP2_AVAILABLE = False
+from ai_cache import LRUCache, PersistentCache, SemanticCache, json_dumps, json_loads
+from candidate_pool import CandidatePool, candidate_years
+from skill_trie import SkillTrie
+from ai_schemas import (
+    RESUME_SCHEMA, EXTRACTION_SCHEMA, ASSESSMENT_SCHEMA, RESUME_BATCH_SCHEMA, JOB_REQ_SCHEMA,
+    CANDIDATE_MATCH_SCHEMA, JSON_OBJECT_FORMAT, json_schema_format
+)
 
 # Load environment variables
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Cached completions expire after 6 hours; only deterministic calls (temperature 0 or a strict schema) are cached
+CACHE_TTL_SECONDS = 6 * 3600
+CACHEABLE_TEMPERATURE = 0
+CHAT_CACHE_TTL_SECONDS = 24 * 3600
+EMBEDDING_MODEL = "text-embedding-3-small"
+# Extraction-style tasks: cheaper than gpt-3.5-turbo and supports strict structured outputs
+STRUCTURED_MODEL = "gpt-4o-mini"
+# Per-task model escalation: the cheap model answers first, the next one only when its JSON fails validation
+MODEL_ROUTES = {
+    "search": ("gpt-4o-mini", "gpt-4o"),
+    "job_improvements": ("gpt-4o-mini", "gpt-4o")
+}
+ROUTER_MIN_CONFIDENCE = 0.5
+# Model whose tokenizer prompt budgets are counted in (loaded on first use, see _token_encoding)
+TOKEN_ENCODING_MODEL = "gpt-3.5-turbo"
+
+# Precompiled patterns for the fallback extractor and JSON repair
+EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+PHONE_RE = re.compile(r'(\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+LINKEDIN_RE = re.compile(r'linkedin\.com/in/[\w-]+', re.IGNORECASE)
+# Two leading words of a line; [^\W\d_] is any Unicode letter, so "Éva Kovács" and "Łukasz Nowak" qualify too.
+# The stdlib re has no uppercase-letter class, so the capitalization check is done on the match (see NAME_SEARCH_LINES)
+NAME_RE = re.compile(r'[^\S\n]*([^\W\d_]\S*)[^\S\n]+([^\W\d_]\S*)')
+# The fallback name is the first of this many leading lines that starts with two capitalized words
+NAME_SEARCH_LINES = 5
+WHITESPACE_RE = re.compile(r"\s+")
+# Query canonicalization drops punctuation except the characters that are part of skill names (c++, c#, .net)
+QUERY_PUNCTUATION_RE = re.compile(r"[^\w\s+#.]+")
+# Numbers in a query ("5 years", "top 10"; not the 8 in "k8s") must match exactly before a paraphrase's cached result is reused
+QUERY_NUMBER_RE = re.compile(r"(?<![^\W\d_])\d+(?:\.\d+)?")
+
+def _keyword_pattern(keywords: List[str]) -> re.Pattern:
+    """Compile plain substrings into one alternation so a single scan finds any of them"""
+    return re.compile('|'.join(re.escape(keyword) for keyword in keywords))
+
+def _labelled_pattern(groups: Dict[str, List[str]]) -> re.Pattern:
+    """One alternation of named keyword groups; each match's lastgroup is the label it belongs to"""
+    return re.compile('|'.join(
+        f'(?P<{label}>' + '|'.join(re.escape(keyword) for keyword in keywords) + ')'
+        for label, keywords in groups.items()
+    ))
+
+def _term_pattern(terms, flags: int = 0) -> re.Pattern:
+    """One alternation of whole terms (longest first), so a single scan finds every term without partial-word hits"""
+    return re.compile(
+        r'(?<![\w+#.])(' + '|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True)) + r')(?![\w+#])',
+        flags
+    )
+
+@lru_cache(maxsize=1)
+def _token_encoding():
+    """
+    tiktoken encoding for prompt budgets, or None to use the character estimate. Loaded lazily and once:
+    tiktoken downloads its BPE file on first use, which must not stop the app from starting offline.
+    """
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(TOKEN_ENCODING_MODEL)
+    except Exception as e:
+        logger.warning(f"tiktoken encoding unavailable, estimating tokens from characters: {str(e)}")
+        return None
+
+@lru_cache(maxsize=256)
+def _target_skill_matcher(skills: tuple):
+    """
+    Whole-word pattern over a query's lowercased target skills, plus, for each skill, the set of
+    target skills it contains ("spring boot" also counts as "spring"), since one scan reports only the longest
+    """
+    pattern = _term_pattern(skills)
+    covers = {
+        skill: frozenset(other for other in skills if _term_pattern([other]).search(skill))
+        for skill in skills
+    }
+    return pattern, covers
+
+@lru_cache(maxsize=8192)
+def _is_meaningful_partial_match(target_skill: str, candidate_skill: str) -> bool:
+    """Check if there's a meaningful partial match between skills, avoiding false positives (memoized across queries)"""
+    # Check if this is a known false positive pair (java/javascript, c/c++, etc.)
+    if (target_skill, candidate_skill) in FALSE_POSITIVE_SKILL_PAIRS:
+        return False
+    
+    # Allow meaningful partial matches:
+    # 1. One skill contains the other and the shorter one is at least 3 characters
+    # 2. The match makes semantic sense (not just substring)
+    
+    shorter = target_skill if len(target_skill) <= len(candidate_skill) else candidate_skill
+    longer = candidate_skill if len(target_skill) <= len(candidate_skill) else target_skill
+    
+    # Must be at least 3 characters to avoid meaningless matches
+    if len(shorter) < 3:
+        return False
+    
+    # Check if shorter skill is contained in longer skill
+    if shorter in longer:
+        # Additional check: make sure it's a meaningful match
+        # For example, "python" in "python3" is good, but "c" in "react" is bad
+        
+        # If the shorter skill is at word boundary or the difference is small, it's likely meaningful
+        if longer.startswith(shorter) or longer.endswith(shorter):
+            return True
+        
+        # If the skills are very similar in length, it's likely meaningful
+        if len(longer) - len(shorter) <= PARTIAL_MATCH_MAX_LENGTH_GAP:
+            return True
+    
+    return False
+
+# Chat routing keywords (matched as substrings of the lowercased message)
+SIMPLE_QUERY_RE = _keyword_pattern([
+    'find', 'search', 'get', 'show me', 'list', 'display',
+    'looking for', 'need', 'want', 'hire'
+])
+TECH_QUERY_RE = _keyword_pattern([
+    'developer', 'engineer', 'programmer', 'analyst', 'designer',
+    'python', 'java', 'javascript', 'react', 'angular', 'vue',
+    'frontend', 'backend', 'fullstack', 'full stack', 'full-stack'
+])
+INTENT_QUERY_RE = _labelled_pattern({
+    "comparison": ['compare', 'comparison', 'vs', 'versus', 'best', 'top'],
+    "analysis": ['analyze', 'analysis', 'insights', 'trends', 'market']
+})
+RULE_BASED_INTENTS = {
+    "comparison": {
+        "query_type": "comparison",
+        "intent": "Compare candidates based on query",
+        "entities": {},
+        "action_required": "compare",
+        "confidence": 0.9
+    },
+    "analysis": {
+        "query_type": "analysis",
+        "intent": "Analyze market or candidate data",
+        "entities": {},
+        "action_required": "analyze",
+        "confidence": 0.9
+    }
+}
+MARKET_ANALYSIS_RE = _keyword_pattern(['analysis', 'analyze', 'market', 'trends', 'insights', 'statistics'])
+
+# Skill gazetteer for deterministic pre-extraction, keyed by the resume schema's skill categories.
+# Ambiguous short terms ("r", "go") are left to the model.
+SKILL_GAZETTEER = {
+    "programming_languages": [
+        "python", "java", "javascript", "typescript", "c++", "c#", "php", "ruby", "golang", "rust",
+        "swift", "kotlin", "scala", "matlab", "perl", "bash", "sql", "html", "css"
+    ],
+    "frameworks_libraries": [
+        "react", "angular", "vue", "node.js", "express", "django", "flask", "fastapi", "spring",
+        "spring boot", ".net", "rails", "laravel", "jquery", "bootstrap", "tensorflow", "pytorch",
+        "scikit-learn", "pandas", "numpy", "spark", "hadoop"
+    ],
+    "databases": [
+        "mysql", "postgresql", "mongodb", "redis", "sqlite", "oracle", "sql server",
+        "dynamodb", "cassandra", "elasticsearch", "neo4j"
+    ],
+    "cloud_platforms": [
+        "aws", "azure", "gcp", "google cloud", "heroku", "firebase"
+    ],
+    "tools_technologies": [
+        "docker", "kubernetes", "terraform", "ansible", "jenkins", "git", "github actions",
+        "gitlab ci", "jira", "linux", "kafka", "graphql", "webpack"
+    ],
+    "soft_skills": [
+        "leadership", "communication", "teamwork", "problem solving", "project management",
+        "agile", "scrum", "time management", "mentoring"
+    ]
+}
+SKILL_CATEGORY_BY_TERM = {
+    term: category for category, terms in SKILL_GAZETTEER.items() for term in terms
+}
+# Stable integer ID per gazetteer term, for vectorized skill coverage scoring
+SKILL_VOCAB = {term: index for index, term in enumerate(SKILL_CATEGORY_BY_TERM)}
+SKILL_TERMS = np.array(list(SKILL_VOCAB))
+# One alternation (longest terms first) finds every gazetteer skill in a single pass
+SKILL_RE = _term_pattern(SKILL_CATEGORY_BY_TERM, re.IGNORECASE)
+# Message keywords the rule-based chat path turns into a skills filter
+FILTER_SKILL_KEYWORDS = {
+    'python': 'Python', 'java': 'Java', 'javascript': 'JavaScript', 'js': 'JavaScript',
+    'typescript': 'TypeScript', 'react': 'React', 'angular': 'Angular', 'vue': 'Vue',
+    'node': 'Node.js', 'nodejs': 'Node.js', 'django': 'Django', 'flask': 'Flask',
+    'spring': 'Spring', 'sql': 'SQL', 'mysql': 'MySQL', 'postgresql': 'PostgreSQL',
+    'mongodb': 'MongoDB', 'aws': 'AWS', 'azure': 'Azure', 'docker': 'Docker'
+}
+FILTER_SKILL_RE = _term_pattern(FILTER_SKILL_KEYWORDS)
+# Candidate skill categories that count towards skill depth ranking
+SKILL_INDEX_GROUPS = (
+    "programming_languages", "frameworks_libraries", "technical_skills",
+    "databases", "cloud_platforms", "tools_technologies"
+)
+# Spelling variants of the same skill, mapped to one canonical lowercase name for exact skill matching
+SKILL_ALIASES = {
+    'js': 'javascript', 'ecmascript': 'javascript', 'ts': 'typescript',
+    'node': 'node.js', 'nodejs': 'node.js', 'node js': 'node.js',
+    'reactjs': 'react', 'react.js': 'react', 'vuejs': 'vue', 'vue.js': 'vue',
+    'angularjs': 'angular', 'angular.js': 'angular', 'expressjs': 'express', 'express.js': 'express',
+    'golang': 'go', 'cpp': 'c++', 'c sharp': 'c#', 'csharp': 'c#',
+    'postgres': 'postgresql', 'psql': 'postgresql', 'mongo': 'mongodb', 'ms sql': 'sql server', 'mssql': 'sql server',
+    'k8s': 'kubernetes', 'amazon web services': 'aws', 'google cloud platform': 'google cloud', 'gcp': 'google cloud',
+    'sklearn': 'scikit-learn', 'scikit learn': 'scikit-learn', 'springboot': 'spring boot',
+    'ml': 'machine learning', 'ai': 'artificial intelligence'
+}
+# Degree fields relevant to each skill for the education part of skill depth ranking
+EDUCATION_FIELDS_BY_SKILL = {
+    # Programming languages
+    'python': frozenset(['computer science', 'software engineering', 'data science', 'computer engineering']),
+    'java': frozenset(['computer science', 'software engineering', 'computer engineering']),
+    'javascript': frozenset(['computer science', 'software engineering', 'web development']),
+    'c++': frozenset(['computer science', 'computer engineering', 'software engineering']),
+    'c#': frozenset(['computer science', 'software engineering']),
+    'sql': frozenset(['computer science', 'database', 'information systems', 'data science']),
+    'r': frozenset(['statistics', 'data science', 'mathematics', 'analytics']),
+    # Frameworks
+    'react': frozenset(['computer science', 'software engineering', 'web development']),
+    'angular': frozenset(['computer science', 'software engineering', 'web development']),
+    'django': frozenset(['computer science', 'software engineering', 'web development']),
+    'spring': frozenset(['computer science', 'software engineering']),
+    # Databases
+    'mysql': frozenset(['computer science', 'database', 'information systems']),
+    'postgresql': frozenset(['computer science', 'database', 'information systems']),
+    'mongodb': frozenset(['computer science', 'database', 'information systems']),
+    # Cloud
+    'aws': frozenset(['computer science', 'cloud computing', 'information systems']),
+    'azure': frozenset(['computer science', 'cloud computing', 'information systems']),
+    'gcp': frozenset(['computer science', 'cloud computing', 'information systems']),
+}
+DEFAULT_EDUCATION_FIELDS = frozenset(['computer science', 'software engineering'])
+# Every known field name in one alternation (substring match, like the per-field "in" checks it replaces)
+EDUCATION_FIELD_RE = _keyword_pattern(sorted(
+    DEFAULT_EDUCATION_FIELDS.union(*EDUCATION_FIELDS_BY_SKILL.values()), key=len, reverse=True
+))
+# Role phrases mapped to the skills a role query should rank by (first role found in the query wins).
+# Skills are listed most important first, since inferred target skills are capped at MAX_INFERRED_TARGET_SKILLS.
+ROLE_SKILLS = {
+    # Frontend roles
+    'frontend': ('React', 'Angular', 'Vue', 'JavaScript', 'TypeScript', 'HTML', 'CSS'),
+    'front-end': ('React', 'Angular', 'Vue', 'JavaScript', 'TypeScript', 'HTML', 'CSS'),
+    'front end': ('React', 'Angular', 'Vue', 'JavaScript', 'TypeScript', 'HTML', 'CSS'),
+    'ui developer': ('React', 'Angular', 'Vue', 'JavaScript', 'TypeScript', 'HTML', 'CSS'),
+    'react developer': ('React', 'JavaScript', 'TypeScript', 'HTML', 'CSS'),
+    'angular developer': ('Angular', 'TypeScript', 'JavaScript', 'HTML', 'CSS'),
+    'vue developer': ('Vue', 'JavaScript', 'TypeScript', 'HTML', 'CSS'),
+
+    # Backend roles
+    'backend': ('Python', 'Java', 'Node.js', 'Express', 'Django', 'Flask', 'Spring'),
+    'back-end': ('Python', 'Java', 'Node.js', 'Express', 'Django', 'Flask', 'Spring'),
+    'back end': ('Python', 'Java', 'Node.js', 'Express', 'Django', 'Flask', 'Spring'),
+    'api developer': ('Python', 'Java', 'Node.js', 'Express', 'Django', 'Flask', 'Spring'),
+    'python developer': ('Python', 'Django', 'Flask', 'FastAPI'),
+    'java developer': ('Java', 'Spring', 'Spring Boot'),
+    'node developer': ('Node.js', 'Express', 'JavaScript', 'TypeScript'),
+
+    # Full stack roles
+    'fullstack': ('React', 'Angular', 'Vue', 'JavaScript', 'Python', 'Java', 'Node.js'),
+    'full-stack': ('React', 'Angular', 'Vue', 'JavaScript', 'Python', 'Java', 'Node.js'),
+    'full stack': ('React', 'Angular', 'Vue', 'JavaScript', 'Python', 'Java', 'Node.js'),
+
+    # Data roles
+    'data scientist': ('Python', 'R', 'SQL', 'Pandas', 'NumPy', 'Scikit-learn', 'TensorFlow'),
+    'data analyst': ('Python', 'R', 'SQL', 'Tableau', 'Power BI', 'Pandas'),
+    'machine learning': ('Python', 'R', 'TensorFlow', 'PyTorch', 'Scikit-learn'),
+    'ml engineer': ('Python', 'TensorFlow', 'PyTorch', 'Scikit-learn', 'Docker', 'Kubernetes'),
+
+    # Database roles
+    'database': ('SQL', 'MySQL', 'PostgreSQL', 'MongoDB', 'Redis'),
+    'dba': ('SQL', 'MySQL', 'PostgreSQL', 'Oracle'),
+    'database administrator': ('SQL', 'MySQL', 'PostgreSQL', 'Oracle'),
+
+    # DevOps roles
+    'devops': ('Docker', 'Kubernetes', 'AWS', 'Azure', 'Jenkins', 'Git'),
+    'cloud engineer': ('AWS', 'Azure', 'Google Cloud', 'Docker', 'Kubernetes'),
+    'sre': ('Docker', 'Kubernetes', 'AWS', 'Azure', 'Python', 'Go'),
+
+    # Mobile roles
+    'mobile developer': ('React Native', 'Flutter', 'Swift', 'Kotlin', 'Java'),
+    'ios developer': ('Swift', 'Objective-C', 'Xcode'),
+    'android developer': ('Kotlin', 'Java', 'Android Studio'),
+}
+ROLE_RE = _term_pattern(ROLE_SKILLS)
+MAX_INFERRED_TARGET_SKILLS = 5
+# Skill pairs that look like partial matches but aren't (both directions listed)
+FALSE_POSITIVE_SKILL_PAIRS = frozenset({
+    ('java', 'javascript'), ('javascript', 'java'),
+    ('c', 'c++'), ('c++', 'c'),
+    ('c', 'c#'), ('c#', 'c'),
+    ('sql', 'nosql'), ('nosql', 'sql'),
+    ('react', 'react native'), ('react native', 'react'),  # These are actually related, so we allow this
+})
+# A skill contained mid-word in another only counts as a partial match within this many extra characters
+PARTIAL_MATCH_MAX_LENGTH_GAP = 3
+# Technology names looked for in a query when it names no role
+QUERY_SKILLS = {
+    # Programming languages
+    'python': 'Python', 'java': 'Java', 'javascript': 'JavaScript', 'typescript': 'TypeScript', 
+    'c++': 'C++', 'c#': 'C#', 'php': 'PHP', 'ruby': 'Ruby', 'go': 'Go', 'rust': 'Rust',
+    # Frontend frameworks
+    'react': 'React', 'angular': 'Angular', 'vue': 'Vue', 'svelte': 'Svelte',
+    # Backend frameworks
+    'django': 'Django', 'flask': 'Flask', 'spring': 'Spring', 'express': 'Express', 'laravel': 'Laravel',
+    # Databases
+    'mysql': 'MySQL', 'postgresql': 'PostgreSQL', 'mongodb': 'MongoDB', 'redis': 'Redis', 
+    'sql': 'SQL', 'nosql': 'NoSQL',
+    # Cloud platforms
+    'aws': 'AWS', 'azure': 'Azure', 'gcp': 'Google Cloud', 'docker': 'Docker', 'kubernetes': 'Kubernetes',
+    # Data science
+    'machine learning': 'Machine Learning', 'ml': 'Machine Learning', 'ai': 'Artificial Intelligence',
+    'data science': 'Data Science', 'pandas': 'Pandas', 'numpy': 'NumPy',
+    # Common spellings and short forms (matching is whole-word, so each needs its own key)
+    'golang': 'Go', 'reactjs': 'React', 'react.js': 'React', 'vuejs': 'Vue', 'vue.js': 'Vue',
+    'angularjs': 'Angular', 'expressjs': 'Express', 'express.js': 'Express',
+    'node': 'Node.js', 'nodejs': 'Node.js', 'node.js': 'Node.js',
+    'postgres': 'PostgreSQL', 'mongo': 'MongoDB', 'k8s': 'Kubernetes'
+}
+QUERY_SKILL_RE = _term_pattern(QUERY_SKILLS)
+# The 21 job analysis sub-fields whose presence makes up ai_confidence
+JOB_CONFIDENCE_FIELDS = (
+    [("required_skills", category) for category in SKILL_GAZETTEER]
+    + [("experience_requirements", field) for field in ("minimum_years", "preferred_years", "level", "specific_experience")]
+    + [("education_requirements", field) for field in ("minimum_degree", "preferred_degree", "required_fields", "certifications")]
+    + [("job_analysis", field) for field in ("department", "job_type", "seniority_level", "key_responsibilities",
+                                             "growth_opportunities", "team_size", "reporting_structure")]
+)
+# query_type is the first field of the intent JSON, so it can be read off the stream before the rest arrives
+QUERY_TYPE_RE = re.compile(r'"query_type"\s*:\s*"(\w+)"')
+YEARS_RE = re.compile(r'(\d+)\+?\s*years?')
+YEARS_EXPERIENCE_RE = re.compile(r'(\d+)\+?\s*years?\s*(?:of\s*)?experience')
+# Market analysis experience buckets: upper edges (inclusive) and their labels, the last bucket is open-ended
+EXPERIENCE_BUCKET_EDGES = np.array([2, 5, 10], dtype=np.float32)
+EXPERIENCE_BUCKET_LABELS = ("0-2 years", "3-5 years", "6-10 years", "10+ years")
+# COST OPTIMIZATION: Pools smaller than this get a locally composed market analysis, no LLM call
+MARKET_ANALYSIS_MIN_CANDIDATES = 5
+# Rule-based comparison: score <= 50 is a pass, up to 70 an interview, above 70 a hire
+RECOMMENDATION_EDGES = np.array([50, 70], dtype=np.float32)
+RECOMMENDATION_LABELS = np.array(["pass", "interview", "hire"])
+
+# Bulk analysis packs several resumes into one request while staying under these limits
+RESUME_BATCH_INPUT_TOKENS = 10000
+RESUME_BATCH_MAX_SIZE = 4  # ~800 output tokens per resume must fit the completion window
+# Input budgets are in tokens (what we are billed for), not characters
+RESUME_TOKEN_LIMIT = 600  # Contact details and skill lists are pre-extracted, so less raw text is needed
+JOB_DESCRIPTION_TOKEN_LIMIT = 500
+HISTORY_MESSAGE_TOKEN_LIMIT = 30  # Per prior chat message in the intent prompt (last 2 messages only)
+SKILL_CONTEXT_TOKEN_LIMIT = 400
+# Skill-depth analyses come back well under 250 tokens; a reply cut off at the cap is retried once with double
+SKILL_DEPTH_MAX_TOKENS = 280
+# Skill-depth context: (prompt key, parsed_data field, default) by priority; the last ones are dropped first to fit the limit
+SKILL_CONTEXT_FIELDS = (
+    ("candidate_skills", "skills", {}),
+    ("work_experience", "experience", {}),
+    ("projects", "projects", []),
+    ("certifications", "certifications", []),
+    ("education", "education", {})
+)
+# Batch API job matching: candidates per request; results are collected once the batch reaches a terminal status
+BULK_MATCH_SHARD_SIZE = 5
+BATCH_TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+# One pooled, keep-alive HTTP transport per client; sized for the concurrent match/analysis fan-out
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+# Concurrent requests allowed by analyze_many (keeps bulk uploads under the rate limit)
+ASYNC_MAX_CONCURRENCY = 10
+# Interactive job matching scores each candidate with its own short completion, this many at a time
+BULK_MATCH_MAX_CONCURRENCY = 20
+BULK_MATCH_TOKENS_PER_CANDIDATE = 128
+# Per-skill AI depth analyses for one candidate run concurrently, this many at a time
+SKILL_DEPTH_MAX_CONCURRENCY = 8
+# Only this many candidates (most similar skill embeddings to the job) get an LLM call; the rest are scored from similarity
+BULK_MATCH_LLM_TOP_K = 5
+# Candidates listing less than this share (0-100) of the job's required skills get the deterministic match, no LLM call
+BULK_MATCH_MIN_SKILL_COVERAGE = 20
+# How each bulk match was scored ("scored_by"), in ranking order: scores are only comparable within a tier,
+# so model-reviewed matches always rank ahead of similarity, rule-based and low-coverage ones
+BULK_MATCH_SCORER_TIERS = ("llm", "embedding", "rules", "skill_coverage")
+# Optional LLMLingua-2 compression of resume text (AI_PROMPT_COMPRESSION=1); needs the llmlingua package
+COMPRESSION_MODEL = "microsoft/llmlingua-2-xlm-roberta-large-meetingbank"
+COMPRESSION_RATE = 0.5
+
+# PROMPT CACHING: Static instructions go first and verbatim so OpenAI can reuse the cached
+# prefix (system prompt + response schema) across calls; per-resume text always comes last
+RESUME_ANALYSIS_SYSTEM_PROMPT = """You are an expert HR analyst. Provide comprehensive but concise analysis in valid JSON format only.
+
+Analyze resumes and provide ALL of the following in ONE response:
+1. STRUCTURED DATA EXTRACTION
+2. FRAUD DETECTION ANALYSIS
+3. CANDIDATE INSIGHTS
+4. INTERVIEW QUESTIONS (max 15 questions)
+
+IMPORTANT FRAUD DETECTION FOCUS:
+- Look for ATS gaming techniques like white font manipulation, keyword stuffing, hidden text
+- Check for unrealistic skill claims vs experience level
+- Identify suspicious formatting patterns, excessive repetition
+- Flag invisible characters, tiny fonts, or text positioning anomalies
+- Assess overall authenticity and coherence of the resume
+
+Be thorough in fraud detection. Look for patterns that indicate ATS manipulation or resume fraud.
+If you detect potential fraud, lower the authenticity_score significantly and set appropriate red_flags_count.
+
+Fields under "Pre-extracted" were found deterministically in the resume: copy them as-is and
+only fill in the fields that are missing."""
+
+# Static instructions, schema and examples come first and per-call data goes last in the user
+# message, so repeated calls share an identical prompt prefix for the provider's prompt cache.
+SEARCH_QUERY_SYSTEM_PROMPT = """You are an expert search query interpreter for recruitment systems.
+Analyze the natural language search query for candidate search and extract relevant filters.
+
+Extract filters in JSON format:
+{
+    "extracted_filters": {
+        "min_experience": "number or null",
+        "max_experience": "number or null",
+        "required_skills": ["list of skills mentioned"],
+        "programming_languages": ["list of programming languages"],
+        "frameworks": ["list of frameworks/libraries"],
+        "job_titles": ["list of job titles or roles"],
+        "education_level": "string or null",
+        "location": "string or null",
+        "salary_range": "string or null"
+    },
+    "search_intent": "string describing what the user is looking for",
+    "confidence": "number 0-1 indicating confidence in interpretation",
+    "suggested_refinements": ["list of suggestions to refine the search"]
+}
+
+Examples:
+- "Find Python developers with 3+ years" → min_experience: 3, programming_languages: ["Python"]
+- "Senior React engineers in NYC" → required_skills: ["React"], job_titles: ["Senior Engineer"], location: "NYC"
+- "Full stack developers with Django experience" → required_skills: ["Django"], job_titles: ["Full Stack Developer"]"""
+
+CONVERSATIONAL_INTENT_SYSTEM_PROMPT = """You are an expert at understanding recruitment conversations and search intents.
+Analyze the conversational query about candidate search and determine the intent and type.
+
+Determine the query type and extract relevant information. Return JSON:
+{
+    "query_type": "search|comparison|analysis|recommendation|general",
+    "intent": "detailed description of what user wants",
+    "entities": {
+        "skills": ["list of skills mentioned"],
+        "experience_level": "junior|mid|senior|executive",
+        "locations": ["list of locations"],
+        "comparison_criteria": "skills|experience|education|overall",
+        "candidate_count": "number of candidates to find/compare"
+    },
+    "action_required": "search|compare|analyze|recommend|explain",
+    "confidence": 0.95
+}
+
+Query Type Examples:
+- "Find Python developers" → search
+- "Compare these two candidates" → comparison
+- "What makes a good React developer?" → analysis
+- "Who should I hire for this role?" → recommendation
+- "Tell me about candidate skills" → general"""
+
+# Recruiter task prompts: a short shared preamble plus only that task's instructions and output format
+RECRUITER_PREAMBLE = "You are an expert technical recruiter. Return valid JSON only. Be concise, specific and evidence-based."
+# Job match prompts use short keys (documented once here) to keep per-candidate input small
+BULK_MATCH_SYSTEM_PROMPT = RECRUITER_PREAMBLE + """
+Rate each candidate 0-100 for the job.
+Input keys - job: t=title, k=required skills, y=minimum years. Candidate: i=id, n=name, s=skills, y=years of experience, r=profile score,
+v=skill similarity to the job (0-1, when given).
+Return a JSON object whose "m" array has one object per candidate:
+{"m":[{"i":"id","n":"Full Name","c":75,"a":"Brief fit summary","st":["strength1","strength2"],"mc":["concern1"],"rec":"good_fit"}]}
+Output keys: i=candidate id, n=candidate name (copy from input), c=compatibility score, a=quick assessment,
+st=top strengths, mc=main concerns, rec=recommendation (excellent_fit, good_fit, potential_fit or poor_fit)."""
+COMPARE_SYSTEM_PROMPT = RECRUITER_PREAMBLE + """
+Compare the candidates for hiring, focusing on the given criteria.
+Return JSON:
+{
+    "summary": "Brief comparison and recommendation",
+    "ranking": [
+        {
+            "rank": 1,
+            "candidate_name": "name",
+            "candidate_id": "id",
+            "overall_score": 85,
+            "strengths": ["strength1", "strength2"],
+            "recommendation": "hire"
+        }
+    ],
+    "key_insights": ["insight1", "insight2"],
+    "hiring_recommendation": {
+        "top_choice": "candidate_name",
+        "reasoning": "brief explanation"
+    }
+}"""
+SKILL_DEPTH_SYSTEM_PROMPT = RECRUITER_PREAMBLE + """
+Analyze the candidate's depth of experience with the target skill. Consider:
+1. How extensively they've used this skill in work/projects
+2. The complexity and scale of their projects with this skill
+3. Their progression and growth with this skill
+4. Relevant certifications or formal training
+5. Whether their education supports this skill
+Return JSON analysis:
+{
+    "skill_depth_score": 85,
+    "confidence": 0.9,
+    "analysis": {
+        "skill_presence": "found|not_found",
+        "experience_depth": "beginner|intermediate|advanced|expert",
+        "professional_usage": "none|limited|moderate|extensive",
+        "project_complexity": "simple|moderate|complex|enterprise",
+        "learning_progression": "static|growing|advanced",
+        "formal_training": "none|some|certified|expert"
+    },
+    "evidence": {
+        "work_projects": ["list of relevant work experience"],
+        "personal_projects": ["list of relevant personal projects"],
+        "certifications": ["relevant certifications"],
+        "education_relevance": "how education supports this skill"
+    },
+    "reasoning": "detailed explanation of the score"
+}"""
+MARKET_ANALYSIS_SYSTEM_PROMPT = RECRUITER_PREAMBLE + """
+Act as a tech talent market analyst. Analyze the candidate market data for the query.
+Return JSON:
+{
+    "analysis": "comprehensive market analysis text",
+    "insights": ["key insight 1", "key insight 2"],
+    "recommendations": ["recommendation 1", "recommendation 2"],
+    "market_trends": ["trend 1", "trend 2"]
+}"""
+BULK_MATCH_KEYS = {
+    "i": "candidate_id",
+    "n": "candidate_name",
+    "c": "compatibility_score",
+    "a": "quick_assessment",
+    "st": "top_strengths",
+    "mc": "main_concerns",
+    "rec": "recommendation"
+}
+
+JOB_IMPROVEMENT_SYSTEM_PROMPT = """You are an expert talent acquisition specialist with deep knowledge of effective job posting strategies.
+Analyze the job description and suggest improvements to make it more attractive and effective for recruiting.
+
+Provide suggestions in JSON format:
+{
+    "overall_assessment": "string assessment of current job description",
+    "improvements": {
+        "clarity": ["suggestions for clearer requirements"],
+        "attractiveness": ["suggestions to make role more appealing"],
+        "inclusivity": ["suggestions for more inclusive language"],
+        "competitiveness": ["suggestions based on market standards"]
+    },
+    "missing_elements": ["list of important elements that should be added"],
+    "red_flags": ["list of potential issues that might deter candidates"],
+    "suggested_rewrite": {
+        "title": "improved job title",
+        "summary": "improved job summary",
+        "key_improvements": ["list of main changes made"]
+    },
+    "target_candidate_profile": "description of ideal candidate this job would attract"
+}"""
+
+# Per-call user messages: compiled once, only the placeholders are filled in at request time
+SEARCH_QUERY_TEMPLATE = string.Template('Search Query: "$query"')
+CONVERSATIONAL_INTENT_TEMPLATE = string.Template('Conversation Context:\n$context\n\nCurrent Message: "$message"')
+JOB_IMPROVEMENT_TEMPLATE = string.Template('Job Description:\n$job_description\n\nMarket Analysis (if available):\n$market_analysis')
+BULK_MATCH_TEMPLATE = string.Template('Job: $job\nCandidates: $candidates')
+# Target skill last: a candidate's prompts for different skills share everything up to it
+SKILL_DEPTH_TEMPLATE = string.Template('Candidate Data:\n$candidate_data\n\nTarget skill: $target_skill')
+MARKET_ANALYSIS_TEMPLATE = string.Template('Query: "$query"\nMarket Data: $market_data')
+
 class AIAnalyzer:
     def __init__(self):
+        # Long-lived HTTP/2 (when h2 is installed) connection pool shared by every sync call
+        self._http = httpx.Client(http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
         self.client = openai.OpenAI(
-            api_key=os.getenv('OPENAI_KEY')
+            api_key=os.getenv('OPENAI_KEY'),
+            http_client=self._http
         )
-        # Cache for consolidated analysis to avoid repeated calls
-        self._analysis_cache = {}
-        # NEW: Cache for query intent analysis to avoid repeated AI calls
-        self._intent_cache = {}
-        # NEW: Cache for search responses to avoid repeated AI calls
-        self._response_cache = {}
+        # Cache for consolidated analysis to avoid repeated calls (persisted, shared across workers)
+        cache_path = os.getenv('AI_CACHE_PATH', 'ai_cache.db')
+        self._analysis_cache = PersistentCache(cache_path, "analysis_cache")
+        self._job_analysis_cache = PersistentCache(cache_path, "job_analysis_cache")
+        # Near-duplicate re-uploads of the same candidate (e.g. one edited line) reuse its earlier analysis; set above 1
+        # to disable. Only resumes sharing an email are compared, so other candidates' details are never reused
+        self._resume_embeddings = SemanticCache(cache_path, "resume_embeddings")
+        self._resume_identities = PersistentCache(cache_path, "resume_identity_cache")  # email -> latest analysis key
+        self._semantic_threshold = float(os.getenv('AI_SEMANTIC_CACHE_THRESHOLD', '0.97'))
+        # Stable per-deployment id: sent as `user` and used to route requests to the same prompt cache
+        self._tenant_id = os.getenv('AI_TENANT_ID', 'resume-sorting')
+        # Sync entry points run their async work on one long-lived event loop thread, so the async client
+        # (and its keep-alive connection pool) is created once and reused across requests (see _run_async)
+        self._loop = None
+        self._loop_thread = None
+        self._loop_lock = threading.Lock()
+        self.aclient = None
+        self._aclient_loop = None
+        self._compressor = self._load_compressor() if os.getenv('AI_PROMPT_COMPRESSION') == '1' else None
+        # NEW: Cache for query intent analysis to avoid repeated AI calls: a bounded per-process LRU
+        # over a SQLite table shared by every worker on the host (survives restarts)
+        self._intent_cache = LRUCache(maxsize=int(os.getenv('AI_INTENT_CACHE_MAX', '4096')))
+        self._intent_store = PersistentCache(cache_path, "intent_cache", size_limit=512 * 1024 ** 2)
+        # Exact-match chat completion cache: in-process LRU (L1) in front of SQLite (L2)
+        self._response_cache = LRUCache(maxsize=int(os.getenv('AI_CACHE_MAX', '5000')))
+        self._chat_cache = PersistentCache(cache_path, "chat_response_cache")
+        # Paraphrased recruiter queries reuse earlier interpretations; set above 1 to disable
+        self._query_indexes = {
+            "search_query": SemanticCache(cache_path, "search_query_embeddings"),
+            "intent": SemanticCache(cache_path, "intent_embeddings"),
+            "skill_depth": SemanticCache(cache_path, "skill_depth_embeddings")
+        }
+        self._query_results = PersistentCache(cache_path, "query_result_cache")
+        self._query_semantic_threshold = float(os.getenv('AI_QUERY_SEMANTIC_THRESHOLD', '0.92'))
+        # Skill-depth prompts that miss the exact chat cache reuse the analysis of a near-identical one
+        self._skill_semantic_threshold = float(os.getenv('AI_SKILL_SEMANTIC_THRESHOLD', '0.95'))
+        # COST OPTIMIZATION: Skill-depth analyses are small JSON answers; a mini model is faster and cheaper
+        self.skill_depth_model = os.getenv('SKILL_DEPTH_MODEL', 'gpt-4o-mini')
+        # COST OPTIMIZATION: AI skill analysis only runs for borderline candidates, whose skill depth score
+        # per target skill falls between these cuts (tune to trade AI spend for recall/precision)
+        self.skill_ai_low_cut = float(os.getenv('AI_SKILL_LOW_CUT', '15'))
+        self.skill_ai_high_cut = float(os.getenv('AI_SKILL_HIGH_CUT', '90'))
+        # Runs handler work (e.g. search query analysis) while the intent response is still streaming
+        self._prefetch_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ai-prefetch")
         # COST OPTIMIZATION: Cache for job matches to avoid repeated expensive calls
-        self._job_match_cache = {}
+        self._job_match_cache = PersistentCache(cache_path, "job_match_cache")
+        # Search results keyed by (canonical query, candidate pool version), so any resume write invalidates them
+        self._search_results = LRUCache(maxsize=int(os.getenv('AI_SEARCH_CACHE_MAX', '1024')))
+        # (pool version, CandidatePool of every stored resume): its skill columns are the skill -> candidates index,
+        # built once and reused by comparison/analysis turns until a resume is written
+        self._full_pool = None
+        # COST OPTIMIZATION: Market analyses keyed by (canonical query, market data sent in the prompt)
+        self._market_analyses = LRUCache(maxsize=int(os.getenv('AI_MARKET_CACHE_MAX', '128')))
+        # Per-candidate skill indexes by candidate id, valid for one candidate pool version (cleared when it changes)
+        self._skill_indexes = LRUCache(maxsize=int(os.getenv('AI_SKILL_INDEX_CACHE_MAX', '10000')))
+        self._skill_indexes_version = None
+        # Skill-bag embeddings for the job match prefilter, keyed by candidate id + skill-bag hash
+        self._candidate_embeddings = LRUCache(maxsize=int(os.getenv('AI_EMBEDDING_CACHE_MAX', '5000')))
         # COST MONITORING: Track AI usage for cost awareness
         self._ai_calls_count = 0
         self._tokens_used = 0
@@ -46,54 +692,85 @@ class AIAnalyzer:
             "cache_hit_ratio": f"{len(self._analysis_cache)}/{self._ai_calls_count}" if self._ai_calls_count > 0 else "0/0"
         }
     
+    def _cache_key(self, text: str) -> str:
+        """Stable content hash of the whitespace-normalized resume text"""
+        normalized_text = WHITESPACE_RE.sub(" ", text or "").strip().lower()
+        return hashlib.blake2b(normalized_text.encode("utf-8"), digest_size=16).hexdigest()
+    
+    def _canonical_query(self, query: str) -> str:
+        """Lowercased query with stray punctuation removed, so "Find Python devs!" and "find python devs" match"""
+        return WHITESPACE_RE.sub(" ", QUERY_PUNCTUATION_RE.sub(" ", (query or "").lower())).strip(" .")
+    
+    def _count_tokens(self, text: str) -> int:
+        """Token count used for prompt budgeting"""
+        encoding = _token_encoding()
+        if encoding is not None:
+            return len(encoding.encode(text))
+        return len(text) // 4  # Rough estimate when tiktoken is unavailable
+    
+    def _load_compressor(self):
+        """Load the LLMLingua-2 prompt compressor, or None if it is unavailable"""
+        try:
+            from llmlingua import PromptCompressor
+            return PromptCompressor(COMPRESSION_MODEL, use_llmlingua2=True)
+        except Exception as e:
+            logger.warning(f"Prompt compression disabled: {str(e)}")
+            return None
+    
+    def _prepare_resume_text(self, text: str) -> str:
+        """Compress (when enabled) and cut resume text to the prompt token budget"""
+        if self._compressor is not None:
+            try:
+                text = self._compressor.compress_prompt(
+                    text, rate=COMPRESSION_RATE, force_tokens=["\n", ":"]
+                )["compressed_prompt"]
+            except Exception as e:
+                logger.warning(f"Prompt compression failed, sending truncated text: {str(e)}")
+        return self._truncate_to_tokens(text, RESUME_TOKEN_LIMIT)
+    
+    def _truncate_to_tokens(self, text: str, max_tokens: int) -> str:
+        """Cut text to at most max_tokens prompt tokens"""
+        encoding = _token_encoding()
+        if encoding is None:
+            return text[:max_tokens * 4]
+        tokens = encoding.encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        return encoding.decode(tokens[:max_tokens])
+    
+    def _embed_text(self, text: str) -> Optional[List[float]]:
+        """Embed text with the cheap embedding model; None when embeddings are unavailable"""
+        try:
+            response = self.client.embeddings.create(model=EMBEDDING_MODEL, input=text[:8000])
+            return response.data[0].embedding
+        except Exception as e:
+            logger.warning(f"Embedding request failed: {str(e)}")
+            return None
+    
+    def _store_cached(self, cache: PersistentCache, key: str, value, temperature: float):
+        """Cache a completion result only when it was sampled deterministically"""
+        if temperature <= CACHEABLE_TEMPERATURE:
+            cache.set(key, value, expire=CACHE_TTL_SECONDS)
+    
     # NEW: Helper methods for token optimization
     def _is_simple_search_query(self, user_message: str) -> bool:
         """Detect if this is a simple search that doesn't need AI analysis"""
-        simple_patterns = [
-            'find', 'search', 'get', 'show me', 'list', 'display',
-            'looking for', 'need', 'want', 'hire'
-        ]
-        
-        tech_patterns = [
-            'developer', 'engineer', 'programmer', 'analyst', 'designer',
-            'python', 'java', 'javascript', 'react', 'angular', 'vue',
-            'frontend', 'backend', 'fullstack', 'full stack', 'full-stack'
-        ]
-        
         message_lower = user_message.lower()
         
-        # If it contains simple search words AND tech terms, it's a simple search
-        has_simple_pattern = any(pattern in message_lower for pattern in simple_patterns)
-        has_tech_pattern = any(pattern in message_lower for pattern in tech_patterns)
-        
-        # Also check if it's a straightforward request (short and direct)
-        is_short_direct = len(user_message.split()) <= 8
+        # It needs simple search words...
+        if SIMPLE_QUERY_RE.search(message_lower) is None:
+            return False
         
-        return has_simple_pattern and (has_tech_pattern or is_short_direct)
+        # ...and either be a straightforward request (short and direct) or mention tech terms
+        return len(user_message.split()) <= 8 or TECH_QUERY_RE.search(message_lower) is not None
     
     def _rule_based_intent_detection(self, user_message: str) -> Dict:
         """Fast rule-based intent detection for simple queries - no AI needed"""
-        message_lower = user_message.lower()
-        
-        # Detect comparison queries
-        if any(word in message_lower for word in ['compare', 'comparison', 'vs', 'versus', 'best', 'top']):
-            return {
-                "query_type": "comparison",
-                "intent": "Compare candidates based on query",
-                "entities": {},
-                "action_required": "compare",
-                "confidence": 0.9
-            }
-        
-        # Detect analysis queries
-        if any(word in message_lower for word in ['analyze', 'analysis', 'insights', 'trends', 'market']):
-            return {
-                "query_type": "analysis", 
-                "intent": "Analyze market or candidate data",
-                "entities": {},
-                "action_required": "analyze",
-                "confidence": 0.9
-            }
+        # One scan labels every keyword hit; comparison wins over analysis
+        labels = {match.lastgroup for match in INTENT_QUERY_RE.finditer(user_message.lower())}
+        for label in ("comparison", "analysis"):
+            if label in labels:
+                return {**RULE_BASED_INTENTS[label], "entities": {}}
         
         # Default to search for most queries
         return {
@@ -107,280 +784,576 @@ class AIAnalyzer:
     def _should_skip_market_analysis(self, user_message: str) -> bool:
         """Determine if we can skip expensive market analysis"""
         # Only do market analysis if explicitly requested
-        analysis_keywords = ['analysis', 'analyze', 'market', 'trends', 'insights', 'statistics']
-        return not any(keyword in user_message.lower() for keyword in analysis_keywords)
+        return MARKET_ANALYSIS_RE.search(user_message.lower()) is None
     
     def _create_minimal_candidate_summary(self, candidate: Dict) -> Dict:
         """Create minimal candidate summary for AI calls to reduce tokens"""
-        try:
-            parsed_data = candidate.get("parsed_data", {})
-            personal_info = parsed_data.get("personal_info", {})
-            
-            # Get only essential data
-            name = personal_info.get("full_name", "Unknown")
-            
-            # Get top 3 skills only
-            skills = parsed_data.get("skills", {})
-            prog_langs = skills.get("programming_languages", [])[:3]  # Limit to top 3
-            frameworks = skills.get("frameworks_libraries", [])[:2]   # Limit to top 2
-            
-            # Basic experience info only
-            experience = parsed_data.get("experience", {})
-            years = experience.get("total_years", 0)
-            
-            return {
-                "id": candidate.get("id"),
-                "name": name,
-                "top_skills": prog_langs + frameworks,  # Max 5 skills
-                "experience_years": years,
-                "score": candidate.get("ranking_score", {}).get("total_score", 0),
-                "skill_relevance": candidate.get("skill_relevance_score", 0)
-            }
-        except Exception as e:
-            logger.error(f"Error creating minimal summary: {str(e)}")
-            return {
-                "id": candidate.get("id", "unknown"),
-                "name": "Unknown",
-                "top_skills": [],
-                "experience_years": 0,
-                "score": 0,
-                "skill_relevance": 0
-            }
+        # Projected from the summary stored at ingest so there is a single normalization path
+        summary = self._create_lightweight_candidate_summary(candidate)
+        return {
+            "id": summary.get("id", candidate.get("id")),
+            "name": summary.get("name", "Unknown"),
+            "top_skills": summary.get("top_skills", []),
+            "experience_years": summary.get("experience_years", 0),
+            "score": summary.get("total_score", 0),
+            # Skill relevance depends on the current query, so it is never stored
+            "skill_relevance": candidate.get("skill_relevance_score", 0)
+        }
     
     def analyze_resume_comprehensive(self, text: str, traditional_data: Dict = None) -> Dict:
         """
         PHASE 1 & 2 OPTIMIZATION: Consolidated analysis to reduce API calls and costs
         Combines: data extraction + fraud detection + insights + interview questions
-        Uses GPT-3.5-turbo instead of GPT-4 for 90% cost reduction
+        Uses gpt-4o-mini structured outputs instead of GPT-4
         """
         try:
-            # Create cache key to avoid repeated analysis
-            cache_key = hash(text[:500])  # Use first 500 chars as cache key
-            if cache_key in self._analysis_cache:
-                logger.info("Using cached comprehensive analysis")
-                return self._analysis_cache[cache_key]
-            
-            # Create the JSON template separately to avoid f-string conflicts
-            json_template = """{
-                "personal_info": {"full_name": "", "first_name": "", "last_name": ""},
-                "contact_info": {"email": "", "phone": "", "linkedin": "", "location": ""},
-                "professional_summary": "",
-                "skills": {
-                    "programming_languages": [],
-                    "frameworks_libraries": [],
-                    "databases": [],
-                    "cloud_platforms": [],
-                    "tools_technologies": [],
-                    "soft_skills": []
-                },
-                "experience": {
-                    "total_years": 0,
-                    "positions": [{"title": "", "company": "", "duration": "", "responsibilities": [], "technologies_used": []}]
-                },
-                "education": {
-                    "degrees": [{"degree": "", "field": "", "institution": "", "graduation_year": "", "gpa": null}]
-                },
-                "certifications": [],
-                "projects": [{"name": "", "description": "", "technologies": []}],
-                "languages": [],
-                "achievements": [],
-                "fraud_analysis": {
-                    "authenticity_score": 85,
-                    "red_flags_count": 0,
-                    "fraud_indicators": [
-                        {"type": "keyword_stuffing", "severity": "medium", "description": ""},
-                        {"type": "white_font_manipulation", "severity": "high", "description": ""},
-                        {"type": "unrealistic_claims", "severity": "low", "description": ""}
-                    ],
-                    "ats_gaming_detected": false,
-                    "overall_assessment": "",
-                    "recommendation": "hire"
-                },
-                "insights": {
-                    "strengths": [],
-                    "areas_for_improvement": [],
-                    "market_positioning": "",
-                    "salary_estimate": "",
-                    "cultural_fit_indicators": [],
-                    "overall_score": 75
-                },
-                "interview_questions": []
-            }"""
-            
-            prompt = f"""
-            Analyze this resume and provide ALL of the following in ONE response:
-            1. STRUCTURED DATA EXTRACTION
-            2. FRAUD DETECTION ANALYSIS  
-            3. CANDIDATE INSIGHTS
-            4. INTERVIEW QUESTIONS (max 15 questions)
-            
-            IMPORTANT FRAUD DETECTION FOCUS:
-            - Look for ATS gaming techniques like white font manipulation, keyword stuffing, hidden text
-            - Check for unrealistic skill claims vs experience level
-            - Identify suspicious formatting patterns, excessive repetition
-            - Flag invisible characters, tiny fonts, or text positioning anomalies
-            - Assess overall authenticity and coherence of the resume
-            
-            Return ONLY valid JSON with this EXACT structure:
-            {json_template}
-            
-            Resume text:
-            {text[:3000]}
-            
-            Be thorough in fraud detection. Look for patterns that indicate ATS manipulation or resume fraud. 
-            If you detect potential fraud, lower the authenticity_score significantly and set appropriate red_flags_count.
-            """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",  # PHASE 2: Switched from GPT-4 (90% cost reduction)
-                messages=[
-                    {"role": "system", "content": "You are an expert HR analyst. Provide comprehensive but concise analysis in valid JSON format only. Ensure all strings are properly escaped and JSON is well-formed."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,
-                max_tokens=800  # COST OPTIMIZATION: Reduced from 1800 to 800 (55% cost reduction)
-            )
-            
+            cache_key, cached, embedding = self._lookup_comprehensive(text)
+            if cached is not None:
+                return cached
+            
+            extracted = self._deterministic_extract(text)
+            response = self.client.chat.completions.create(**self._comprehensive_request(text, extracted))
+            if response.choices[0].finish_reason == "length":
+                logger.warning("Completion hit max_tokens; response JSON may be truncated")
             result = response.choices[0].message.content
             
             # COST MONITORING: Log AI usage
-            self._log_ai_usage(800, "gpt-3.5-turbo", "comprehensive_analysis")
-            
-            # Enhanced JSON cleaning and parsing
-            cleaned_result = self._clean_and_parse_json(result)
-            if cleaned_result is None:
-                logger.warning("JSON parsing failed, using fallback analysis")
-                return self._fallback_analysis(text, traditional_data)
+            self._log_ai_usage(800, STRUCTURED_MODEL, "comprehensive_analysis")
             
-            parsed_data = cleaned_result
-            
-            # Split the response into separate components for backward compatibility
-            fraud_analysis = parsed_data.pop("fraud_analysis", {})
-            insights = parsed_data.pop("insights", {})
-            interview_questions = parsed_data.pop("interview_questions", [])
+            return self._finish_comprehensive(
+                text, traditional_data, self._parse_structured(result), cache_key, embedding, extracted
+            )
             
-            # Add metadata
-            parsed_data["ai_confidence"] = self._calculate_confidence(parsed_data)
-            parsed_data["extraction_method"] = "openai_gpt3.5_consolidated"
+        except Exception as e:
+            logger.error(f"Error in comprehensive AI analysis: {str(e)}")
+            return self._fallback_analysis(text, traditional_data)
+
+    async def a_analyze_resume_comprehensive(self, text: str, traditional_data: Dict = None) -> Dict:
+        """
+        Async variant of analyze_resume_comprehensive, so independent resumes overlap their network waits.
+        Extraction and assessment run as two concurrent schema-constrained calls, each with a smaller output budget.
+        """
+        try:
+            # Cache and embedding lookups are blocking (SQLite, sync client); keep them off the event loop
+            cache_key, cached, embedding = await asyncio.to_thread(self._lookup_comprehensive, text)
+            if cached is not None:
+                return cached
+            
+            extracted = self._deterministic_extract(text)
+            client = self._get_async_client()
+            extraction, assessment = await asyncio.gather(
+                client.chat.completions.create(**self._comprehensive_request(
+                    text, extracted, "resume_extraction", EXTRACTION_SCHEMA, max_tokens=500
+                )),
+                client.chat.completions.create(**self._comprehensive_request(
+                    text, extracted, "resume_assessment", ASSESSMENT_SCHEMA, max_tokens=400
+                ))
+            )
             
-            result_dict = {
-                "parsed_data": parsed_data,
-                "fraud_analysis": self._format_fraud_analysis(fraud_analysis),
-                "insights": insights,
-                "interview_questions": interview_questions
-            }
+            # COST MONITORING: Log AI usage
+            self._log_ai_usage(500, STRUCTURED_MODEL, "resume_extraction")
+            self._log_ai_usage(400, STRUCTURED_MODEL, "resume_assessment")
             
-            # Cache the result
-            self._analysis_cache[cache_key] = result_dict
-            logger.info("Comprehensive analysis completed and cached")
+            parsed_extraction = self._parse_structured(extraction.choices[0].message.content)
+            parsed_assessment = self._parse_structured(assessment.choices[0].message.content)
+            parsed = {**parsed_extraction, **parsed_assessment} if parsed_extraction and parsed_assessment else None
             
-            return result_dict
+            # Caching may embed the resume (network call) and writes SQLite; keep it off the event loop
+            return await asyncio.to_thread(
+                self._finish_comprehensive, text, traditional_data, parsed, cache_key, embedding, extracted
+            )
             
         except Exception as e:
-            logger.error(f"Error in comprehensive AI analysis: {str(e)}")
+            logger.error(f"Error in async comprehensive AI analysis: {str(e)}")
             return self._fallback_analysis(text, traditional_data)
 
-    def _clean_and_parse_json(self, raw_response: str) -> Optional[Dict]:
-        """Enhanced JSON cleaning and parsing with multiple fallback strategies"""
+    async def analyze_many(self, texts: List[str]) -> List[Dict]:
+        """Analyze resumes concurrently, at most ASYNC_MAX_CONCURRENCY requests in flight"""
+        semaphore = asyncio.Semaphore(ASYNC_MAX_CONCURRENCY)
+        
+        async def analyze(text: str) -> Dict:
+            async with semaphore:
+                return await self.a_analyze_resume_comprehensive(text)
+        
+        return await asyncio.gather(*(analyze(text) for text in texts))
+
+    def analyze_resumes_concurrent(self, texts: List[str]) -> List[Dict]:
+        """Sync entry point for analyze_many (for Flask handlers)"""
+        return self._run_async(self.analyze_many(texts))
+
+    def _run_async(self, coroutine):
+        """Run a coroutine on the analyzer's event loop thread (started on first use) and wait for its result"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(target=self._loop.run_forever, name="ai-event-loop", daemon=True)
+                self._loop_thread.start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def _get_async_client(self) -> openai.AsyncOpenAI:
+        """
+        AsyncOpenAI client bound to the running event loop (its connection pool can't outlive the loop).
+        On the analyzer's own loop it is created once; a caller's loop replacing it closes the previous client.
+        """
+        loop = asyncio.get_running_loop()
+        if self._aclient_loop is not loop:
+            self._close_async_client()
+            self.aclient = openai.AsyncOpenAI(
+                api_key=os.getenv('OPENAI_KEY'),
+                http_client=httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+            )
+            self._aclient_loop = loop
+        return self.aclient
+
+    def _close_async_client(self):
+        """Close the async client on the loop that owns it, if that loop can still run it"""
+        client, loop = self.aclient, self._aclient_loop
+        self.aclient = self._aclient_loop = None
+        if client is None or loop is None or loop.is_closed() or not loop.is_running():
+            return
         try:
-            # Step 1: Basic cleaning
-            result = raw_response.strip()
-            
-            # Remove markdown code blocks
-            if result.startswith('```json'):
-                result = result[7:]
-            elif result.startswith('```'):
-                result = result[3:]
-            if result.endswith('```'):
-                result = result[:-3]
-            
-            result = result.strip()
+            asyncio.run_coroutine_threadsafe(client.close(), loop)
+        except Exception as e:
+            logger.warning(f"Error closing async OpenAI client: {str(e)}")
+
+    def close(self):
+        """Release pooled connections and background threads"""
+        self._prefetch_pool.shutdown(wait=False)
+        self._http.close()
+        loop = self._loop
+        if loop is not None:
+            if self.aclient is not None and self._aclient_loop is loop:
+                client, self.aclient, self._aclient_loop = self.aclient, None, None
+                asyncio.run_coroutine_threadsafe(client.close(), loop).result(timeout=5)
+            loop.call_soon_threadsafe(loop.stop)
+            self._loop_thread.join(timeout=5)
+            loop.close()
+            self._loop = self._loop_thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _lookup_comprehensive(self, text: str):
+        """Return (cache_key, cached analysis or None, embedding) for a resume"""
+        # Create cache key to avoid repeated analysis
+        cache_key = self._cache_key(text)  # Hash of the full normalized text
+        cached = self._analysis_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Using cached comprehensive analysis")
+            return cache_key, cached, None
+        
+        # Semantic cache: reuse the analysis of a near-identical earlier upload of the same candidate.
+        # Without an earlier analysis for this email there's nothing to compare, so no embedding call is made
+        identity = self._resume_identity(text)
+        prior_key = self._resume_identities.get(identity) if identity else None
+        prior = self._analysis_cache.get(prior_key) if prior_key else None
+        if prior is None:
+            if prior_key:
+                self._resume_embeddings.discard(prior_key)  # Its analysis expired or was culled
+            return cache_key, None, None
+        
+        embedding = self._embed_text(text)
+        similarity = self._resume_embeddings.similarity(prior_key, embedding) if embedding is not None else None
+        if similarity is not None and similarity >= self._semantic_threshold and self._same_candidate(prior, text):
+            logger.info("Using comprehensive analysis of a near-duplicate upload of the same resume")
+            cached = self._refresh_contact_details(prior, text)
+            self._analysis_cache.set(cache_key, cached, expire=CACHE_TTL_SECONDS)
+            return cache_key, cached, embedding
+        
+        return cache_key, None, embedding
+
+    def _resume_identity(self, text: str) -> Optional[str]:
+        """Email the resume was written for (lowercased), or None when there is none or semantic reuse is off"""
+        if self._semantic_threshold > 1:
+            return None
+        email_match = EMAIL_RE.search(text)
+        return email_match.group(0).lower() if email_match else None
+
+    def _same_candidate(self, analysis: Dict, text: str) -> bool:
+        """Whether the candidate named in an earlier analysis is also named in the new resume text"""
+        full_name = (analysis.get("parsed_data", {}).get("personal_info") or {}).get("full_name") or ""
+        return bool(full_name.strip()) and full_name.strip().lower() in text.lower()
+
+    def _refresh_contact_details(self, analysis: Dict, text: str) -> Dict:
+        """Copy of an earlier analysis with contact details re-extracted from the new resume text"""
+        parsed_data = dict(analysis.get("parsed_data", {}))
+        parsed_data["contact_info"] = {
+            **(parsed_data.get("contact_info") or {}),
+            **self._deterministic_extract(text)["contact_info"]
+        }
+        return {**analysis, "parsed_data": parsed_data}
+
+    def _comprehensive_request(self, text: str, extracted: Dict, schema_name: str = "resume_analysis",
+                               schema: Dict = RESUME_SCHEMA, max_tokens: int = 800) -> Dict:
+        """Chat completion arguments for the resume analysis (consolidated by default)"""
+        prompt = f"Pre-extracted: {json_dumps(extracted)}\n\nResume text:\n{self._prepare_resume_text(text)}"
+        return {
+            "model": STRUCTURED_MODEL,
+            "messages": [
+                {"role": "system", "content": RESUME_ANALYSIS_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            "response_format": json_schema_format(schema_name, schema),
+            "temperature": CACHEABLE_TEMPERATURE,
+            "max_tokens": max_tokens,  # COST OPTIMIZATION: Reduced from 1800 to 800 (55% cost reduction)
+            "user": self._tenant_id,
+            "extra_body": {"prompt_cache_key": self._tenant_id}
+        }
+
+    def _finish_comprehensive(self, text: str, traditional_data: Optional[Dict], parsed: Optional[Dict],
+                              cache_key: str, embedding, extracted: Dict) -> Dict:
+        """Build the analysis from a parsed response and cache it"""
+        if parsed is None:
+            logger.warning("JSON parsing failed, using fallback analysis")
+            return self._fallback_analysis(text, traditional_data)
+        
+        result_dict = self._build_comprehensive_result(self._merge_extracted(parsed, extracted))
+        
+        # Cache the result; resumes with an email are also indexed for later near-duplicate uploads
+        self._store_cached(self._analysis_cache, cache_key, result_dict, CACHEABLE_TEMPERATURE)
+        identity = self._resume_identity(text)
+        if identity:
+            embedding = embedding if embedding is not None else self._embed_text(text)
+            if embedding is not None:
+                self._resume_embeddings.add(cache_key, embedding)
+                self._resume_identities.set(identity, cache_key, expire=CACHE_TTL_SECONDS)
+        logger.info("Comprehensive analysis completed and cached")
+        
+        return result_dict
+
+    def _deterministic_extract(self, text: str) -> Dict:
+        """Regex/gazetteer extraction of contact details and skills, so the model doesn't pay for them"""
+        contact_info = {}
+        email_match = EMAIL_RE.search(text)
+        if email_match:
+            contact_info["email"] = email_match.group(0)
+        phone_match = PHONE_RE.search(text)
+        if phone_match:
+            contact_info["phone"] = phone_match.group(0)
+        linkedin_match = LINKEDIN_RE.search(text)
+        if linkedin_match:
+            contact_info["linkedin"] = "https://" + linkedin_match.group(0)
+        
+        return {"contact_info": contact_info, "skills": self._extract_skills(text)}
+
+    def _extract_skills(self, text: str) -> Dict[str, List[str]]:
+        """Gazetteer skills found in text, lowercased and grouped by category (single regex pass)"""
+        skills = {}
+        for match in SKILL_RE.finditer(text):
+            term = match.group(1).lower()
+            category_skills = skills.setdefault(SKILL_CATEGORY_BY_TERM[term], [])
+            if term not in category_skills:
+                category_skills.append(term)
+        return skills
+
+    def _merge_extracted(self, parsed_data: Dict, extracted: Dict) -> Dict:
+        """Backfill fields the model left empty with the deterministic extraction"""
+        contact_info = parsed_data.setdefault("contact_info", {})
+        for field, value in extracted.get("contact_info", {}).items():
+            if not contact_info.get(field):
+                contact_info[field] = value
+        
+        skills = parsed_data.setdefault("skills", {})
+        for category, terms in extracted.get("skills", {}).items():
+            known = {skill.lower() for skill in skills.get(category, [])}
+            skills[category] = skills.get(category, []) + [term for term in terms if term not in known]
+        
+        return parsed_data
+
+    def _cached_chat(self, on_delta=None, **kwargs) -> str:
+        """
+        Chat completion content with an exact-match response cache: in-process LRU first,
+        then the shared SQLite cache. Keyed on the full request (model, temperature, messages, ...).
+        On a miss with on_delta set, the completion is streamed and each content delta passed to it.
+        Sampled (non-deterministic) requests always go to the API; see _is_cacheable_chat.
+        """
+        if not self._is_cacheable_chat(kwargs):
+            if on_delta is not None:
+                content = self._stream_completion(on_delta=on_delta, **kwargs)
+            else:
+                content = self.client.chat.completions.create(**kwargs).choices[0].message.content
+            self._log_ai_usage(kwargs.get("max_tokens", 0), kwargs.get("model", ""), "chat")
+            return content
+        
+        key = self._chat_key(kwargs)
+        
+        entry = self._response_cache.get(key)
+        if entry is not None and entry[0] > time.time():
+            return entry[1]
+        
+        content = self._chat_cache.get(key)
+        if content is None:
+            if on_delta is not None:
+                content = self._stream_completion(on_delta=on_delta, **kwargs)
+            else:
+                content = self.client.chat.completions.create(**kwargs).choices[0].message.content
+            content = self._store_chat(key, kwargs, content)
+        else:
+            logger.info("Using cached chat completion")
+        
+        self._response_cache[key] = (time.time() + CHAT_CACHE_TTL_SECONDS, content)
+        return content
+    
+    async def _a_cached_chat(self, **kwargs) -> str:
+        """Async variant of _cached_chat; cache hits never reach the network"""
+        if not self._is_cacheable_chat(kwargs):
+            response = await self._get_async_client().chat.completions.create(**kwargs)
+            self._log_ai_usage(kwargs.get("max_tokens", 0), kwargs.get("model", ""), "chat")
+            return response.choices[0].message.content
+        
+        key = self._chat_key(kwargs)
+        
+        entry = self._response_cache.get(key)
+        if entry is not None and entry[0] > time.time():
+            return entry[1]
+        
+        # SQLite reads/writes are blocking; keep them off the event loop
+        content = await asyncio.to_thread(self._chat_cache.get, key)
+        if content is None:
+            response = await self._get_async_client().chat.completions.create(**kwargs)
+            content = await asyncio.to_thread(self._store_chat, key, kwargs, response.choices[0].message.content)
+        else:
+            logger.info("Using cached chat completion")
+        
+        self._response_cache[key] = (time.time() + CHAT_CACHE_TTL_SECONDS, content)
+        return content
+    
+    def _is_cacheable_chat(self, kwargs: Dict) -> bool:
+        """Whether a chat request is deterministic enough to answer from cache: temperature 0 or a strict schema"""
+        response_format = kwargs.get("response_format") or {}
+        if (response_format.get("json_schema") or {}).get("strict"):
+            return True
+        # The API samples at temperature 1 when none is given
+        return kwargs.get("temperature", 1) <= CACHEABLE_TEMPERATURE
+    
+    def _chat_key(self, kwargs: Dict) -> str:
+        """Response cache key of a chat completion request (model, temperature, messages, ...)"""
+        return hashlib.sha256(json.dumps(kwargs, sort_keys=True).encode()).hexdigest()
+    
+    def _store_chat(self, key: str, kwargs: Dict, content: str) -> str:
+        """Log a fresh completion and persist it to the shared cache"""
+        self._log_ai_usage(kwargs.get("max_tokens", 0), kwargs.get("model", ""), "cached_chat")
+        if content:
+            self._chat_cache.set(key, content, expire=CHAT_CACHE_TTL_SECONDS)
+        return content
+    
+    def _route_model(self, task: str, attempt: int) -> str:
+        """Model for the given attempt at a task (cheapest first)"""
+        routes = MODEL_ROUTES[task]
+        return routes[min(attempt, len(routes) - 1)]
+    
+    def _routed_chat_json(self, task: str, is_valid, **kwargs) -> Dict:
+        """JSON chat completion from the cheapest model whose answer passes is_valid, escalating once per failure"""
+        attempts = len(MODEL_ROUTES[task])
+        for attempt in range(attempts):
+            model = self._route_model(task, attempt)
+            result = self._cached_chat(model=model, **kwargs)
             
-            # Step 2: Try direct parsing
             try:
-                return json.loads(result)
-            except json.JSONDecodeError as e:
-                logger.warning(f"Direct JSON parsing failed: {e}")
+                parsed = self._parse_json_response(result)
+            except json.JSONDecodeError:
+                if attempt == attempts - 1:
+                    raise
+                logger.info(f"{model} returned invalid JSON for {task}; escalating")
+                continue
+            
+            if attempt == attempts - 1 or is_valid(parsed):
+                return parsed
+            logger.info(f"{model} answer for {task} failed validation; escalating")
+    
+    def _semantic_query_lookup(self, namespace: str, query: str):
+        """Return (embedding, cached result) for the closest earlier query in namespace"""
+        if self._query_semantic_threshold > 1:
+            return None, None
+        embedding = self._embed_text(self._canonical_query(query))
+        if embedding is None:
+            return None, None
+        entry = self._nearest_result(self._query_indexes[namespace], embedding, self._query_semantic_threshold)
+        # Embeddings barely move when only a number or a skill changes ("5 years" vs "10 years", "React" vs "Vue"),
+        # so a neighbour's result is only reused when both queries name exactly the same ones
+        if not isinstance(entry, dict) or entry.get("terms") != self._query_terms(query):
+            return embedding, None
+        return embedding, entry.get("result")
+    
+    def _nearest_result(self, index: SemanticCache, embedding, threshold: float):
+        """Stored result of the closest indexed key whose result hasn't expired; dead index entries are dropped"""
+        while True:
+            similar_key = index.nearest(embedding, threshold)
+            if similar_key is None:
+                return None
+            result = self._query_results.get(similar_key)
+            if result is not None:
+                return result
+            index.discard(similar_key)
+    
+    def _semantic_query_store(self, namespace: str, query: str, embedding, result: Dict):
+        """Index a query's interpreted result for later paraphrase lookups"""
+        if embedding is None:
+            return
+        key = self._cache_key(f"{namespace}:{self._canonical_query(query)}")
+        entry = {"terms": self._query_terms(query), "result": result}
+        self._query_results.set(key, entry, expire=CHAT_CACHE_TTL_SECONDS)
+        self._query_indexes[namespace].add(key, embedding)
+    
+    def _query_terms(self, query: str) -> List[str]:
+        """Numbers, skills and roles named in a query, which a paraphrase must repeat to share its interpretation"""
+        canonical = self._canonical_query(query)
+        terms = set(QUERY_NUMBER_RE.findall(canonical))
+        terms.update(QUERY_SKILLS[match.group(1)].lower() for match in QUERY_SKILL_RE.finditer(canonical))
+        terms.update(match.group(1).lower() for match in SKILL_RE.finditer(canonical))
+        terms.update(match.group(1) for match in ROLE_RE.finditer(canonical))
+        return sorted(terms)
+    
+    def _stream_completion(self, on_delta, **kwargs) -> str:
+        """
+        Stream a chat completion, passing each content delta to on_delta, and return its full content.
+        A stream that fails before any content arrives is retried without streaming; once tokens have been
+        received (and paid for) the error is raised rather than re-issuing the whole request.
+        """
+        parts = []
+        try:
+            finish_reason = None
+            for chunk in self.client.chat.completions.create(stream=True, **kwargs):
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                if choice.delta.content:
+                    parts.append(choice.delta.content)
+                    on_delta(choice.delta.content)
+                finish_reason = choice.finish_reason or finish_reason
+            if finish_reason == "length":
+                logger.warning("Completion hit max_tokens; response JSON may be truncated")
+            return "".join(parts)
+        except Exception as e:
+            if parts:
+                raise
+            logger.warning(f"Streaming completion failed before any content, retrying without streaming: {str(e)}")
+            response = self.client.chat.completions.create(**kwargs)
+            return response.choices[0].message.content
+    
+    def _build_comprehensive_result(self, parsed_data: Dict) -> Dict:
+        """Split a consolidated AI response into the components callers expect"""
+        # Split the response into separate components for backward compatibility
+        fraud_analysis = parsed_data.pop("fraud_analysis", {})
+        insights = parsed_data.pop("insights", {})
+        interview_questions = parsed_data.pop("interview_questions", [])
+        
+        # Add metadata
+        parsed_data["ai_confidence"] = self._calculate_confidence(parsed_data)
+        parsed_data["extraction_method"] = "openai_gpt4o_mini_consolidated"
+        
+        return {
+            "parsed_data": parsed_data,
+            "fraud_analysis": self._format_fraud_analysis(fraud_analysis),
+            "insights": insights,
+            "interview_questions": interview_questions
+        }
+
+    def analyze_resumes_batch(self, texts: List[str]) -> List[Dict]:
+        """
+        Bulk variant of analyze_resume_comprehensive: packs several resumes into one request
+        so the fixed instructions/JSON template overhead is paid once per batch instead of per resume.
+        Results are returned in input order and cached per resume.
+        """
+        results = [None] * len(texts)
+        pending = {}  # cache_key -> indices of texts sharing that content
+        for i, text in enumerate(texts):
+            cache_key = self._cache_key(text)
+            cached = self._analysis_cache.get(cache_key)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.setdefault(cache_key, []).append(i)
+        
+        # Greedily group uncached resumes under the input token budget
+        overhead_tokens = self._count_tokens(RESUME_ANALYSIS_SYSTEM_PROMPT + json.dumps(RESUME_SCHEMA)) + 100
+        batches, current, current_tokens = [], [], overhead_tokens
+        for cache_key, indices in pending.items():
+            resume_tokens = min(self._count_tokens(texts[indices[0]]), RESUME_TOKEN_LIMIT)
+            if current and (current_tokens + resume_tokens > RESUME_BATCH_INPUT_TOKENS or len(current) >= RESUME_BATCH_MAX_SIZE):
+                batches.append(current)
+                current, current_tokens = [], overhead_tokens
+            current.append(cache_key)
+            current_tokens += resume_tokens
+        if current:
+            batches.append(current)
+        
+        for batch in batches:
+            batch_results = self._analyze_resume_batch_call([texts[pending[key][0]] for key in batch])
+            for cache_key, analysis in zip(batch, batch_results):
+                if analysis is None:
+                    # Per-item failure: fall back to the single-resume path
+                    analysis = self.analyze_resume_comprehensive(texts[pending[cache_key][0]])
+                else:
+                    analysis = self._build_comprehensive_result(analysis)
+                    self._store_cached(self._analysis_cache, cache_key, analysis, CACHEABLE_TEMPERATURE)
+                for i in pending[cache_key]:
+                    results[i] = analysis
+        
+        return results
+
+    def _analyze_resume_batch_call(self, texts: List[str]) -> List[Optional[Dict]]:
+        """Run one consolidated analysis request for several resumes; None marks items that failed to parse"""
+        if len(texts) == 1:
+            return [None]  # Single resume: the regular path handles caching and fallbacks
+        
+        try:
+            extracted = [self._deterministic_extract(text) for text in texts]
+            resumes_block = "\n".join(
+                f"---RESUME_{i}---\nPre-extracted: {json_dumps(extracted[i])}\n\nResume text:\n{self._prepare_resume_text(text)}"
+                for i, text in enumerate(texts)
+            )
+            prompt = (
+                f'Analyze each of the {len(texts)} resumes below. Return an "analyses" array of '
+                f'length {len(texts)}; element i is the analysis of RESUME_i.\n\n{resumes_block}'
+            )
             
-            # Step 3: Fix common JSON issues
-            # Fix unterminated strings by finding incomplete quotes
-            result = self._fix_unterminated_strings(result)
+            max_tokens = 800 * len(texts)
+            response = self.client.chat.completions.create(
+                model=STRUCTURED_MODEL,
+                messages=[
+                    {"role": "system", "content": RESUME_ANALYSIS_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format=json_schema_format("resume_analysis_batch", RESUME_BATCH_SCHEMA),
+                temperature=CACHEABLE_TEMPERATURE,
+                max_tokens=max_tokens,
+                user=self._tenant_id,
+                extra_body={"prompt_cache_key": self._tenant_id}
+            )
             
-            # Fix trailing commas
-            result = re.sub(r',(\s*[}\]])', r'\1', result)
+            self._log_ai_usage(max_tokens, STRUCTURED_MODEL, "comprehensive_analysis_batch")
             
-            # Try parsing again
-            try:
-                return json.loads(result)
-            except json.JSONDecodeError as e:
-                logger.warning(f"Cleaned JSON parsing failed: {e}")
+            parsed = self._parse_structured(response.choices[0].message.content)
+            analyses = parsed.get("analyses") if isinstance(parsed, dict) else None
+            if not isinstance(analyses, list):
+                logger.warning("Batch analysis did not return a JSON array, analyzing resumes individually")
+                return [None] * len(texts)
             
-            # Step 4: Extract JSON from response if it's embedded
-            json_match = re.search(r'\{.*\}', result, re.DOTALL)
-            if json_match:
-                try:
-                    return json.loads(json_match.group())
-                except json.JSONDecodeError:
-                    pass
-            
-            # Step 5: Try to fix truncated JSON
-            if not result.endswith('}'):
-                # Find the last complete object
-                brace_count = 0
-                last_valid_pos = -1
-                for i, char in enumerate(result):
-                    if char == '{':
-                        brace_count += 1
-                    elif char == '}':
-                        brace_count -= 1
-                        if brace_count == 0:
-                            last_valid_pos = i
-                
-                if last_valid_pos > 0:
-                    truncated = result[:last_valid_pos + 1]
-                    try:
-                        return json.loads(truncated)
-                    except json.JSONDecodeError:
-                        pass
-            
-            logger.error("All JSON parsing strategies failed")
-            return None
+            return [
+                self._merge_extracted(analyses[i], extracted[i])
+                if i < len(analyses) and isinstance(analyses[i], dict) else None
+                for i in range(len(texts))
+            ]
             
         except Exception as e:
-            logger.error(f"Error in JSON cleaning: {str(e)}")
-            return None
+            logger.error(f"Error in batch resume analysis: {str(e)}")
+            return [None] * len(texts)
+
+    def _parse_json_response(self, result: str):
+        """Parse a JSON-mode completion (no markdown fences to strip)"""
+        return json_loads(result or "")
 
-    def _fix_unterminated_strings(self, json_str: str) -> str:
-        """Fix common unterminated string issues in JSON"""
+    def _parse_structured(self, raw_response: str) -> Optional[Dict]:
+        """Parse a structured-output response; the schema guarantees valid JSON unless max_tokens cut it short"""
         try:
-            # Find and fix unterminated strings
-            lines = json_str.split('\n')
-            fixed_lines = []
-            
-            for line in lines:
-                # Check if line has an unterminated string (odd number of quotes after colon)
-                if ':' in line and '"' in line:
-                    parts = line.split(':', 1)
-                    if len(parts) == 2:
-                        key_part, value_part = parts
-                        # Count quotes in value part
-                        quote_count = value_part.count('"')
-                        # If odd number of quotes and doesn't end with quote, add closing quote
-                        if quote_count % 2 == 1 and not value_part.strip().endswith('"') and not value_part.strip().endswith('",'):
-                            # Find the position to add closing quote
-                            if ',' in value_part:
-                                value_part = value_part.replace(',', '",', 1)
-                            else:
-                                value_part = value_part.strip() + '"'
-                            line = key_part + ':' + value_part
-                
-                fixed_lines.append(line)
-            
-            return '\n'.join(fixed_lines)
-            
-        except Exception as e:
-            logger.warning(f"Error fixing unterminated strings: {e}")
-            return json_str
+            return json_loads(raw_response)
+        except (json.JSONDecodeError, TypeError) as e:
+            logger.warning(f"Structured output could not be parsed (likely truncated): {e}")
+            return None
 
     def _format_fraud_analysis(self, fraud_data: Dict) -> Dict:
         """Convert AI fraud analysis to expected format"""
@@ -415,9 +1388,9 @@ class AIAnalyzer:
     def detect_fraud_with_ai(self, text: str, parsed_data: Dict) -> Dict:
         """OPTIMIZED: Now uses consolidated analysis - no additional API call"""
         # Try to get from consolidated analysis cache first
-        cache_key = hash(text[:500])
-        if cache_key in self._analysis_cache:
-            return self._analysis_cache[cache_key]["fraud_analysis"]
+        cached = self._analysis_cache.get(self._cache_key(text))
+        if cached is not None:
+            return cached["fraud_analysis"]
         
         # Fallback to simple analysis if no cache
         return {
@@ -427,73 +1400,42 @@ class AIAnalyzer:
             "detailed_analysis": {"note": "Use analyze_resume_comprehensive for full analysis"}
         }
     
-    def generate_candidate_insights(self, parsed_data: Dict, fraud_analysis: Dict) -> Dict:
-        """OPTIMIZED: Now uses consolidated analysis - no additional API call"""
-        # Try to get from consolidated analysis cache first
-        if hasattr(self, '_last_comprehensive_result'):
-            return self._last_comprehensive_result.get("insights", {})
-        
-        return {
-            "strengths": ["Professional background"],
-            "areas_for_improvement": ["Use analyze_resume_comprehensive for detailed insights"],
-            "market_positioning": "Standard candidate",
-            "salary_estimate": "Market rate",
-            "cultural_fit_indicators": [],
-            "overall_score": 70
-        }
+    def generate_candidate_insights(self, text: str, parsed_data: Dict, fraud_analysis: Dict) -> Dict:
+        """OPTIMIZED: Now uses consolidated analysis - at most one API call per resume"""
+        return self._comprehensive_for(text).get("insights", {})
     
-    def suggest_interview_questions(self, parsed_data: Dict) -> List[str]:
-        """OPTIMIZED: Now uses consolidated analysis - no additional API call"""
-        # Try to get from consolidated analysis cache first
-        if hasattr(self, '_last_comprehensive_result'):
-            return self._last_comprehensive_result.get("interview_questions", [])
-        
-        return [
-            "Tell me about your most relevant experience for this role.",
-            "What technical challenges have you solved recently?",
-            "How do you approach learning new technologies?"
-        ]
+    def suggest_interview_questions(self, text: str, parsed_data: Dict) -> List[str]:
+        """OPTIMIZED: Now uses consolidated analysis - at most one API call per resume"""
+        return self._comprehensive_for(text).get("interview_questions", [])
+    
+    def _comprehensive_for(self, text: str) -> Dict:
+        """Cached consolidated analysis for text, running it once if it is missing"""
+        cached = self._analysis_cache.get(self._cache_key(text))
+        if cached is not None:
+            return cached
+        return self.analyze_resume_comprehensive(text)
     
     def _calculate_confidence(self, parsed_data: Dict) -> float:
         """Calculate confidence score based on extracted data completeness"""
         try:
-            total_fields = 0
-            filled_fields = 0
+            personal_info = parsed_data.get("personal_info") or {}
+            contact_info = parsed_data.get("contact_info") or {}
+            skills = parsed_data.get("skills") or {}
+            
+            # Single pass over a fixed set of checks: name parts, email/phone, positions, degrees, any skill
+            checks = (
+                personal_info.get("full_name"),
+                personal_info.get("first_name"),
+                personal_info.get("last_name"),
+                contact_info.get("email"),
+                contact_info.get("phone"),
+                (parsed_data.get("experience") or {}).get("positions"),
+                (parsed_data.get("education") or {}).get("degrees"),
+                any(skills.values())
+            )
+            filled_fields = sum(1 for value in checks if value)
             
-            # Check personal info
-            personal_info = parsed_data.get("personal_info", {})
-            for field in ["full_name", "first_name", "last_name"]:
-                total_fields += 1
-                if personal_info.get(field):
-                    filled_fields += 1
-            
-            # Check contact info
-            contact_info = parsed_data.get("contact_info", {})
-            for field in ["email", "phone"]:
-                total_fields += 1
-                if contact_info.get(field):
-                    filled_fields += 1
-            
-            # Check experience
-            experience = parsed_data.get("experience", {})
-            total_fields += 1
-            if experience.get("positions") and len(experience["positions"]) > 0:
-                filled_fields += 1
-            
-            # Check education
-            education = parsed_data.get("education", {})
-            total_fields += 1
-            if education.get("degrees") and len(education["degrees"]) > 0:
-                filled_fields += 1
-            
-            # Check skills
-            skills = parsed_data.get("skills", {})
-            total_fields += 1
-            if any(skills.get(skill_type, []) for skill_type in skills.keys()):
-                filled_fields += 1
-            
-            confidence = (filled_fields / total_fields) * 100 if total_fields > 0 else 0
-            return round(confidence, 2)
+            return round(filled_fields / len(checks) * 100, 2)
             
         except Exception as e:
             logger.error(f"Error calculating confidence: {str(e)}")
@@ -512,23 +1454,16 @@ class AIAnalyzer:
         """Fallback analysis when AI fails"""
         logger.warning("Using fallback analysis due to AI failure")
         
-        # Basic text analysis
-        words = text.lower().split()
-        
         # Extract basic info using regex
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        phone_pattern = r'(\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-        
-        email_match = re.search(email_pattern, text)
-        phone_match = re.search(phone_pattern, text)
+        email_match = EMAIL_RE.search(text)
+        phone_match = PHONE_RE.search(text)
         
         # Basic name extraction (first few words that are capitalized)
-        lines = text.split('\n')
         potential_name = ""
-        for line in lines[:5]:  # Check first 5 lines
-            words_in_line = line.strip().split()
-            if len(words_in_line) >= 2 and all(word[0].isupper() for word in words_in_line[:2]):
-                potential_name = ' '.join(words_in_line[:2])
+        for line in text.split("\n", NAME_SEARCH_LINES)[:NAME_SEARCH_LINES]:
+            name_match = NAME_RE.match(line)
+            if name_match and name_match.group(1)[0].isupper() and name_match.group(2)[0].isupper():
+                potential_name = f"{name_match.group(1)} {name_match.group(2)}"
                 break
         
         fallback_data = {
@@ -591,77 +1526,44 @@ class AIAnalyzer:
         }
     
     def analyze_job_description(self, job_description: str, job_title: str) -> Dict:
-        """PHASE 2 OPTIMIZED: Use GPT-3.5-turbo to extract structured requirements from job description"""
+        """Use gpt-4o-mini structured outputs to extract requirements from a job description"""
         try:
+            cache_key = self._cache_key(f"{job_description}{job_title}")
+            cached = self._job_analysis_cache.get(cache_key)
+            if cached is not None:
+                logger.info("Using cached job description analysis")
+                return cached
+            
             prompt = f"""
-            Analyze this job description and extract structured requirements. Return ONLY valid JSON:
-            
-            {{
-                "required_skills": {{
-                    "programming_languages": [],
-                    "frameworks_libraries": [],
-                    "databases": [],
-                    "cloud_platforms": [],
-                    "tools_technologies": [],
-                    "soft_skills": []
-                }},
-                "experience_requirements": {{
-                    "minimum_years": 0,
-                    "preferred_years": 0,
-                    "level": "mid",
-                    "specific_experience": []
-                }},
-                "education_requirements": {{
-                    "minimum_degree": "",
-                    "preferred_degree": "",
-                    "required_fields": [],
-                    "certifications": []
-                }},
-                "job_analysis": {{
-                    "department": "",
-                    "job_type": "full-time",
-                    "seniority_level": "mid",
-                    "key_responsibilities": [],
-                    "growth_opportunities": []
-                }},
-                "salary_insights": {{
-                    "estimated_range": "",
-                    "factors_affecting_salary": []
-                }}
-            }}
+            Analyze this job description and extract structured requirements.
             
             Job Title: {job_title}
             Job Description:
-            {job_description[:2000]}
+            {self._truncate_to_tokens(job_description, JOB_DESCRIPTION_TOKEN_LIMIT)}
             
             Be concise but accurate.
             """
             
+            temperature = CACHEABLE_TEMPERATURE
             response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",  # PHASE 2: Switched from GPT-4 (90% cost reduction)
+                model=STRUCTURED_MODEL,
                 messages=[
                     {"role": "system", "content": "You are an HR analyst. Extract job requirements in valid JSON format only."},
                     {"role": "user", "content": prompt}
                 ],
-                temperature=0.1,
+                response_format=json_schema_format("job_requirements", JOB_REQ_SCHEMA),
+                temperature=temperature,
                 max_tokens=800  # PHASE 1: Reduced from 2000 tokens (60% reduction)
             )
             
-            result = response.choices[0].message.content
-            
-            # Clean and parse JSON
-            result = result.strip()
-            if result.startswith('```json'):
-                result = result[7:]
-            if result.endswith('```'):
-                result = result[:-3]
-            
-            parsed_requirements = json.loads(result)
+            # Structured outputs guarantee schema-valid JSON
+            parsed_requirements = json_loads(response.choices[0].message.content)
             
             # Add metadata
             parsed_requirements["ai_confidence"] = self._calculate_job_confidence(parsed_requirements)
-            parsed_requirements["extraction_method"] = "openai_gpt3.5_optimized"
+            parsed_requirements["extraction_method"] = "openai_gpt4o_mini_structured"
             
+            self._store_cached(self._job_analysis_cache, cache_key, parsed_requirements, temperature)
             return parsed_requirements
             
         except Exception as e:
@@ -669,8 +1571,15 @@ class AIAnalyzer:
             return self._fallback_job_analysis(job_description, job_title)
     
     def match_candidate_to_job(self, candidate_data: Dict, job_requirements: Dict) -> Dict:
-        """PHASE 2 OPTIMIZED: Use GPT-3.5-turbo for candidate-job matching"""
+        """Use gpt-4o-mini structured outputs for candidate-job matching"""
         try:
+            job_hash = self._cache_key(json.dumps(job_requirements, sort_keys=True))
+            cache_key = f"{candidate_data.get('id')}:{job_hash}"
+            cached = self._job_match_cache.get(cache_key)
+            if cached is not None:
+                logger.info("Using cached candidate-job match")
+                return cached
+            
             # Simplify candidate data to reduce token usage
             simplified_candidate = {
                 "skills": candidate_data.get("parsed_data", {}).get("skills", {}),
@@ -679,72 +1588,33 @@ class AIAnalyzer:
             }
             
             prompt = f"""
-            Match candidate to job requirements. Return ONLY valid JSON:
-            
-            {{
-                "overall_compatibility_score": 75,
-                "compatibility_breakdown": {{
-                    "skills_match": {{
-                        "score": 80,
-                        "matched_skills": [],
-                        "missing_skills": [],
-                        "bonus_skills": []
-                    }},
-                    "experience_match": {{
-                        "score": 70,
-                        "years_comparison": "",
-                        "level_match": "",
-                        "relevant_experience": []
-                    }},
-                    "education_match": {{
-                        "score": 85,
-                        "degree_compatibility": "",
-                        "field_relevance": ""
-                    }}
-                }},
-                "strengths_for_role": [],
-                "concerns_for_role": [],
-                "interview_focus_areas": [],
-                "recommendation": {{
-                    "decision": "good_fit",
-                    "confidence": 7,
-                    "reasoning": "",
-                    "next_steps": ""
-                }},
-                "salary_fit": {{
-                    "candidate_level_estimate": "",
-                    "market_rate_analysis": ""
-                }}
-            }}
-            
-            Candidate: {json.dumps(simplified_candidate)}
-            Job Requirements: {json.dumps(job_requirements)}
+            Match candidate to job requirements.
+            
+            Candidate: {json_dumps(simplified_candidate)}
+            Job Requirements: {json_dumps(job_requirements)}
             
             Be concise and accurate.
             """
             
+            temperature = CACHEABLE_TEMPERATURE  # Deterministic, so the match is cacheable
             response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",  # PHASE 2: Switched from GPT-4 (90% cost reduction)
+                model=STRUCTURED_MODEL,
                 messages=[
                     {"role": "system", "content": "You are a technical recruiter. Provide candidate-job matching in valid JSON format only."},
                     {"role": "user", "content": prompt}
                 ],
-                temperature=0.2,
+                response_format=json_schema_format("candidate_match", CANDIDATE_MATCH_SCHEMA),
+                temperature=temperature,
                 max_tokens=600  # PHASE 1: Reduced from 2000 tokens (70% reduction)
             )
             
-            result = response.choices[0].message.content
-            
             # COST MONITORING: Log AI usage
-            self._log_ai_usage(600, "gpt-3.5-turbo", "job_matching")
-            
-            # Clean and parse JSON
-            if result.startswith('```json'):
-                result = result[7:]
-            if result.endswith('```'):
-                result = result[:-3]
+            self._log_ai_usage(600, STRUCTURED_MODEL, "job_matching")
             
-            return json.loads(result)
+            # Structured outputs guarantee schema-valid JSON
+            match_analysis = json_loads(response.choices[0].message.content)
+            self._store_cached(self._job_match_cache, cache_key, match_analysis, temperature)
+            return match_analysis
             
         except Exception as e:
             logger.error(f"Error in AI candidate matching: {str(e)}")
@@ -752,113 +1622,16 @@ class AIAnalyzer:
     
     def generate_bulk_job_matches(self, candidates: List[Dict], job_requirements: Dict) -> List[Dict]:
         """COST-OPTIMIZED: Generate job matches efficiently with minimal token usage"""
+        # COST OPTIMIZATION: Limit to the 15 best-scored candidates (vectorized top-K) and use minimal data
+        top_candidates = CandidatePool(candidates).top_candidates(15)
         try:
-            # COST OPTIMIZATION: Limit to top 15 candidates and use minimal data
-            top_candidates = candidates[:15]
-            
-            # COST OPTIMIZATION: Create ultra-minimal candidate summaries
-            candidate_summaries = []
-            for candidate in top_candidates:
-                parsed_data = candidate["parsed_data"]
-                personal_info = parsed_data.get("personal_info", {})
-                skills_data = parsed_data.get("skills", {})
-                experience_data = parsed_data.get("experience", {})
-                
-                # Get only top 3 most relevant skills to reduce tokens
-                all_skills = []
-                for category in ["programming_languages", "web_technologies", "frameworks_libraries"]:
-                    category_skills = skills_data.get(category, [])
-                    if isinstance(category_skills, list):
-                        all_skills.extend(category_skills[:2])  # Only top 2 from each category
-                
-                summary = {
-                    "id": candidate["id"],
-                    "name": personal_info.get("full_name") or personal_info.get("name") or f"Candidate {candidate['id'][:8]}",
-                    "skills": all_skills[:4],  # Maximum 4 skills to save tokens
-                    "exp": experience_data.get("total_years", 0),
-                    "score": candidate["ranking_score"].get("total_score", 50)
-                }
-                candidate_summaries.append(summary)
-            
-            # COST OPTIMIZATION: Very concise prompt to minimize tokens
-            job_summary = {
-                "title": job_requirements.get("job_analysis", {}).get("role_type", "Developer"),
-                "skills": job_requirements.get("required_skills", {}).get("programming_languages", [])[:3],
-                "exp_min": job_requirements.get("experience_requirements", {}).get("minimum_years", 1)
-            }
-            
-            prompt = f"""Rate candidates 0-100 for: {job_summary['title']}
-Needs: {', '.join(job_summary['skills'][:3])}, {job_summary['exp_min']}+ yrs
-
-Candidates: {json.dumps(candidate_summaries, separators=(',', ':'))}
-
-Return JSON array with candidate names and details:
-[{{"candidate_id":"id","candidate_name":"Full Name","compatibility_score":75,"quick_assessment":"Brief fit summary","top_strengths":["strength1","strength2"],"main_concerns":["concern1"],"recommendation":"good_fit"}}]
-
-IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fit, potential_fit, poor_fit"""
-            
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "Expert recruiter. Return valid JSON only. Be concise but specific."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,  # Lower temperature for consistency
-                max_tokens=600    # COST OPTIMIZATION: Reduced from 1200 to 600
-            )
-            
-            result = response.choices[0].message.content.strip()
-            
-            # COST MONITORING: Log AI usage
-            self._log_ai_usage(600, "gpt-3.5-turbo", "job_matching")
-            
-            # Clean and parse JSON
-            if result.startswith('```json'):
-                result = result[7:]
-            if result.endswith('```'):
-                result = result[:-3]
-            
-            matches = json.loads(result)
-            
-            # COST OPTIMIZATION: Fast rule-based fallback for missing candidates
-            matched_ids = {match["candidate_id"] for match in matches}
-            for candidate in candidate_summaries:
-                if candidate["id"] not in matched_ids:
-                    # Quick rule-based assessment to avoid additional AI calls
-                    score = min(90, max(30, candidate["score"]))
-                    
-                    # Simple rule-based strengths
-                    strengths = []
-                    if candidate["exp"] >= 3:
-                        strengths.append(f"{candidate['exp']} years experience")
-                    if len(candidate["skills"]) >= 2:
-                        strengths.append(f"Skills: {', '.join(candidate['skills'][:2])}")
-                    if candidate["score"] > 70:
-                        strengths.append("Strong profile score")
-                    
-                    concerns = []
-                    if candidate["exp"] < 2:
-                        concerns.append("Limited experience")
-                    if not candidate["skills"]:
-                        concerns.append("Skills verification needed")
-                    
-                    matches.append({
-                        "candidate_id": candidate["id"],
-                        "candidate_name": candidate["name"],  # Include candidate name
-                        "compatibility_score": score,
-                        "quick_assessment": f"{candidate['name']} ({candidate['exp']}y exp) - Quick rule-based match.",
-                        "top_strengths": strengths or ["Profile available"],
-                        "main_concerns": concerns or ["Detailed review needed"],
-                        "recommendation": "good_fit" if score >= 60 else "potential_fit"
-                    })
-            
-            return matches
+            return self._run_async(self.generate_bulk_job_matches_async(top_candidates, job_requirements))
             
         except Exception as e:
             logger.error(f"Error in bulk job matching: {str(e)}")
             # COST OPTIMIZATION: Simple rule-based fallback - no AI calls
             fallback_matches = []
-            for candidate in candidates[:15]:
+            for candidate in top_candidates:
                 name = candidate["parsed_data"].get("personal_info", {}).get("full_name", f"Candidate {candidate['id'][:8]}")
                 exp_years = candidate["parsed_data"].get("experience", {}).get("total_years", 0)
                 score = candidate["ranking_score"].get("total_score", 50)
@@ -881,135 +1654,420 @@ IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fi
                     "quick_assessment": f"{assessment} {exp_years} years experience.",
                     "top_strengths": [f"{exp_years} years experience", "Profile submitted"],
                     "main_concerns": ["Manual review recommended"],
-                    "recommendation": recommendation
+                    "recommendation": recommendation,
+                    "scored_by": "rules"
                 })
             
-            return fallback_matches
+            return self._rank_bulk_matches(fallback_matches)
+    
+    async def generate_bulk_job_matches_async(self, candidates: List[Dict], job_requirements: Dict) -> List[Dict]:
+        """
+        Score each candidate with its own short completion, at most BULK_MATCH_MAX_CONCURRENCY in flight,
+        so latency is the slowest single short call rather than one long multi-candidate completion.
+        """
+        # COST OPTIMIZATION: Create ultra-minimal candidate summaries
+        candidate_summaries = [self._bulk_match_summary(candidate) for candidate in candidates]
+        semaphore = asyncio.Semaphore(BULK_MATCH_MAX_CONCURRENCY)
+        
+        # COST OPTIMIZATION: Candidates with few of the required skills are settled deterministically, no LLM call
+        job_skills = self._skill_vector(job_requirements.get("required_skills"))
+        for candidate, summary in zip(candidates, candidate_summaries):
+            summary["coverage"] = self._skill_coverage(
+                self._skill_vector((candidate.get("parsed_data") or {}).get("skills")), job_skills
+            )
+        llm_rows = [
+            row for row, summary in enumerate(candidate_summaries)
+            if summary["coverage"] is None or summary["coverage"] >= BULK_MATCH_MIN_SKILL_COVERAGE
+        ]
+        
+        # COST OPTIMIZATION: Vector prefilter - only the most job-similar remaining candidates get an LLM call
+        if len(llm_rows) > BULK_MATCH_LLM_TOP_K:
+            similarities = await asyncio.to_thread(
+                self._skill_similarities, [candidates[row] for row in llm_rows], job_requirements
+            )
+            if similarities is not None:
+                for row, similarity in zip(llm_rows, similarities):
+                    candidate_summaries[row]["similarity"] = round(float(similarity), 2)
+                top = np.argpartition(-similarities, BULK_MATCH_LLM_TOP_K - 1)[:BULK_MATCH_LLM_TOP_K]
+                llm_rows = [llm_rows[index] for index in top]
+        llm_rows = set(llm_rows)
+        
+        async def score(summary: Dict) -> Dict:
+            async with semaphore:
+                result = await self._a_cached_chat(**self._bulk_match_request(
+                    [summary], job_requirements, max_tokens=BULK_MATCH_TOKENS_PER_CANDIDATE
+                ))
+            match = self._parse_bulk_matches(result)[0]
+            match["candidate_id"] = summary["id"]
+            return match
+        
+        results = await asyncio.gather(*(
+            score(summary) for row, summary in enumerate(candidate_summaries) if row in llm_rows
+        ), return_exceptions=True)
+        
+        matches = []
+        llm_results = iter(results)
+        for row, summary in enumerate(candidate_summaries):
+            if row not in llm_rows:
+                if "similarity" in summary:
+                    matches.append(self._similarity_bulk_match(summary))
+                else:
+                    matches.append(self._overlap_bulk_match(summary))
+                continue
+            result = next(llm_results)
+            if isinstance(result, Exception):
+                # COST OPTIMIZATION: Fast rule-based fallback for candidates the model didn't score
+                logger.warning(f"Job match for candidate {summary['id']} failed: {str(result)}")
+                result = self._rule_based_bulk_match(summary)
+            matches.append(result)
+        return self._rank_bulk_matches(matches)
+    
+    def submit_bulk_job_matches_batch(self, candidates: List[Dict], job_requirements: Dict,
+                                      metadata: Optional[Dict[str, str]] = None) -> str:
+        """
+        Submit every candidate for scoring through the OpenAI Batch API (50% cheaper, no RPM limits) and return
+        the batch id without waiting; collect_bulk_job_matches_batch merges the results once the batch has ended.
+        Candidates are sent in shards of BULK_MATCH_SHARD_SIZE.
+        """
+        candidate_summaries = [self._bulk_match_summary(candidate) for candidate in candidates]
+        shards = [
+            candidate_summaries[i:i + BULK_MATCH_SHARD_SIZE]
+            for i in range(0, len(candidate_summaries), BULK_MATCH_SHARD_SIZE)
+        ]
+        return self._submit_chat_batch({
+            f"shard-{index}": self._bulk_match_request(shard, job_requirements)
+            for index, shard in enumerate(shards)
+        }, metadata)
+    
+    def retrieve_batch(self, batch_id: str):
+        """Current state of a submitted Batch API job (status, metadata, output file); downloads no results"""
+        return self.client.batches.retrieve(batch_id)
+    
+    def collect_bulk_job_matches_batch(self, batch_job, candidates: List[Dict]) -> Optional[List[Dict]]:
+        """
+        Matches of a retrieved job matching batch, or None while it is still running. Once it has ended,
+        every candidate gets its batch match or, for shards that failed, a rule-based one.
+        """
+        if batch_job.status not in BATCH_TERMINAL_STATUSES:
+            return None
+        if batch_job.status != "completed":
+            logger.warning(f"Batch {batch_job.id} ended with status {batch_job.status}")
+        
+        matches_by_id = {}
+        try:
+            for custom_id, content in self._chat_batch_contents(batch_job).items():
+                self._log_ai_usage(600, "gpt-3.5-turbo", "job_matching_batch")
+                try:
+                    for match in self._parse_bulk_matches(content):
+                        matches_by_id[match["candidate_id"]] = match
+                except (KeyError, IndexError, TypeError, json.JSONDecodeError) as e:
+                    logger.warning(f"Unparseable batch result for {custom_id}: {str(e)}")
+            
+        except Exception as e:
+            logger.error(f"Error reading batch job matches: {str(e)}")
+        
+        # COST OPTIMIZATION: Rule-based matches for anything the batch didn't cover
+        candidate_summaries = [self._bulk_match_summary(candidate) for candidate in candidates]
+        return self._rank_bulk_matches([
+            matches_by_id.get(summary["id"]) or self._rule_based_bulk_match(summary)
+            for summary in candidate_summaries
+        ])
+    
+    def _submit_chat_batch(self, bodies: Dict[str, Dict], metadata: Optional[Dict[str, str]] = None) -> str:
+        """Submit chat completion request bodies (keyed by custom_id) as one OpenAI Batch API job; returns its id"""
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as batch_file:
+            for custom_id, body in bodies.items():
+                batch_file.write(json_dumps({
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": body
+                }) + "\n")
+        
+        try:
+            with open(batch_file.name, "rb") as upload:
+                input_file = self.client.files.create(file=upload, purpose="batch")
+        finally:
+            os.remove(batch_file.name)
+        
+        batch_job = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+            metadata=metadata or {}
+        )
+        logger.info(f"Submitted batch {batch_job.id} with {len(bodies)} requests")
+        return batch_job.id
+    
+    def _chat_batch_contents(self, batch_job) -> Dict[str, str]:
+        """Content of every request in an ended batch that succeeded, keyed by custom_id"""
+        contents = {}
+        if not batch_job.output_file_id:
+            return contents
+        output = self.client.files.content(batch_job.output_file_id).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            record = json_loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            try:
+                contents[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+            except (KeyError, IndexError, TypeError) as e:
+                logger.warning(f"Malformed batch result for {record.get('custom_id')}: {str(e)}")
+        return contents
+    
+    def _bulk_match_summary(self, candidate: Dict) -> Dict:
+        """Ultra-minimal candidate summary used in bulk match prompts"""
+        parsed_data = candidate["parsed_data"]
+        personal_info = parsed_data.get("personal_info", {})
+        skills_data = parsed_data.get("skills", {})
+        experience_data = parsed_data.get("experience", {})
+        
+        # Get only top 3 most relevant skills to reduce tokens
+        all_skills = []
+        for category in ["programming_languages", "web_technologies", "frameworks_libraries"]:
+            category_skills = skills_data.get(category, [])
+            if isinstance(category_skills, list):
+                all_skills.extend(category_skills[:2])  # Only top 2 from each category
+        
+        return {
+            "id": candidate["id"],
+            "name": personal_info.get("full_name") or personal_info.get("name") or f"Candidate {candidate['id'][:8]}",
+            "skills": all_skills[:4],  # Maximum 4 skills to save tokens
+            "exp": experience_data.get("total_years", 0),
+            "score": candidate["ranking_score"].get("total_score", 50)
+        }
+    
+    def _bulk_match_request(self, candidate_summaries: List[Dict], job_requirements: Dict, max_tokens: int = 500) -> Dict:
+        """Chat completion arguments for rating a group of candidates against a job"""
+        # COST OPTIMIZATION: Short-key packed records; instructions and key legend sit in the static system prompt
+        prompt = BULK_MATCH_TEMPLATE.substitute(
+            job=json_dumps(self._pack_job(job_requirements)),
+            candidates=json_dumps([self._pack_candidate(c) for c in candidate_summaries])
+        )
+        
+        return {
+            "model": "gpt-3.5-turbo",
+            "messages": [
+                {"role": "system", "content": BULK_MATCH_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            "response_format": JSON_OBJECT_FORMAT,
+            "temperature": CACHEABLE_TEMPERATURE,  # Deterministic, so repeat matches come from cache
+            "max_tokens": max_tokens  # COST OPTIMIZATION: Reduced from 1200 to 500 per multi-candidate request (JSON mode, no fences)
+        }
+    
+    def _pack_job(self, job_requirements: Dict) -> Dict:
+        """Short-key job summary for match prompts"""
+        return self._strip_empty({
+            "t": (job_requirements.get("job_analysis") or {}).get("role_type", "Developer"),
+            "k": ((job_requirements.get("required_skills") or {}).get("programming_languages") or [])[:3],
+            "y": (job_requirements.get("experience_requirements") or {}).get("minimum_years", 1)
+        })
+    
+    def _pack_candidate(self, summary: Dict) -> Dict:
+        """Short-key form of a bulk match summary for match prompts"""
+        return self._strip_empty({
+            "i": summary["id"],
+            "n": summary["name"],
+            "s": summary["skills"][:3],
+            "y": summary["exp"],
+            "r": summary["score"],
+            "v": summary.get("similarity")
+        })
+    
+    def _skill_bag(self, skills) -> str:
+        """Flatten a skills-by-category dict into the text that gets embedded"""
+        terms = [
+            term for terms in (skills or {}).values() if isinstance(terms, list)
+            for term in terms if term and isinstance(term, str)
+        ]
+        return ", ".join(terms) or "no listed skills"
+    
+    def _embed_candidates(self, candidates: List[Dict]) -> Optional[np.ndarray]:
+        """(N, dim) skill-bag embeddings, one embeddings request for all candidates not cached yet"""
+        bags = [self._skill_bag((candidate.get("parsed_data") or {}).get("skills")) for candidate in candidates]
+        keys = [f"{candidate.get('id')}:{self._cache_key(bag)}" for candidate, bag in zip(candidates, bags)]
+        vectors = [self._candidate_embeddings.get(key) for key in keys]
+        
+        missing = [row for row, vector in enumerate(vectors) if vector is None]
+        if missing:
+            try:
+                response = self.client.embeddings.create(model=EMBEDDING_MODEL, input=[bags[row] for row in missing])
+            except Exception as e:
+                logger.warning(f"Candidate embedding request failed: {str(e)}")
+                return None
+            for row, item in zip(missing, response.data):
+                vectors[row] = np.asarray(item.embedding, dtype=np.float32)
+                self._candidate_embeddings[keys[row]] = vectors[row]
+        
+        return np.vstack(vectors)
+    
+    def _skill_similarities(self, candidates: List[Dict], job_requirements: Dict) -> Optional[np.ndarray]:
+        """Cosine similarity of each candidate's skill bag to the job's required skills (one matmul)"""
+        matrix = self._embed_candidates(candidates)
+        job_bag = self._skill_bag(job_requirements.get("required_skills"))
+        job_key = f"job:{self._cache_key(job_bag)}"
+        job_vector = self._candidate_embeddings.get(job_key)
+        if job_vector is None:
+            job_embedding = self._embed_text(job_bag)
+            if job_embedding is None:
+                return None
+            job_vector = self._candidate_embeddings[job_key] = np.asarray(job_embedding, dtype=np.float32)
+        if matrix is None:
+            return None
+        
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(job_vector)
+        return (matrix @ job_vector) / np.where(norms > 0, norms, 1)
+    
+    def _strip_empty(self, record: Dict) -> Dict:
+        """Drop None/empty values so they cost no prompt tokens"""
+        return {key: value for key, value in record.items() if value not in (None, "", [], {})}
+    
+    def _parse_bulk_matches(self, result: str) -> List[Dict]:
+        """Parse the short-key {"m": [...]} object returned for a bulk match prompt into full match dicts"""
+        return [
+            {**{BULK_MATCH_KEYS.get(key, key): value for key, value in match.items()}, "scored_by": "llm"}
+            for match in self._parse_json_response(result).get("m", [])
+        ]
+    
+    def _rank_bulk_matches(self, matches: List[Dict]) -> List[Dict]:
+        """Order bulk matches by scorer tier (BULK_MATCH_SCORER_TIERS), then compatibility score within a tier"""
+        return sorted(matches, key=lambda match: (
+            BULK_MATCH_SCORER_TIERS.index(match.get("scored_by", "rules")),
+            -(match.get("compatibility_score") or 0)
+        ))
+    
+    def _rule_based_bulk_match(self, candidate: Dict) -> Dict:
+        """Quick rule-based assessment of a bulk match summary to avoid additional AI calls"""
+        score = min(90, max(30, candidate["score"]))
+        
+        # Simple rule-based strengths
+        strengths = []
+        if candidate["exp"] >= 3:
+            strengths.append(f"{candidate['exp']} years experience")
+        if len(candidate["skills"]) >= 2:
+            strengths.append(f"Skills: {', '.join(candidate['skills'][:2])}")
+        if candidate["score"] > 70:
+            strengths.append("Strong profile score")
+        
+        concerns = []
+        if candidate["exp"] < 2:
+            concerns.append("Limited experience")
+        if not candidate["skills"]:
+            concerns.append("Skills verification needed")
+        
+        return {
+            "candidate_id": candidate["id"],
+            "candidate_name": candidate["name"],  # Include candidate name
+            "compatibility_score": score,
+            "quick_assessment": f"{candidate['name']} ({candidate['exp']}y exp) - Quick rule-based match.",
+            "top_strengths": strengths or ["Profile available"],
+            "main_concerns": concerns or ["Detailed review needed"],
+            "recommendation": "good_fit" if score >= 60 else "potential_fit",
+            "scored_by": "rules"
+        }
+    
+    def _similarity_bulk_match(self, candidate: Dict) -> Dict:
+        """Deterministic match for candidates outside the LLM top-K, scored from skill similarity"""
+        match = self._rule_based_bulk_match(candidate)
+        score = min(90, max(30, round(100 * candidate.get("similarity", 0))))
+        match.update({
+            "compatibility_score": score,
+            "quick_assessment": f"{candidate['name']} ({candidate['exp']}y exp) - Skill similarity match.",
+            "recommendation": "good_fit" if score >= 60 else "potential_fit",
+            "scored_by": "embedding"
+        })
+        return match
+    
+    def _overlap_bulk_match(self, candidate: Dict) -> Dict:
+        """Deterministic match for candidates who list too few of the job's required skills for an LLM call"""
+        match = self._rule_based_bulk_match(candidate)
+        match.update({
+            "compatibility_score": round(candidate["coverage"]),
+            "quick_assessment": f"{candidate['name']} ({candidate['exp']}y exp) - Low skill overlap with the role.",
+            "main_concerns": ["Few of the required skills listed"],
+            "recommendation": "poor_fit",
+            "scored_by": "skill_coverage"
+        })
+        return match
+    
+    def _skill_vector(self, skills) -> np.ndarray:
+        """Boolean vector over SKILL_VOCAB: which gazetteer skills appear in a skills-by-category dict"""
+        vector = np.zeros(len(SKILL_VOCAB), dtype=bool)
+        for match in SKILL_RE.finditer(self._skill_bag(skills)):
+            vector[SKILL_VOCAB[match.group(1).lower()]] = True
+        return vector
+    
+    def _skill_coverage(self, candidate_skills: np.ndarray, job_skills: np.ndarray) -> Optional[float]:
+        """
+        Share (0-100) of the job's skills the candidate lists, or None when the job lists no known skill.
+        Extra candidate skills don't lower it, unlike Jaccard overlap.
+        """
+        required = np.count_nonzero(job_skills)
+        if required == 0:
+            return None
+        return 100.0 * np.count_nonzero(candidate_skills & job_skills) / required
     
     def suggest_job_improvements(self, job_description: str, market_analysis: Dict = None) -> Dict:
         """Suggest improvements to job descriptions to attract better candidates"""
         try:
-            prompt = f"""
-            Analyze this job description and suggest improvements to make it more attractive and effective for recruiting.
-            
-            Job Description:
-            {job_description}
-            
-            Market Analysis (if available):
-            {json.dumps(market_analysis, indent=2) if market_analysis else "Not provided"}
-            
-            Provide suggestions in JSON format:
-            {{
-                "overall_assessment": "string assessment of current job description",
-                "improvements": {{
-                    "clarity": ["suggestions for clearer requirements"],
-                    "attractiveness": ["suggestions to make role more appealing"],
-                    "inclusivity": ["suggestions for more inclusive language"],
-                    "competitiveness": ["suggestions based on market standards"]
-                }},
-                "missing_elements": ["list of important elements that should be added"],
-                "red_flags": ["list of potential issues that might deter candidates"],
-                "suggested_rewrite": {{
-                    "title": "improved job title",
-                    "summary": "improved job summary",
-                    "key_improvements": ["list of main changes made"]
-                }},
-                "target_candidate_profile": "description of ideal candidate this job would attract"
-            }}
-            """
+            prompt = JOB_IMPROVEMENT_TEMPLATE.substitute(
+                job_description=job_description,
+                market_analysis=json_dumps(market_analysis) if market_analysis else "Not provided"
+            )
             
-            response = self.client.chat.completions.create(
-                model="gpt-4",
+            # COST OPTIMIZATION: gpt-4o-mini first, gpt-4o only if its suggestions are malformed
+            return self._routed_chat_json(
+                "job_improvements",
+                lambda parsed: isinstance(parsed, dict) and isinstance(parsed.get("improvements"), dict),
                 messages=[
-                    {"role": "system", "content": "You are an expert talent acquisition specialist with deep knowledge of effective job posting strategies."},
+                    {"role": "system", "content": JOB_IMPROVEMENT_SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
+                response_format=JSON_OBJECT_FORMAT,
                 temperature=0.3,
-                max_tokens=1500
+                max_tokens=1300
             )
             
-            result = response.choices[0].message.content
-            
-            # Clean and parse JSON
-            result = result.strip()
-            if result.startswith('```json'):
-                result = result[7:]
-            if result.endswith('```'):
-                result = result[:-3]
-            
-            return json.loads(result)
-            
         except Exception as e:
             logger.error(f"Error in job improvement suggestions: {str(e)}")
             return {"error": str(e)}
     
     def _calculate_job_confidence(self, job_data: Dict) -> float:
-        """Calculate confidence score for job analysis"""
-        total_fields = 0
-        filled_fields = 0
-        
-        # Check required skills
-        skills = job_data.get("required_skills", {})
-        total_fields += 6
-        filled_fields += sum(1 for v in skills.values() if v and len(v) > 0)
-        
-        # Check experience requirements
-        experience = job_data.get("experience_requirements", {})
-        total_fields += 4
-        filled_fields += sum(1 for v in experience.values() if v)
-        
-        # Check education requirements
-        education = job_data.get("education_requirements", {})
-        total_fields += 4
-        filled_fields += sum(1 for v in education.values() if v)
-        
-        # Check job analysis
-        analysis = job_data.get("job_analysis", {})
-        total_fields += 7
-        filled_fields += sum(1 for v in analysis.values() if v)
-        
-        return filled_fields / total_fields if total_fields > 0 else 0.0
+        """Calculate confidence score for job analysis (share of JOB_CONFIDENCE_FIELDS filled in)"""
+        return float(self._job_to_features(job_data).mean())
+    
+    def _job_to_features(self, job_data: Dict) -> np.ndarray:
+        """Boolean vector: which of the JOB_CONFIDENCE_FIELDS are filled in"""
+        return np.fromiter(
+            (bool((job_data.get(section) or {}).get(field)) for section, field in JOB_CONFIDENCE_FIELDS),
+            dtype=bool, count=len(JOB_CONFIDENCE_FIELDS)
+        )
+    
+    def batch_calculate_confidence(self, jobs: List[Dict]) -> np.ndarray:
+        """Confidence for many job analyses at once: one (J, 21) feature matrix reduced per row"""
+        if not jobs:
+            return np.zeros(0)
+        return np.vstack([self._job_to_features(job) for job in jobs]).mean(axis=1)
     
     def _fallback_job_analysis(self, job_description: str, job_title: str) -> Dict:
         """Fallback job analysis using basic text processing"""
         logger.info("Using fallback job analysis")
         
-        # Basic keyword extraction
-        programming_languages = []
-        frameworks = []
-        databases = []
-        
-        # Simple keyword matching
-        lang_keywords = ['python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'php', 'ruby', 'go', 'rust']
-        framework_keywords = ['react', 'angular', 'vue', 'django', 'flask', 'spring', 'express', 'laravel']
-        db_keywords = ['mysql', 'postgresql', 'mongodb', 'redis', 'sqlite', 'oracle']
-        
-        description_lower = job_description.lower()
-        
-        for lang in lang_keywords:
-            if lang in description_lower:
-                programming_languages.append(lang.title())
-        
-        for fw in framework_keywords:
-            if fw in description_lower:
-                frameworks.append(fw.title())
-        
-        for db in db_keywords:
-            if db in description_lower:
-                databases.append(db.title())
+        # Keyword extraction: one pass of the skill gazetteer pattern instead of a scan per keyword
+        skills = self._extract_skills(job_description)
         
         # Extract years of experience
-        years_match = re.search(r'(\d+)\+?\s*years?\s*(?:of\s*)?experience', description_lower)
+        years_match = YEARS_EXPERIENCE_RE.search(job_description.lower())
         min_years = int(years_match.group(1)) if years_match else 0
         
         return {
             "required_skills": {
-                "programming_languages": programming_languages,
-                "frameworks_libraries": frameworks,
-                "databases": databases,
-                "cloud_platforms": [],
-                "tools_technologies": [],
-                "soft_skills": []
+                category: [term.title() for term in skills.get(category, [])]
+                for category in SKILL_GAZETTEER
             },
             "experience_requirements": {
                 "minimum_years": min_years,
@@ -1043,10 +2101,21 @@ IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fi
     def _fallback_candidate_match(self, candidate_data: Dict, job_requirements: Dict) -> Dict:
         """Fallback candidate matching using basic comparison"""
         logger.info("Using fallback candidate matching")
+        parsed_data = candidate_data.get("parsed_data") or {}
+        
+        # Required skill coverage over gazetteer IDs; 50 when the job lists no known skill
+        candidate_skills = self._skill_vector(parsed_data.get("skills"))
+        job_skills = self._skill_vector(job_requirements.get("required_skills"))
+        coverage = self._skill_coverage(candidate_skills, job_skills)
+        skills_score = round(coverage) if coverage is not None else 50
         
-        # Basic compatibility calculation
-        skills_score = 50  # Default
-        experience_score = 50  # Default
+        # Years of experience against the job's minimum (either may be stored as a string)
+        years = candidate_years(candidate_data)
+        try:
+            minimum_years = float((job_requirements.get("experience_requirements") or {}).get("minimum_years") or 0)
+        except (TypeError, ValueError):
+            minimum_years = 0
+        experience_score = min(100, round(100 * years / minimum_years)) if minimum_years else 50
         education_score = 50  # Default
         
         overall_score = (skills_score + experience_score + education_score) / 3
@@ -1056,13 +2125,13 @@ IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fi
             "compatibility_breakdown": {
                 "skills_match": {
                     "score": skills_score,
-                    "matched_skills": [],
-                    "missing_skills": [],
-                    "bonus_skills": []
+                    "matched_skills": SKILL_TERMS[candidate_skills & job_skills].tolist(),
+                    "missing_skills": SKILL_TERMS[job_skills & ~candidate_skills].tolist(),
+                    "bonus_skills": SKILL_TERMS[candidate_skills & ~job_skills].tolist()
                 },
                 "experience_match": {
                     "score": experience_score,
-                    "years_comparison": "Analysis not available",
+                    "years_comparison": f"{years:g} years vs {minimum_years:g} required" if minimum_years else "Analysis not available",
                     "level_match": "Analysis not available",
                     "relevant_experience": []
                 },
@@ -1090,55 +2159,26 @@ IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fi
     def analyze_search_query(self, search_query: str) -> Dict:
         """Use AI to interpret natural language search queries and extract filters"""
         try:
-            prompt = f"""
-            Analyze this natural language search query for candidate search and extract relevant filters.
-            
-            Search Query: "{search_query}"
-            
-            Extract filters in JSON format:
-            {{
-                "extracted_filters": {{
-                    "min_experience": "number or null",
-                    "max_experience": "number or null", 
-                    "required_skills": ["list of skills mentioned"],
-                    "programming_languages": ["list of programming languages"],
-                    "frameworks": ["list of frameworks/libraries"],
-                    "job_titles": ["list of job titles or roles"],
-                    "education_level": "string or null",
-                    "location": "string or null",
-                    "salary_range": "string or null"
-                }},
-                "search_intent": "string describing what the user is looking for",
-                "confidence": "number 0-1 indicating confidence in interpretation",
-                "suggested_refinements": ["list of suggestions to refine the search"]
-            }}
-            
-            Examples:
-            - "Find Python developers with 3+ years" → min_experience: 3, programming_languages: ["Python"]
-            - "Senior React engineers in NYC" → required_skills: ["React"], job_titles: ["Senior Engineer"], location: "NYC"
-            - "Full stack developers with Django experience" → required_skills: ["Django"], job_titles: ["Full Stack Developer"]
-            """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-4",
+            # Semantic cache: paraphrases of an earlier query get its filters without a GPT call
+            embedding, cached = self._semantic_query_lookup("search_query", search_query)
+            if cached is not None:
+                logger.info("Using cached interpretation of a similar search query")
+                return cached
+            
+            # COST OPTIMIZATION: gpt-4o-mini first, gpt-4o only for malformed or low-confidence interpretations
+            interpretation = self._routed_chat_json(
+                "search",
+                self._is_confident_interpretation,
                 messages=[
-                    {"role": "system", "content": "You are an expert search query interpreter for recruitment systems."},
-                    {"role": "user", "content": prompt}
+                    {"role": "system", "content": SEARCH_QUERY_SYSTEM_PROMPT},
+                    {"role": "user", "content": SEARCH_QUERY_TEMPLATE.substitute(query=search_query)}
                 ],
-                temperature=0.1,
-                max_tokens=800
+                response_format=JSON_OBJECT_FORMAT,
+                temperature=CACHEABLE_TEMPERATURE,
+                max_tokens=700
             )
-            
-            result = response.choices[0].message.content
-            
-            # Clean and parse JSON
-            result = result.strip()
-            if result.startswith('```json'):
-                result = result[7:]
-            if result.endswith('```'):
-                result = result[:-3]
-            
-            return json.loads(result)
+            self._semantic_query_store("search_query", search_query, embedding, interpretation)
+            return interpretation
             
         except Exception as e:
             logger.error(f"Error in search query analysis: {str(e)}")
@@ -1149,6 +2189,15 @@ IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fi
                 "suggested_refinements": ["Please try a more specific search"]
             }
 
+    def _is_confident_interpretation(self, interpretation: Dict) -> bool:
+        """Whether a search query interpretation is well-formed and confident enough to keep"""
+        if not isinstance(interpretation, dict) or not isinstance(interpretation.get("extracted_filters"), dict):
+            return False
+        try:
+            return float(interpretation.get("confidence", 0)) >= ROUTER_MIN_CONFIDENCE
+        except (TypeError, ValueError):
+            return False
+
     def process_conversational_search(self, user_message: str, conversation_history: List[Dict], context: Dict) -> Dict:
         """Process conversational search queries with intelligent responses - OPTIMIZED for token efficiency"""
         try:
@@ -1156,28 +2205,36 @@ IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fi
             from database import Database
             db = Database()
             
+            # Handler work started while the intent was still streaming (see _prefetch_handler)
+            prefetched = {}
+            
             # OPTIMIZATION 1: Check if this is a simple search query
             if self._is_simple_search_query(user_message):
                 logger.info("OPTIMIZATION: Using rule-based intent detection (no AI call)")
                 query_analysis = self._rule_based_intent_detection(user_message)
             else:
-                # OPTIMIZATION 2: Check cache first for complex queries
-                cache_key = hash(user_message.lower())
-                if cache_key in self._intent_cache:
+                # OPTIMIZATION 2: Check cache first for complex queries (stable key, survives restarts)
+                cache_key = self._cache_key(f"intent:{self._canonical_query(user_message)}")
+                query_analysis = self._intent_cache.get(cache_key) or self._intent_store.get(cache_key)
+                if query_analysis is not None:
                     logger.info("OPTIMIZATION: Using cached intent analysis")
-                    query_analysis = self._intent_cache[cache_key]
+                    self._intent_cache[cache_key] = query_analysis
                 else:
                     # Build minimal conversation context (only last 2 messages)
                     conversation_context = ""
                     if conversation_history:
                         for msg in conversation_history[-2:]:  # Reduced from 5 to 2 messages
                             role = msg.get('role', 'user')
-                            content = msg.get('content', '')[:100]  # Truncate to 100 chars
+                            content = self._truncate_to_tokens(msg.get('content') or '', HISTORY_MESSAGE_TOKEN_LIMIT)
                             conversation_context += f"{role}: {content}\n"
                     
-                    query_analysis = self._analyze_conversational_intent(user_message, conversation_context)
+                    query_analysis = self._analyze_conversational_intent(
+                        user_message, conversation_context,
+                        on_query_type=lambda query_type: self._prefetch_handler(query_type, user_message, prefetched)
+                    )
                     # Cache the result
                     self._intent_cache[cache_key] = query_analysis
+                    self._intent_store.set(cache_key, query_analysis, expire=CHAT_CACHE_TTL_SECONDS)
             
             response_data = {
                 "message": user_message,
@@ -1197,7 +2254,9 @@ IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fi
             elif query_analysis.get("query_type") == "analysis":
                 response_data = self._handle_analysis_query(user_message, query_analysis, db)
             elif query_analysis.get("query_type") == "search":
-                response_data = self._handle_search_query_optimized(user_message, query_analysis, db)
+                response_data = self._handle_search_query_optimized(
+                    user_message, query_analysis, db, search_analysis=prefetched.get("search_analysis")
+                )
             else:
                 response_data = self._handle_general_query(user_message, query_analysis, db)
             
@@ -1216,57 +2275,52 @@ IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fi
                 "error": str(e)
             }
 
-    def _analyze_conversational_intent(self, user_message: str, conversation_context: str) -> Dict:
-        """Analyze the intent and type of conversational query"""
+    def _prefetch_handler(self, query_type: str, user_message: str, prefetched: Dict):
+        """Start the AI work of the handler for query_type in the background, keyed into prefetched"""
+        if query_type == "search" and not self._is_simple_search_query(user_message):
+            prefetched["search_analysis"] = self._prefetch_pool.submit(self.analyze_search_query, user_message)
+    
+    def _query_type_watcher(self, on_query_type):
+        """Stream callback that reports query_type once it appears in the partial intent JSON"""
+        state = {"buffer": "", "reported": False}
+        
+        def on_delta(text: str):
+            if state["reported"]:
+                return
+            state["buffer"] += text
+            match = QUERY_TYPE_RE.search(state["buffer"])
+            if match:
+                state["reported"] = True
+                on_query_type(match.group(1))
+        
+        return on_delta
+
+    def _analyze_conversational_intent(self, user_message: str, conversation_context: str, on_query_type=None) -> Dict:
+        """Analyze the intent and type of conversational query; on_query_type(query_type) fires as soon as it streams in"""
         try:
-            prompt = f"""
-            Analyze this conversational query about candidate search and determine the intent and type.
-            
-            Conversation Context:
-            {conversation_context}
-            
-            Current Message: "{user_message}"
-            
-            Determine the query type and extract relevant information. Return JSON:
-            {{
-                "query_type": "search|comparison|analysis|recommendation|general",
-                "intent": "detailed description of what user wants",
-                "entities": {{
-                    "skills": ["list of skills mentioned"],
-                    "experience_level": "junior|mid|senior|executive",
-                    "locations": ["list of locations"],
-                    "comparison_criteria": "skills|experience|education|overall",
-                    "candidate_count": "number of candidates to find/compare"
-                }},
-                "action_required": "search|compare|analyze|recommend|explain",
-                "confidence": 0.95
-            }}
-            
-            Query Type Examples:
-            - "Find Python developers" → search
-            - "Compare these two candidates" → comparison  
-            - "What makes a good React developer?" → analysis
-            - "Who should I hire for this role?" → recommendation
-            - "Tell me about candidate skills" → general
-            """
+            # Semantic cache only applies without context, where the message alone decides the intent
+            embedding, cached = (None, None) if conversation_context else self._semantic_query_lookup("intent", user_message)
+            if cached is not None:
+                logger.info("Using cached intent of a similar message")
+                return cached
             
-            response = self.client.chat.completions.create(
+            prompt = CONVERSATIONAL_INTENT_TEMPLATE.substitute(context=conversation_context, message=user_message)
+            
+            result = self._cached_chat(
+                on_delta=self._query_type_watcher(on_query_type) if on_query_type else None,
                 model="gpt-3.5-turbo",
                 messages=[
-                    {"role": "system", "content": "You are an expert at understanding recruitment conversations and search intents."},
+                    {"role": "system", "content": CONVERSATIONAL_INTENT_SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
-                temperature=0.1,
-                max_tokens=400
+                response_format=JSON_OBJECT_FORMAT,
+                temperature=CACHEABLE_TEMPERATURE,
+                max_tokens=350
             )
             
-            result = response.choices[0].message.content.strip()
-            if result.startswith('```json'):
-                result = result[7:]
-            if result.endswith('```'):
-                result = result[:-3]
-            
-            return json.loads(result)
+            intent = self._parse_json_response(result)
+            self._semantic_query_store("intent", user_message, embedding, intent)
+            return intent
             
         except Exception as e:
             logger.error(f"Error analyzing conversational intent: {str(e)}")
@@ -1279,7 +2333,12 @@ IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fi
             }
 
     def _create_lightweight_candidate_summary(self, candidate: Dict) -> Dict:
-        """Create a lightweight summary of candidate for chat responses"""
+        """Lightweight summary of candidate for chat responses, read from the row when stored at ingest"""
+        # PERFORMANCE OPTIMIZATION: Summaries are normalized once at write time; only legacy rows are walked here
+        return candidate.get("summary") or self.build_candidate_summary(candidate)
+
+    def build_candidate_summary(self, candidate: Dict) -> Dict:
+        """Normalize a candidate into the flat summary row persisted alongside the resume"""
         try:
             parsed_data = candidate.get("parsed_data", {})
             ranking_score = candidate.get("ranking_score", {})
@@ -1416,24 +2475,35 @@ IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fi
             logger.error(f"Error extracting education: {str(e)}")
             return "Not specified"
 
-    def _handle_search_query_optimized(self, user_message: str, query_analysis: Dict, db) -> Dict:
+    def _handle_search_query_optimized(self, user_message: str, query_analysis: Dict, db,
+                                       search_analysis: Optional[Future] = None) -> Dict:
         """Handle search-type conversational queries - optimized for token efficiency"""
         try:
+            # Repeat searches against an unchanged candidate pool reuse the previous result
+            pool_version = db.get_pool_version()
+            self._sync_skill_indexes(pool_version)
+            cache_key = (self._canonical_query(user_message), pool_version)
+            cached = self._search_results.get(cache_key) if pool_version is not None else None
+            if cached is not None:
+                logger.info("Using cached search result")
+                return {**cached, "message": user_message, "intent": query_analysis.get("intent", "")}
+            
             # OPTIMIZATION 3: Skip expensive AI search analysis for simple queries
             if self._is_simple_search_query(user_message):
                 # Use simple rule-based filter extraction
                 filters = self._extract_filters_simple(user_message)
                 logger.info("OPTIMIZATION: Using simple filter extraction (no AI call)")
             else:
-                # Only use AI for complex search analysis
-                search_analysis = self.analyze_search_query(user_message)
+                # Only use AI for complex search analysis (possibly already started while the intent streamed)
+                search_analysis = search_analysis.result() if search_analysis else self.analyze_search_query(user_message)
                 filters = search_analysis.get("extracted_filters", {})
             
             # Perform the search
             all_candidates = db.search_candidates(user_message, filters)
             
             # Perform intelligent skill-specific ranking (this is efficient, no AI)
-            ranked_candidates = self._intelligent_skill_ranking(all_candidates, user_message, filters)
+            # Only the first 10 are shown, so only they need to be fully ordered
+            ranked_candidates = self._intelligent_skill_ranking(all_candidates, user_message, filters, top_k=10)
             
             # Create lightweight summaries for chat response
             lightweight_candidates = [
@@ -1441,17 +2511,20 @@ IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fi
                 for candidate in ranked_candidates[:10]
             ]
             
+            # One columnar projection of the ranked results feeds every response/insight helper below
+            ranked_pool = CandidatePool(ranked_candidates)
+            
             # OPTIMIZATION 4: Generate simple response instead of AI response for basic searches
             if self._is_simple_search_query(user_message):
                 ai_response = self._generate_simple_search_response(user_message, ranked_candidates, filters)
-                insights = self._generate_simple_insights(ranked_candidates)
+                insights = self._generate_simple_insights(ranked_pool)
                 logger.info("OPTIMIZATION: Using simple response generation (no AI call)")
             else:
                 # Only use AI for complex response generation
-                ai_response = self._generate_search_response(user_message, ranked_candidates, filters)
-                insights = self._generate_search_insights(ranked_candidates, filters)
+                ai_response = self._generate_search_response(user_message, ranked_pool, filters)
+                insights = self._generate_search_insights(ranked_pool, filters)
             
-            return {
+            result = {
                 "message": user_message,
                 "query_type": "search",
                 "intent": query_analysis.get("intent", ""),
@@ -1467,6 +2540,9 @@ IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fi
                     "Do you want to see candidates from a particular location?"
                 ]
             }
+            if pool_version is not None:
+                self._search_results[cache_key] = result
+            return result
             
         except Exception as e:
             logger.error(f"Error handling search query: {str(e)}")
@@ -1478,25 +2554,15 @@ IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fi
         message_lower = user_message.lower()
         
         # Extract experience requirements
-        import re
-        exp_match = re.search(r'(\d+)\+?\s*years?', message_lower)
+        exp_match = YEARS_RE.search(message_lower)
         if exp_match:
             years = int(exp_match.group(1))
             filters["min_experience"] = years
         
-        # Extract programming languages and frameworks
-        tech_skills = []
-        skill_keywords = {
-            'python': 'Python', 'java': 'Java', 'javascript': 'JavaScript', 'js': 'JavaScript',
-            'typescript': 'TypeScript', 'react': 'React', 'angular': 'Angular', 'vue': 'Vue',
-            'node': 'Node.js', 'nodejs': 'Node.js', 'django': 'Django', 'flask': 'Flask',
-            'spring': 'Spring', 'sql': 'SQL', 'mysql': 'MySQL', 'postgresql': 'PostgreSQL',
-            'mongodb': 'MongoDB', 'aws': 'AWS', 'azure': 'Azure', 'docker': 'Docker'
-        }
-        
-        for keyword, skill_name in skill_keywords.items():
-            if keyword in message_lower:
-                tech_skills.append(skill_name)
+        # Extract programming languages and frameworks (one pass, whole words only so "java" doesn't hit "javascript")
+        tech_skills = list(dict.fromkeys(
+            FILTER_SKILL_KEYWORDS[match.group(1)] for match in FILTER_SKILL_RE.finditer(message_lower)
+        ))
         
         if tech_skills:
             filters["programming_languages"] = tech_skills
@@ -1527,23 +2593,19 @@ IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fi
         
         return response
     
-    def _generate_simple_insights(self, candidates: List[Dict]) -> List[str]:
+    def _generate_simple_insights(self, pool: CandidatePool) -> List[str]:
         """Generate simple insights without AI"""
         insights = []
         
-        if not candidates:
+        if not pool.candidates:
             return ["No matching candidates found"]
         
         try:
-            # Count candidates with different experience levels
-            def get_experience_years(candidate):
-                exp_data = candidate.get("parsed_data", {}).get("experience", {})
-                years = exp_data.get("total_years") or exp_data.get("years_experience") or 0
-                return years if isinstance(years, (int, float)) and years is not None else 0
-            
-            junior_count = sum(1 for c in candidates if get_experience_years(c) <= 2)
-            mid_count = sum(1 for c in candidates if 3 <= get_experience_years(c) <= 5)
-            senior_count = sum(1 for c in candidates if get_experience_years(c) > 5)
+            # Vectorized tier counts over the pool's years column
+            years = pool.years
+            junior_count = int(np.count_nonzero(years <= 2))
+            mid_count = int(np.count_nonzero((years >= 3) & (years <= 5)))
+            senior_count = int(np.count_nonzero(years > 5))
             
             if senior_count > 0:
                 insights.append(f"{senior_count} senior candidates (5+ years experience)")
@@ -1553,13 +2615,7 @@ IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fi
                 insights.append(f"{junior_count} junior candidates (0-2 years experience)")
             
             # Quality insights
-            def get_score(candidate):
-                score = candidate.get("ranking_score", {}).get("total_score")
-                if score is None:
-                    return 0
-                return score if isinstance(score, (int, float)) else 0
-            
-            high_quality = sum(1 for c in candidates if get_score(c) > 70)
+            high_quality = int(np.count_nonzero(pool.scores > 70))
             if high_quality > 0:
                 insights.append(f"{high_quality} high-quality candidates (70+ score)")
                 
@@ -1569,8 +2625,12 @@ IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fi
         
         return insights
 
-    def _intelligent_skill_ranking(self, candidates: List[Dict], query: str, filters: Dict, use_ai_enhancement: bool = False) -> List[Dict]:
-        """Perform intelligent skill-specific ranking based on depth of experience"""
+    def _intelligent_skill_ranking(self, candidates: List[Dict], query: str, filters: Dict, use_ai_enhancement: bool = False,
+                                   top_k: Optional[int] = None) -> List[Dict]:
+        """
+        Perform intelligent skill-specific ranking based on depth of experience.
+        With top_k, only the best top_k are ordered (heap selection); the rest follow unordered, so counts stay complete.
+        """
         try:
             # Extract target skills from query and filters
             target_skills = []
@@ -1582,135 +2642,79 @@ IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fi
             if not target_skills:
                 query_lower = query.lower()
                 
-                # Role-based skill mapping
-                role_to_skills = {
-                    # Frontend roles
-                    'frontend': ['React', 'Angular', 'Vue', 'JavaScript', 'TypeScript', 'HTML', 'CSS'],
-                    'front-end': ['React', 'Angular', 'Vue', 'JavaScript', 'TypeScript', 'HTML', 'CSS'],
-                    'front end': ['React', 'Angular', 'Vue', 'JavaScript', 'TypeScript', 'HTML', 'CSS'],
-                    'ui developer': ['React', 'Angular', 'Vue', 'JavaScript', 'TypeScript', 'HTML', 'CSS'],
-                    'react developer': ['React', 'JavaScript', 'TypeScript', 'HTML', 'CSS'],
-                    'angular developer': ['Angular', 'TypeScript', 'JavaScript', 'HTML', 'CSS'],
-                    'vue developer': ['Vue', 'JavaScript', 'TypeScript', 'HTML', 'CSS'],
-                    
-                    # Backend roles
-                    'backend': ['Python', 'Java', 'Node.js', 'Express', 'Django', 'Flask', 'Spring'],
-                    'back-end': ['Python', 'Java', 'Node.js', 'Express', 'Django', 'Flask', 'Spring'],
-                    'back end': ['Python', 'Java', 'Node.js', 'Express', 'Django', 'Flask', 'Spring'],
-                    'api developer': ['Python', 'Java', 'Node.js', 'Express', 'Django', 'Flask', 'Spring'],
-                    'python developer': ['Python', 'Django', 'Flask', 'FastAPI'],
-                    'java developer': ['Java', 'Spring', 'Spring Boot'],
-                    'node developer': ['Node.js', 'Express', 'JavaScript', 'TypeScript'],
-                    
-                    # Full stack roles
-                    'fullstack': ['React', 'Angular', 'Vue', 'JavaScript', 'Python', 'Java', 'Node.js'],
-                    'full-stack': ['React', 'Angular', 'Vue', 'JavaScript', 'Python', 'Java', 'Node.js'],
-                    'full stack': ['React', 'Angular', 'Vue', 'JavaScript', 'Python', 'Java', 'Node.js'],
-                    
-                    # Data roles
-                    'data scientist': ['Python', 'R', 'SQL', 'Pandas', 'NumPy', 'Scikit-learn', 'TensorFlow'],
-                    'data analyst': ['Python', 'R', 'SQL', 'Tableau', 'Power BI', 'Pandas'],
-                    'machine learning': ['Python', 'R', 'TensorFlow', 'PyTorch', 'Scikit-learn'],
-                    'ml engineer': ['Python', 'TensorFlow', 'PyTorch', 'Scikit-learn', 'Docker', 'Kubernetes'],
-                    
-                    # Database roles
-                    'database': ['SQL', 'MySQL', 'PostgreSQL', 'MongoDB', 'Redis'],
-                    'dba': ['SQL', 'MySQL', 'PostgreSQL', 'Oracle'],
-                    'database administrator': ['SQL', 'MySQL', 'PostgreSQL', 'Oracle'],
-                    
-                    # DevOps roles
-                    'devops': ['Docker', 'Kubernetes', 'AWS', 'Azure', 'Jenkins', 'Git'],
-                    'cloud engineer': ['AWS', 'Azure', 'Google Cloud', 'Docker', 'Kubernetes'],
-                    'sre': ['Docker', 'Kubernetes', 'AWS', 'Azure', 'Python', 'Go'],
-                    
-                    # Mobile roles
-                    'mobile developer': ['React Native', 'Flutter', 'Swift', 'Kotlin', 'Java'],
-                    'ios developer': ['Swift', 'Objective-C', 'Xcode'],
-                    'android developer': ['Kotlin', 'Java', 'Android Studio'],
-                }
-                
                 # Check for role-based skills first
-                for role, skills in role_to_skills.items():
-                    if role in query_lower:
-                        target_skills.extend(skills)
-                        logger.info(f"DEBUG: Detected role '{role}', mapping to skills: {skills}")
-                        break
+                role_match = ROLE_RE.search(query_lower)
+                if role_match:
+                    role = role_match.group(1)
+                    target_skills.extend(ROLE_SKILLS[role])
+                    logger.debug("Detected role '%s', mapping to skills: %s", role, ROLE_SKILLS[role])
                 
                 # If no role detected, check for specific technology skills
                 if not target_skills:
-                    common_skills = {
-                        # Programming languages
-                        'python': 'Python', 'java': 'Java', 'javascript': 'JavaScript', 'typescript': 'TypeScript', 
-                        'c++': 'C++', 'c#': 'C#', 'php': 'PHP', 'ruby': 'Ruby', 'go': 'Go', 'rust': 'Rust',
-                        # Frontend frameworks
-                        'react': 'React', 'angular': 'Angular', 'vue': 'Vue', 'svelte': 'Svelte',
-                        # Backend frameworks
-                        'django': 'Django', 'flask': 'Flask', 'spring': 'Spring', 'express': 'Express', 'laravel': 'Laravel',
-                        # Databases
-                        'mysql': 'MySQL', 'postgresql': 'PostgreSQL', 'mongodb': 'MongoDB', 'redis': 'Redis', 
-                        'sql': 'SQL', 'nosql': 'NoSQL',
-                        # Cloud platforms
-                        'aws': 'AWS', 'azure': 'Azure', 'gcp': 'Google Cloud', 'docker': 'Docker', 'kubernetes': 'Kubernetes',
-                        # Data science
-                        'machine learning': 'Machine Learning', 'ml': 'Machine Learning', 'ai': 'Artificial Intelligence',
-                        'data science': 'Data Science', 'pandas': 'Pandas', 'numpy': 'NumPy'
-                    }
-                    
-                    for skill_key, skill_name in common_skills.items():
-                        if skill_key in query_lower:
-                            target_skills.append(skill_name)
-                            logger.info(f"DEBUG: Detected specific skill: {skill_name}")
+                    for match in QUERY_SKILL_RE.finditer(query_lower):
+                        skill_name = QUERY_SKILLS[match.group(1)]
+                        target_skills.append(skill_name)
+                        logger.debug("Detected specific skill: %s", skill_name)
                 
-                # Remove duplicates while preserving order
-                target_skills = list(dict.fromkeys(target_skills))
+                # Remove duplicates while preserving order, and keep only the leading (core) skills of
+                # broad roles; explicit skills from filters are never capped
+                target_skills = list(dict.fromkeys(target_skills))[:MAX_INFERRED_TARGET_SKILLS]
             
             if not target_skills:
                 # No specific skills to rank by, return original order
                 logger.info(f"No target skills found for query: {query}")
                 return candidates
             
-            logger.info(f"DEBUG: Ranking candidates for skills: {target_skills} (AI enhancement: {use_ai_enhancement})")
-            
-            # Score each candidate based on skill depth
-            scored_candidates = []
-            for candidate in candidates:
+            logger.debug("Ranking candidates for skills: %s (AI enhancement: %s)", target_skills, use_ai_enhancement)
+            
+            debug = logger.isEnabledFor(logging.DEBUG)
+            
+            # Score each candidate based on skill depth (skill presence resolved for the whole pool at once).
+            # Scores are set on the candidate dicts in place: they are fresh per request, and copying all N
+            # only to display the top few is wasted work
+            depth_scores = self._calculate_skill_depth_score_batch(candidates, target_skills)
+            # AI analyses for every borderline candidate run concurrently, so the wait is a few round trips, not N x K
+            borderline = [
+                candidate for candidate, skill_score in zip(candidates, depth_scores)
+                if self._needs_ai_skill_analysis(skill_score, target_skills)
+            ] if use_ai_enhancement else []
+            ai_analyses = self._run_async(self._pool_ai_skill_analyses(borderline, target_skills)) if borderline else None
+            for candidate, skill_score in zip(candidates, depth_scores):
                 if use_ai_enhancement:
-                    skill_score = self._calculate_hybrid_skill_score(candidate, target_skills, use_ai=True)
-                else:
-                    skill_score = self._calculate_skill_depth_score(candidate, target_skills)
-                
-                candidate_copy = candidate.copy()
-                candidate_copy['skill_relevance_score'] = skill_score
+                    skill_score = self._calculate_hybrid_skill_score(candidate, target_skills, use_ai=True,
+                                                                     ai_analyses=ai_analyses, enhanced_score=skill_score)
                 
-                # Log candidate skill analysis for debugging
-                name = candidate.get("parsed_data", {}).get("personal_info", {}).get("full_name", "Unknown")
-                base_score = candidate.get("ranking_score", {}).get("total_score", 0)
-                logger.info(f"DEBUG: {name}: Skill score = {skill_score:.1f}, Base score = {base_score}")
+                candidate['skill_relevance_score'] = skill_score
                 
-                scored_candidates.append(candidate_copy)
+                # Log candidate skill analysis for debugging (skipped entirely unless DEBUG is on)
+                if debug:
+                    name = candidate.get("parsed_data", {}).get("personal_info", {}).get("full_name", "Unknown")
+                    base_score = candidate.get("ranking_score", {}).get("total_score", 0)
+                    logger.debug(f"{name}: Skill score = {skill_score:.1f}, Base score = {base_score}")
             
             # Filter out candidates with very low skill relevance (less than 10 points)
             # This ensures we only show candidates who actually have some of the target skills
-            relevant_candidates = [c for c in scored_candidates if c.get('skill_relevance_score', 0) >= 10]
+            relevant_candidates = [c for c in candidates if c.get('skill_relevance_score', 0) >= 10]
             
             # If no candidates meet the skill threshold, return top candidates by general score
             if not relevant_candidates:
-                logger.warning(f"DEBUG: No candidates found with relevant skills for: {target_skills}")
+                logger.warning(f"No candidates found with relevant skills for: {target_skills}")
                 # Return candidates sorted by general score but with low skill relevance noted
-                for candidate in scored_candidates:
+                for candidate in candidates:
                     candidate['skill_relevance_score'] = 0
-                return sorted(scored_candidates, key=lambda x: x.get("ranking_score", {}).get("total_score", 0), reverse=True)
+                return self._top_first(candidates, top_k, lambda x: x.get("ranking_score", {}).get("total_score", 0))
             
             # Sort by skill relevance score (descending)
-            relevant_candidates.sort(key=lambda x: x.get('skill_relevance_score', 0), reverse=True)
+            relevant_candidates = self._top_first(relevant_candidates, top_k, lambda x: x.get('skill_relevance_score', 0))
             
-            logger.info(f"DEBUG: Filtered to {len(relevant_candidates)} relevant candidates out of {len(candidates)} total")
+            logger.debug("Filtered to %d relevant candidates out of %d total", len(relevant_candidates), len(candidates))
             
             # Log final ranking
-            for i, candidate in enumerate(relevant_candidates[:3]):
-                name = candidate.get("parsed_data", {}).get("personal_info", {}).get("full_name", "Unknown")
-                skill_score = candidate.get('skill_relevance_score', 0)
-                logger.info(f"DEBUG: Final rank #{i+1}: {name} with skill score {skill_score:.1f}")
+            if debug:
+                for i, candidate in enumerate(relevant_candidates[:3]):
+                    name = candidate.get("parsed_data", {}).get("personal_info", {}).get("full_name", "Unknown")
+                    skill_score = candidate.get('skill_relevance_score', 0)
+                    logger.debug(f"Final rank #{i+1}: {name} with skill score {skill_score:.1f}")
             
             return relevant_candidates
             
@@ -1718,93 +2722,58 @@ IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fi
             logger.error(f"Error in intelligent skill ranking: {str(e)}")
             return candidates
 
-    def _calculate_skill_depth_score(self, candidate: Dict, target_skills: List[str]) -> float:
+    def _calculate_skill_depth_score_batch(self, candidates: List[Dict], target_skills: List[str]) -> List[float]:
+        """Skill depth score of every candidate, with skill presence resolved for the whole pool in one pass"""
+        presence = self._batch_skill_presence(CandidatePool(candidates), target_skills)
+        return [
+            self._calculate_skill_depth_score(candidate, target_skills, presence_scores) if presence_scores
+            # None of the target skills: every skill sub-score is 0, only the experience bonus counts
+            else self._experience_bonus(candidate)
+            for candidate, presence_scores in zip(candidates, presence)
+        ]
+
+    def _calculate_skill_depth_score(self, candidate: Dict, target_skills: List[str], presence_scores: Optional[Dict[str, int]] = None) -> float:
         """Calculate skill depth score based on skill matches, project experience, work history, and certifications"""
         try:
             parsed_data = candidate.get("parsed_data", {})
-            skills_data = parsed_data.get("skills", {})
-            base_score = candidate.get("ranking_score", {}).get("total_score", 0)
-            if base_score is None:
-                base_score = 0
-            
-            # Get candidate name for debugging
-            candidate_name = parsed_data.get("personal_info", {}).get("full_name", "Unknown")
-            
-            # Extract all skills from candidate
-            all_skills = []
             
-            # Programming languages
-            prog_langs = skills_data.get("programming_languages", [])
-            if prog_langs and isinstance(prog_langs, list):
-                all_skills.extend([skill for skill in prog_langs if skill and isinstance(skill, str)])
-            
-            # Frameworks and libraries
-            frameworks = skills_data.get("frameworks_libraries", [])
-            if frameworks and isinstance(frameworks, list):
-                all_skills.extend([skill for skill in frameworks if skill and isinstance(skill, str)])
-            
-            # Technical skills
-            tech_skills = skills_data.get("technical_skills", [])
-            if tech_skills and isinstance(tech_skills, list):
-                all_skills.extend([skill for skill in tech_skills if skill and isinstance(skill, str)])
-            
-            # Database skills
-            db_skills = skills_data.get("databases", [])
-            if db_skills and isinstance(db_skills, list):
-                all_skills.extend([skill for skill in db_skills if skill and isinstance(skill, str)])
-            
-            # Cloud platforms
-            cloud_skills = skills_data.get("cloud_platforms", [])
-            if cloud_skills and isinstance(cloud_skills, list):
-                all_skills.extend([skill for skill in cloud_skills if skill and isinstance(skill, str)])
-            
-            # Tools and technologies
-            tools_skills = skills_data.get("tools_technologies", [])
-            if tools_skills and isinstance(tools_skills, list):
-                all_skills.extend([skill for skill in tools_skills if skill and isinstance(skill, str)])
-            
-            logger.info(f"DEBUG: {candidate_name} has skills: {all_skills}")
+            # Per-skill breakdown logging is per candidate, so it's only built when DEBUG is on
+            debug = logger.isEnabledFor(logging.DEBUG)
+            candidate_name = parsed_data.get("personal_info", {}).get("full_name", "Unknown") if debug else None
             
             # Calculate skill matches with depth analysis
             total_skill_score = 0
             skill_analysis = {}
             
-            for target_skill in target_skills:
-                if not target_skill or not isinstance(target_skill, str):
-                    continue
-                    
+            # 1. Check for basic skill presence first (20 points max): it's the cheapest check and
+            # absent skills earn nothing from the other sub-scores
+            if presence_scores is None:
+                presence_scores = self._batch_skill_presence(CandidatePool([candidate]), target_skills)[0]
+            if debug:
+                logger.debug(f"{candidate_name} has target skills: {presence_scores}")
+            
+            # Positions, projects and certifications are only scanned when some target skill is present,
+            # once per field for the present skills rather than once per skill per field
+            work_scores = project_scores = certification_scores = {}
+            if presence_scores:
+                matcher = _target_skill_matcher(tuple(dict.fromkeys(skill.lower() for skill in presence_scores)))
+                work_scores = self._calculate_work_experience_score(parsed_data, matcher)
+                project_scores = self._calculate_project_experience_score(parsed_data, matcher)
+                certification_scores = self._calculate_certification_score(parsed_data, matcher)
+            
+            for target_skill, skill_depth_score in presence_scores.items():
                 target_lower = target_skill.lower()
-                skill_depth_score = 0
-                
-                # 1. Check for basic skill presence (20 points max)
-                skill_present = False
-                for candidate_skill in all_skills:
-                    if not candidate_skill:
-                        continue
-                    candidate_lower = candidate_skill.lower()
-                    
-                    if candidate_lower == target_lower:
-                        skill_depth_score += 20  # Exact match
-                        skill_present = True
-                        break
-                    elif self._is_meaningful_partial_match(target_lower, candidate_lower):
-                        skill_depth_score += 10  # Partial match
-                        skill_present = True
-                        break
-                
-                if not skill_present:
-                    continue  # Skip if skill not found
                 
                 # 2. Analyze work experience with this skill (30 points max)
-                work_experience_score = self._calculate_work_experience_score(parsed_data, target_skill)
+                work_experience_score = work_scores.get(target_lower, 0)
                 skill_depth_score += work_experience_score
                 
                 # 3. Analyze project experience with this skill (25 points max)
-                project_score = self._calculate_project_experience_score(parsed_data, target_skill)
+                project_score = project_scores.get(target_lower, 0)
                 skill_depth_score += project_score
                 
                 # 4. Check for relevant certifications (15 points max)
-                certification_score = self._calculate_certification_score(parsed_data, target_skill)
+                certification_score = certification_scores.get(target_lower, 0)
                 skill_depth_score += certification_score
                 
                 # 5. Check education relevance (10 points max)
@@ -1820,19 +2789,17 @@ IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fi
                     "education": education_score
                 }
                 
-                logger.info(f"DEBUG: {candidate_name} - {target_skill} depth score: {skill_depth_score:.1f} (work: {work_experience_score:.1f}, projects: {project_score:.1f}, certs: {certification_score:.1f}, edu: {education_score:.1f})")
+                if debug:
+                    logger.debug(f"{candidate_name} - {target_skill} depth score: {skill_depth_score:.1f} (work: {work_experience_score:.1f}, projects: {project_score:.1f}, certs: {certification_score:.1f}, edu: {education_score:.1f})")
             
             # Add overall experience bonus (10 points max)
-            experience_data = parsed_data.get("experience", {})
-            total_experience = experience_data.get("total_years", 0) if experience_data else 0
-            if total_experience is None:
-                total_experience = 0
-            experience_bonus = min(total_experience * 1, 10)  # 1 point per year, max 10
+            experience_bonus = self._experience_bonus(candidate)
             
             final_score = total_skill_score + experience_bonus
             
-            logger.info(f"DEBUG: {candidate_name} - Final skill depth score: {final_score:.1f} (skills: {total_skill_score:.1f}, exp_bonus: {experience_bonus:.1f})")
-            logger.info(f"DEBUG: {candidate_name} - Skill analysis: {skill_analysis}")
+            if debug:
+                logger.debug(f"{candidate_name} - Final skill depth score: {final_score:.1f} (skills: {total_skill_score:.1f}, exp_bonus: {experience_bonus:.1f})")
+                logger.debug(f"{candidate_name} - Skill analysis: {skill_analysis}")
             
             return final_score
             
@@ -1840,116 +2807,155 @@ IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fi
             logger.error(f"Error calculating skill depth score: {str(e)}")
             return 0
 
-    def _calculate_work_experience_score(self, parsed_data: Dict, target_skill: str) -> float:
-        """Calculate score based on work experience with the target skill"""
+    def _target_skills_in(self, texts, matcher) -> set:
+        """Target skills mentioned anywhere in texts, in a single pattern scan"""
+        if isinstance(texts, str):
+            texts = [texts]
+        elif not isinstance(texts, list):
+            return set()
+        pattern, covers = matcher
+        found = set()
+        for match in pattern.finditer("\n".join(text for text in texts if text and isinstance(text, str)).lower()):
+            found |= covers[match.group(1)]
+        return found
+
+    def _experience_bonus(self, candidate: Dict) -> float:
+        """Overall experience bonus of the skill depth score: 1 point per year, max 10"""
+        return min(candidate_years(candidate), 10)
+
+    def _top_first(self, items: List[Dict], top_k: Optional[int], key) -> List[Dict]:
+        """Items sorted by key descending; with top_k, only the top_k are sorted (O(N log K)) and the rest keep input order"""
+        if top_k is None or top_k >= len(items):
+            return sorted(items, key=key, reverse=True)
+        top = heapq.nlargest(top_k, items, key=key)
+        chosen = {id(item) for item in top}
+        return top + [item for item in items if id(item) not in chosen]
+
+    def _batch_skill_presence(self, pool: CandidatePool, target_skills: List[str]) -> List[Dict[str, int]]:
+        """
+        Presence points per target skill for every candidate (20 exact or alias, 10 meaningful partial match).
+        Works on the pool's (candidates x skills) boolean matrix, so partial matching runs per distinct skill
+        rather than per candidate, and only on the skills the trie finds related to the target.
+        """
+        matrix, skill_ids = pool.skill_flags(self._skill_index)
+        count = len(pool.candidates)
+        trie = SkillTrie(skill_ids)
+        
+        targets = [skill for skill in dict.fromkeys(target_skills) if skill and isinstance(skill, str)]
+        points = np.zeros((count, len(targets)), dtype=np.int8)
+        for column, target in enumerate(targets):
+            target_lower = SKILL_ALIASES.get(target.lower(), target.lower())
+            partial = np.zeros(len(skill_ids), dtype=bool)
+            for skill in trie.related(target_lower, max_length_gap=PARTIAL_MATCH_MAX_LENGTH_GAP):
+                if _is_meaningful_partial_match(target_lower, skill):
+                    partial[skill_ids[skill]] = True
+            points[matrix[:, partial].any(axis=1), column] = 10  # Partial match
+            if target_lower in skill_ids:
+                points[matrix[:, skill_ids[target_lower]], column] = 20  # Exact match
+        
+        return [
+            {targets[column]: int(points[row, column]) for column in np.flatnonzero(points[row])}
+            for row in range(count)
+        ]
+
+    def _skill_index(self, candidate: Dict) -> tuple:
+        """Candidate's distinct technical skills, lowercased, alias-canonicalized and interned"""
+        # Search results are fresh dicts per query, so the index is memoized by candidate id for the pool version
+        key = candidate.get("id") if self._skill_indexes_version is not None else None
+        index = self._skill_indexes.get(key) if key is not None else None
+        if index is not None:
+            return index
+        
+        skills_data = (candidate.get("parsed_data") or {}).get("skills") or {}
+        index = tuple(dict.fromkeys(
+            sys.intern(SKILL_ALIASES.get(skill.lower(), skill.lower()))
+            for group in SKILL_INDEX_GROUPS
+            for skill in (skills_data.get(group) if isinstance(skills_data.get(group), list) else [])
+            if skill and isinstance(skill, str)
+        ))
+        if key is not None:
+            self._skill_indexes[key] = index
+        return index
+
+    def _sync_skill_indexes(self, pool_version: Optional[int]):
+        """Drop memoized skill indexes once the candidate pool has changed (an unknown version disables memoizing)"""
+        if pool_version != self._skill_indexes_version:
+            self._skill_indexes.clear()
+            self._skill_indexes_version = pool_version
+
+    def _calculate_work_experience_score(self, parsed_data: Dict, matcher) -> Dict[str, float]:
+        """Calculate score per target skill based on work experience with it"""
         try:
             experience_data = parsed_data.get("experience", {})
             positions = experience_data.get("positions", [])
             
             if not positions or not isinstance(positions, list):
-                return 0
+                return {}
             
-            total_score = 0
-            target_lower = target_skill.lower()
+            total_scores = {}
             
             for position in positions:
                 if not isinstance(position, dict):
                     continue
                 
-                position_score = 0
-                
-                # Check technologies used in this position (15 points max)
-                technologies_used = position.get("technologies_used", [])
-                if technologies_used and isinstance(technologies_used, list):
-                    for tech in technologies_used:
-                        if tech and isinstance(tech, str) and target_lower in tech.lower():
-                            position_score += 15
-                            break
-                
-                # Check responsibilities mentioning the skill (10 points max)
-                responsibilities = position.get("responsibilities", [])
-                if responsibilities and isinstance(responsibilities, list):
-                    for resp in responsibilities:
-                        if resp and isinstance(resp, str) and target_lower in resp.lower():
-                            position_score += 10
-                            break
-                
-                # Check job title relevance (5 points max)
-                title = position.get("title", "")
-                if title and isinstance(title, str) and target_lower in title.lower():
-                    position_score += 5
+                # Technologies used (15 points), responsibilities mentioning the skill (10 points), job title (5 points)
+                position_scores = {}
+                for field, points in (("technologies_used", 15), ("responsibilities", 10), ("title", 5)):
+                    for skill in self._target_skills_in(position.get(field), matcher):
+                        position_scores[skill] = position_scores.get(skill, 0) + points
                 
-                total_score += min(position_score, 20)  # Max 20 points per position
+                for skill, position_score in position_scores.items():
+                    total_scores[skill] = total_scores.get(skill, 0) + min(position_score, 20)  # Max 20 points per position
             
-            return min(total_score, 30)  # Max 30 points total for work experience
+            return {skill: min(score, 30) for skill, score in total_scores.items()}  # Max 30 points total for work experience
             
         except Exception as e:
             logger.error(f"Error calculating work experience score: {str(e)}")
-            return 0
+            return {}
 
-    def _calculate_project_experience_score(self, parsed_data: Dict, target_skill: str) -> float:
-        """Calculate score based on project experience with the target skill"""
+    def _calculate_project_experience_score(self, parsed_data: Dict, matcher) -> Dict[str, float]:
+        """Calculate score per target skill based on project experience with it"""
         try:
             projects = parsed_data.get("projects", [])
             
             if not projects or not isinstance(projects, list):
-                return 0
+                return {}
             
-            total_score = 0
-            target_lower = target_skill.lower()
+            total_scores = {}
             
             for project in projects:
                 if not isinstance(project, dict):
                     continue
                 
-                project_score = 0
-                
-                # Check technologies used in project (10 points max)
-                technologies = project.get("technologies", [])
-                if technologies and isinstance(technologies, list):
-                    for tech in technologies:
-                        if tech and isinstance(tech, str) and target_lower in tech.lower():
-                            project_score += 10
-                            break
+                # Technologies used (10 points), description (5 points), project name (3 points)
+                project_scores = {}
+                for field, points in (("technologies", 10), ("description", 5), ("name", 3)):
+                    for skill in self._target_skills_in(project.get(field), matcher):
+                        project_scores[skill] = project_scores.get(skill, 0) + points
                 
-                # Check project description (5 points max)
-                description = project.get("description", "")
-                if description and isinstance(description, str) and target_lower in description.lower():
-                    project_score += 5
-                
-                # Check project name (3 points max)
-                name = project.get("name", "")
-                if name and isinstance(name, str) and target_lower in name.lower():
-                    project_score += 3
-                
-                total_score += min(project_score, 15)  # Max 15 points per project
+                for skill, project_score in project_scores.items():
+                    total_scores[skill] = total_scores.get(skill, 0) + min(project_score, 15)  # Max 15 points per project
             
-            return min(total_score, 25)  # Max 25 points total for projects
+            return {skill: min(score, 25) for skill, score in total_scores.items()}  # Max 25 points total for projects
             
         except Exception as e:
             logger.error(f"Error calculating project experience score: {str(e)}")
-            return 0
+            return {}
 
-    def _calculate_certification_score(self, parsed_data: Dict, target_skill: str) -> float:
-        """Calculate score based on relevant certifications"""
+    def _calculate_certification_score(self, parsed_data: Dict, matcher) -> Dict[str, float]:
+        """Calculate score per target skill based on relevant certifications"""
         try:
             certifications = parsed_data.get("certifications", [])
             
             if not certifications or not isinstance(certifications, list):
-                return 0
+                return {}
             
-            total_score = 0
-            target_lower = target_skill.lower()
-            
-            for cert in certifications:
-                if cert and isinstance(cert, str) and target_lower in cert.lower():
-                    total_score += 15  # 15 points per relevant certification
-            
-            return min(total_score, 15)  # Max 15 points total for certifications
+            # 15 points for any relevant certification (max 15 points total)
+            return {skill: 15 for skill in self._target_skills_in(certifications, matcher)}
             
         except Exception as e:
             logger.error(f"Error calculating certification score: {str(e)}")
-            return 0
+            return {}
 
     def _calculate_education_relevance_score(self, parsed_data: Dict, target_skill: str) -> float:
         """Calculate score based on education relevance to the skill"""
@@ -1961,49 +2967,22 @@ IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fi
                 return 0
             
             total_score = 0
-            target_lower = target_skill.lower()
-            
-            # Map skills to relevant fields
-            skill_to_fields = {
-                # Programming languages
-                'python': ['computer science', 'software engineering', 'data science', 'computer engineering'],
-                'java': ['computer science', 'software engineering', 'computer engineering'],
-                'javascript': ['computer science', 'software engineering', 'web development'],
-                'c++': ['computer science', 'computer engineering', 'software engineering'],
-                'c#': ['computer science', 'software engineering'],
-                'sql': ['computer science', 'database', 'information systems', 'data science'],
-                'r': ['statistics', 'data science', 'mathematics', 'analytics'],
-                # Frameworks
-                'react': ['computer science', 'software engineering', 'web development'],
-                'angular': ['computer science', 'software engineering', 'web development'],
-                'django': ['computer science', 'software engineering', 'web development'],
-                'spring': ['computer science', 'software engineering'],
-                # Databases
-                'mysql': ['computer science', 'database', 'information systems'],
-                'postgresql': ['computer science', 'database', 'information systems'],
-                'mongodb': ['computer science', 'database', 'information systems'],
-                # Cloud
-                'aws': ['computer science', 'cloud computing', 'information systems'],
-                'azure': ['computer science', 'cloud computing', 'information systems'],
-                'gcp': ['computer science', 'cloud computing', 'information systems'],
-            }
-            
-            relevant_fields = skill_to_fields.get(target_lower, ['computer science', 'software engineering'])
+            relevant_fields = EDUCATION_FIELDS_BY_SKILL.get(target_skill.lower(), DEFAULT_EDUCATION_FIELDS)
             
             for degree in degrees:
                 if isinstance(degree, dict):
-                    field = degree.get("field", "").lower()
-                    degree_name = degree.get("degree", "").lower()
+                    field = (degree.get("field") or "").lower()
+                    degree_name = (degree.get("degree") or "").lower()
                 elif isinstance(degree, str):
                     field = degree.lower()
                     degree_name = degree.lower()
                 else:
                     continue
                 
-                # Check if field is relevant
-                if any(rel_field in field for rel_field in relevant_fields):
+                # Check if field is relevant (one scan for every known field name)
+                if relevant_fields.intersection(EDUCATION_FIELD_RE.findall(field)):
                     total_score += 10
-                elif any(rel_field in degree_name for rel_field in relevant_fields):
+                elif relevant_fields.intersection(EDUCATION_FIELD_RE.findall(degree_name)):
                     total_score += 5
             
             return min(total_score, 10)  # Max 10 points total for education
@@ -2012,58 +2991,17 @@ IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fi
             logger.error(f"Error calculating education relevance score: {str(e)}")
             return 0
 
-    def _is_meaningful_partial_match(self, target_skill: str, candidate_skill: str) -> bool:
-        """Check if there's a meaningful partial match between skills, avoiding false positives"""
-        # Avoid false matches like java/javascript, c/c++, etc.
-        false_positive_pairs = {
-            ('java', 'javascript'), ('javascript', 'java'),
-            ('c', 'c++'), ('c++', 'c'),
-            ('c', 'c#'), ('c#', 'c'),
-            ('sql', 'nosql'), ('nosql', 'sql'),
-            ('react', 'react native'), ('react native', 'react'),  # These are actually related, so we allow this
-        }
-        
-        # Check if this is a known false positive pair
-        if (target_skill, candidate_skill) in false_positive_pairs:
-            return False
-        
-        # Allow meaningful partial matches:
-        # 1. One skill contains the other and the shorter one is at least 3 characters
-        # 2. The match makes semantic sense (not just substring)
-        
-        shorter = target_skill if len(target_skill) <= len(candidate_skill) else candidate_skill
-        longer = candidate_skill if len(target_skill) <= len(candidate_skill) else target_skill
-        
-        # Must be at least 3 characters to avoid meaningless matches
-        if len(shorter) < 3:
-            return False
-        
-        # Check if shorter skill is contained in longer skill
-        if shorter in longer:
-            # Additional check: make sure it's a meaningful match
-            # For example, "python" in "python3" is good, but "c" in "react" is bad
-            
-            # If the shorter skill is at word boundary or the difference is small, it's likely meaningful
-            if longer.startswith(shorter) or longer.endswith(shorter):
-                return True
-            
-            # If the skills are very similar in length, it's likely meaningful
-            if len(longer) - len(shorter) <= 3:
-                return True
-        
-        return False
-
-    def _generate_search_response(self, query: str, candidates: List[Dict], filters: Dict) -> str:
+    def _generate_search_response(self, query: str, pool: CandidatePool, filters: Dict) -> str:
         """Generate intelligent response for search queries"""
         try:
-            candidate_count = len(candidates)
+            candidate_count = len(pool.candidates)
             
             if candidate_count == 0:
                 return f"I couldn't find any candidates matching '{query}'. Try broadening your search criteria or check if you have candidates in your database."
             
             # Analyze the results
-            top_skills = self._extract_top_skills(candidates[:5])
-            avg_experience = self._calculate_average_experience(candidates[:5])
+            top_skills = self._extract_top_skills(pool, 5)
+            avg_experience = self._calculate_average_experience(pool, 5)
             
             response = f"I found {candidate_count} candidates matching '{query}'. "
             
@@ -2093,25 +3031,20 @@ IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fi
             
         except Exception as e:
             logger.error(f"Error generating search response: {str(e)}")
-            return f"I found {len(candidates)} candidates for your search query."
+            return f"I found {len(pool.candidates)} candidates for your search query."
 
-    def _generate_search_insights(self, candidates: List[Dict], filters: Dict) -> List[str]:
+    def _generate_search_insights(self, pool: CandidatePool, filters: Dict) -> List[str]:
         """Generate insights about search results"""
         insights = []
         
-        if not candidates:
+        if not pool.candidates:
             return ["No candidates found matching your criteria"]
         
         try:
             # Experience insights
-            experiences = []
-            for c in candidates:
-                exp = c.get("parsed_data", {}).get("experience", {}).get("total_years", 0)
-                if exp is not None and isinstance(exp, (int, float)) and exp >= 0:
-                    experiences.append(exp)
-            
-            if experiences:
-                avg_exp = sum(experiences) / len(experiences)
+            experiences = pool.years[pool.years >= 0]
+            if experiences.size:
+                avg_exp = float(experiences.mean())
                 insights.append(f"Average experience: {avg_exp:.1f} years")
                 
                 if avg_exp > 5:
@@ -2122,36 +3055,18 @@ IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fi
                     insights.append("This is a mid-level candidate pool")
             
             # Skills insights
-            all_skills = []
-            for candidate in candidates[:10]:
-                skills = candidate.get("parsed_data", {}).get("skills", {})
-                if isinstance(skills, dict):
-                    prog_langs = skills.get("programming_languages", [])
-                    if isinstance(prog_langs, list):
-                        all_skills.extend([skill for skill in prog_langs if skill and isinstance(skill, str)])
-                    
-                    frameworks = skills.get("frameworks_libraries", [])
-                    if isinstance(frameworks, list):
-                        all_skills.extend([skill for skill in frameworks if skill and isinstance(skill, str)])
-            
-            if all_skills:
-                from collections import Counter
-                skill_counts = Counter(all_skills)
-                top_skill = skill_counts.most_common(1)[0]
+            skill_counts = self._count_skills(pool, 10)
+            if skill_counts:
+                top_skill = self._most_common(skill_counts, 1)[0]
                 insights.append(f"Most common skill: {top_skill[0]} ({top_skill[1]} candidates)")
             
             # Quality insights
-            scores = []
-            for c in candidates:
-                score = c.get("ranking_score", {}).get("total_score", 0)
-                if score is not None and isinstance(score, (int, float)):
-                    scores.append(score)
-            
-            if scores:
-                avg_score = sum(scores) / len(scores)
+            scores = pool.scores
+            if scores.size:
+                avg_score = float(scores.mean())
                 insights.append(f"Average candidate quality score: {avg_score:.1f}/100")
                 
-                high_quality = len([s for s in scores if s > 80])
+                high_quality = int(np.count_nonzero(scores > 80))
                 if high_quality > 0:
                     insights.append(f"{high_quality} high-quality candidates (80+ score)")
             
@@ -2191,9 +3106,10 @@ IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fi
         
         return suggestions
 
-    def _generate_market_analysis(self, query: str, candidates: List[Dict]) -> Dict:
+    def _generate_market_analysis(self, query: str, pool: CandidatePool) -> Dict:
         """Generate market analysis based on query and available candidates"""
         try:
+            candidates = pool.candidates
             analysis_data = {
                 "total_candidates": len(candidates),
                 "skill_distribution": {},
@@ -2202,69 +3118,44 @@ IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fi
             }
             
             # Analyze skills
-            all_skills = []
-            for candidate in candidates:
-                skills = candidate["parsed_data"].get("skills", {})
-                if isinstance(skills, dict):
-                    all_skills.extend(skills.get("programming_languages", []))
-                    all_skills.extend(skills.get("frameworks_libraries", []))
-            
-            from collections import Counter
-            skill_counts = Counter(all_skills)
-            analysis_data["skill_distribution"] = dict(skill_counts.most_common(10))
+            skill_counts = self._count_skills(pool)
+            analysis_data["skill_distribution"] = dict(self._most_common(skill_counts, 10))
             
             # Analyze experience
-            experiences = [c["parsed_data"].get("experience", {}).get("total_years", 0) for c in candidates]
-            exp_ranges = {"0-2 years": 0, "3-5 years": 0, "6-10 years": 0, "10+ years": 0}
-            
-            for exp in experiences:
-                if exp <= 2:
-                    exp_ranges["0-2 years"] += 1
-                elif exp <= 5:
-                    exp_ranges["3-5 years"] += 1
-                elif exp <= 10:
-                    exp_ranges["6-10 years"] += 1
-                else:
-                    exp_ranges["10+ years"] += 1
-            
-            analysis_data["experience_distribution"] = exp_ranges
+            buckets = np.searchsorted(EXPERIENCE_BUCKET_EDGES, pool.years, side="left")
+            bucket_counts = np.bincount(buckets, minlength=len(EXPERIENCE_BUCKET_LABELS))
+            analysis_data["experience_distribution"] = dict(zip(EXPERIENCE_BUCKET_LABELS, bucket_counts.tolist()))
+            
+            # COST OPTIMIZATION: A handful of candidates is fully described by the aggregates themselves
+            if len(candidates) < MARKET_ANALYSIS_MIN_CANDIDATES:
+                logger.info("OPTIMIZATION: Using local market analysis for a small pool (no AI call)")
+                return self._local_market_analysis(analysis_data)
+            
+            # COST OPTIMIZATION: The prompt only depends on the query and the aggregates, so an unchanged pool reuses the answer
+            market_data = json_dumps(analysis_data)
+            cache_key = (self._canonical_query(query), market_data)
+            cached = self._market_analyses.get(cache_key)
+            if cached is not None:
+                logger.info("Using cached market analysis")
+                return dict(cached)
             
             # Generate AI analysis
-            prompt = f"""
-            Analyze this candidate market data and provide insights:
-            
-            Query: "{query}"
-            Market Data: {json.dumps(analysis_data, indent=2)}
-            
-            Provide analysis in JSON format:
-            {{
-                "analysis": "comprehensive market analysis text",
-                "insights": ["key insight 1", "key insight 2"],
-                "recommendations": ["recommendation 1", "recommendation 2"],
-                "market_trends": ["trend 1", "trend 2"]
-            }}
-            """
-            
             response = self.client.chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[
-                    {"role": "system", "content": "You are a market analyst specializing in tech talent markets."},
-                    {"role": "user", "content": prompt}
+                    {"role": "system", "content": MARKET_ANALYSIS_SYSTEM_PROMPT},
+                    {"role": "user", "content": MARKET_ANALYSIS_TEMPLATE.substitute(query=query, market_data=market_data)}
                 ],
+                response_format=JSON_OBJECT_FORMAT,
                 temperature=0.3,
-                max_tokens=800
+                max_tokens=700
             )
             
-            result = response.choices[0].message.content.strip()
-            if result.startswith('```json'):
-                result = result[7:]
-            if result.endswith('```'):
-                result = result[:-3]
-            
-            ai_analysis = json.loads(result)
+            ai_analysis = self._parse_json_response(response.choices[0].message.content)
             ai_analysis["market_data"] = analysis_data
+            self._market_analyses[cache_key] = ai_analysis
             
-            return ai_analysis
+            return dict(ai_analysis)
             
         except Exception as e:
             logger.error(f"Error generating market analysis: {str(e)}")
@@ -2275,6 +3166,28 @@ IMPORTANT: Include the candidate_name from the data. Use: excellent_fit, good_fi
                 "market_data": {}
             }
 
+    def _local_market_analysis(self, analysis_data: Dict) -> Dict:
+        """Rule-based market analysis composed from the computed skill and experience distributions"""
+        total = analysis_data["total_candidates"]
+        skills = analysis_data["skill_distribution"]
+        experience = analysis_data["experience_distribution"]
+        
+        insights = []
+        if skills:
+            insights.append(f"Most common skills: {', '.join(list(skills)[:3])}")
+        if total:
+            level, level_count = max(experience.items(), key=itemgetter(1))
+            insights.append(f"Largest experience band: {level} ({level_count} of {total} candidates)")
+        
+        return {
+            "analysis": f"Your database has {total} candidate{'s' if total != 1 else ''}, "
+                        "too few for meaningful market trends; the distributions below summarize them.",
+            "insights": insights or ["No candidate data to analyze yet"],
+            "recommendations": ["Upload more resumes for a fuller market analysis"],
+            "market_trends": [],
+            "market_data": analysis_data
+        }
+
     def _generate_general_response(self, query: str, query_analysis: Dict) -> str:
         """Generate helpful response for general queries"""
         try:
@@ -2300,42 +3213,37 @@ Just ask me naturally, like you're talking to a colleague!"""
             logger.error(f"Error generating general response: {str(e)}")
             return "I'm here to help with your recruitment needs. Try asking me to find candidates, compare them, or analyze market trends!"
 
-    def _extract_top_skills(self, candidates: List[Dict]) -> List[str]:
-        """Extract most common skills from candidates"""
-        all_skills = []
-        for candidate in candidates:
-            skills = candidate.get("parsed_data", {}).get("skills", {})
-            if isinstance(skills, dict):
-                prog_langs = skills.get("programming_languages", [])
-                if isinstance(prog_langs, list):
-                    all_skills.extend([skill for skill in prog_langs if skill and isinstance(skill, str)])
-                
-                frameworks = skills.get("frameworks_libraries", [])
-                if isinstance(frameworks, list):
-                    all_skills.extend([skill for skill in frameworks if skill and isinstance(skill, str)])
-        
-        if not all_skills:
+    def _count_skills(self, pool: CandidatePool, limit: Optional[int] = None) -> Counter:
+        """Programming language and framework counts across the first limit candidates of the pool"""
+        skill_counts = Counter()
+        for skills in pool.tech_skills()[:limit]:
+            skill_counts.update(skills)
+        return skill_counts
+
+    def _most_common(self, counts: Counter, k: int) -> List[tuple]:
+        """The k highest (item, count) pairs, first-seen first on ties; k=1 is a plain max scan with no heap"""
+        if not counts:
             return []
-        
-        from collections import Counter
-        skill_counts = Counter(all_skills)
-        return [skill for skill, count in skill_counts.most_common(5)]
+        if k == 1:
+            return [max(counts.items(), key=itemgetter(1))]
+        return heapq.nlargest(k, counts.items(), key=itemgetter(1))
 
-    def _calculate_average_experience(self, candidates: List[Dict]) -> float:
+    def _extract_top_skills(self, pool: CandidatePool, limit: Optional[int] = None) -> List[str]:
+        """Extract most common skills from candidates"""
+        return [skill for skill, count in self._most_common(self._count_skills(pool, limit), 5)]
+
+    def _calculate_average_experience(self, pool: CandidatePool, limit: Optional[int] = None) -> float:
         """Calculate average years of experience"""
-        experiences = []
-        for candidate in candidates:
-            exp = candidate.get("parsed_data", {}).get("experience", {}).get("total_years", 0)
-            if exp is not None and isinstance(exp, (int, float)) and exp > 0:
-                experiences.append(exp)
-        
-        return sum(experiences) / len(experiences) if experiences else 0.0
+        years = pool.years[:limit]
+        years = years[years > 0]
+        return float(years.mean()) if years.size else 0.0
 
     def _handle_comparison_query(self, user_message: str, query_analysis: Dict, db) -> Dict:
         """Handle comparison queries"""
         try:
             # Get all candidates for comparison
-            all_candidates = db.search_candidates("", {})
+            pool = self._candidate_pool(db)
+            all_candidates = pool.candidates
             
             if not all_candidates:
                 return {
@@ -2348,17 +3256,9 @@ Just ask me naturally, like you're talking to a colleague!"""
                     "follow_up_questions": ["Would you like to upload some resumes?"]
                 }
             
-            # Apply intelligent ranking to get skill relevance scores
-            # Use a general query that will rank all candidates
-            ranked_candidates = self._intelligent_skill_ranking(
-                all_candidates, 
-                "Compare all candidates", 
-                {},  # No specific filters for general comparison
-                use_ai_enhancement=False
-            )
-            
-            # Take top candidates (limit to reasonable number for comparison)
-            top_candidates = ranked_candidates[:5]  # Compare top 5 candidates
+            # A general comparison names no target skills, so skill ranking would leave every candidate
+            # unscored; pick the top 5 straight from the pool's blended scores
+            top_candidates = pool.top_candidates(5)  # Compare top 5 candidates
             
             # Generate intelligent comparison
             comparison_result = self.compare_candidates_intelligent(top_candidates, "overall")
@@ -2400,13 +3300,24 @@ Just ask me naturally, like you're talking to a colleague!"""
                 "follow_up_questions": ["Would you like to try a different search?"]
             }
 
+    def _candidate_pool(self, db) -> CandidatePool:
+        """Every stored resume as a CandidatePool, reloaded only when the pool version has changed since the last call"""
+        pool_version = db.get_pool_version()
+        self._sync_skill_indexes(pool_version)
+        cached = self._full_pool
+        if pool_version is not None and cached is not None and cached[0] == pool_version:
+            return cached[1]
+        
+        pool = CandidatePool(db.get_resumes())
+        if pool_version is not None:
+            self._full_pool = (pool_version, pool)
+        return pool
+
     def _handle_analysis_query(self, user_message: str, query_analysis: Dict, db) -> Dict:
         """Handle analysis-type conversational queries"""
         try:
             # Generate analysis based on available candidates
-            candidates = db.get_resumes()
-            
-            analysis_response = self._generate_market_analysis(user_message, candidates)
+            analysis_response = self._generate_market_analysis(user_message, self._candidate_pool(db))
             
             return {
                 "message": user_message,
@@ -2467,58 +3378,24 @@ Just ask me naturally, like you're talking to a colleague!"""
             # Try AI comparison first, but with much less data
             try:
                 # OPTIMIZATION 6: Much shorter, focused prompt
-                prompt = f"""
-                Compare these candidates for hiring. Focus on: {criteria}
-                
-                Candidates: {json.dumps(candidate_summaries)}
-                
-                Return JSON:
-                {{
-                    "summary": "Brief comparison and recommendation",
-                    "ranking": [
-                        {{
-                            "rank": 1,
-                            "candidate_name": "name",
-                            "candidate_id": "id", 
-                            "overall_score": 85,
-                            "strengths": ["strength1", "strength2"],
-                            "recommendation": "hire"
-                        }}
-                    ],
-                    "key_insights": ["insight1", "insight2"],
-                    "hiring_recommendation": {{
-                        "top_choice": "candidate_name",
-                        "reasoning": "brief explanation"
-                    }}
-                }}
-                """
+                prompt = f"Focus on: {criteria}\n\nCandidates: {json_dumps(candidate_summaries)}"
                 
                 response = self.client.chat.completions.create(
                     model="gpt-3.5-turbo",
                     messages=[
-                        {"role": "system", "content": "You are a technical recruiter. Provide candidate comparison in valid JSON format only."},
+                        {"role": "system", "content": COMPARE_SYSTEM_PROMPT},
                         {"role": "user", "content": prompt}
                     ],
+                    response_format=JSON_OBJECT_FORMAT,
                     temperature=0.2,
-                    max_tokens=600  # Reduced from 1000
+                    max_tokens=500  # Reduced from 1000
                 )
                 
                 result = response.choices[0].message.content
-                if not result or result.strip() == "":
+                if not result or result.isspace():
                     raise ValueError("Empty response from AI")
                 
-                # Clean and parse JSON
-                result = result.strip()
-                if result.startswith('```json'):
-                    result = result[7:]
-                if result.endswith('```'):
-                    result = result[:-3]
-                result = result.strip()
-                
-                if not result:
-                    raise ValueError("Empty result after cleaning")
-                
-                ai_comparison = json.loads(result)
+                ai_comparison = self._parse_json_response(result)
                 logger.info("OPTIMIZATION: AI comparison completed with minimal data")
                 return ai_comparison
                 
@@ -2553,20 +3430,34 @@ Just ask me naturally, like you're talking to a colleague!"""
     def _fallback_comparison_optimized(self, candidate_summaries: List[Dict], criteria: str) -> Dict:
         """Optimized rule-based fallback comparison when AI fails"""
         try:
-            # Sort candidates by different criteria using the minimal summary data
+            # Sort candidates by different criteria using the minimal summary data; each field is read once,
+            # and the overall sort reuses the comparison scores as its keys
+            scores = [candidate.get("skill_relevance", candidate.get("score", 0)) for candidate in candidate_summaries]
             if criteria.lower() in ["skills", "technical"]:
-                sorted_candidates = sorted(candidate_summaries, key=lambda x: len(x.get("top_skills", [])), reverse=True)
+                sort_keys = [len(candidate.get("top_skills", [])) for candidate in candidate_summaries]
             elif criteria.lower() in ["experience", "exp"]:
-                sorted_candidates = sorted(candidate_summaries, key=lambda x: x.get("experience_years", 0), reverse=True)
+                sort_keys = [candidate.get("experience_years", 0) for candidate in candidate_summaries]
             else:  # Overall
-                sorted_candidates = sorted(candidate_summaries, key=lambda x: x.get("skill_relevance", x.get("score", 0)), reverse=True)
+                sort_keys = scores
+            order = sorted(range(len(candidate_summaries)), key=sort_keys.__getitem__, reverse=True)
+            sorted_candidates = [candidate_summaries[i] for i in order]
+            scores = [scores[i] for i in order]
             
-            # Generate ranking
+            # Recommendation for every candidate in one vectorized pass over their scores
+            score_array = np.asarray(scores, dtype=np.float32)
+            recommendations = RECOMMENDATION_LABELS[np.digitize(score_array, RECOMMENDATION_EDGES, right=True)].tolist()
+            
+            # Generate ranking (counting experienced candidates in the same pass)
             ranking = []
-            for i, candidate in enumerate(sorted_candidates):
+            experienced_count = 0
+            for i, (candidate, score, recommendation) in enumerate(zip(sorted_candidates, scores, recommendations)):
+                experience_years = candidate.get("experience_years", 0)
+                if experience_years > 2:
+                    experienced_count += 1
+                
                 # Determine strengths based on minimal data
                 strengths = []
-                if candidate.get("experience_years", 0) > 3:
+                if experience_years > 3:
                     strengths.append("Experienced professional")
                 if len(candidate.get("top_skills", [])) > 3:
                     strengths.append("Diverse skill set")
@@ -2575,15 +3466,6 @@ Just ask me naturally, like you're talking to a colleague!"""
                 if candidate.get("skill_relevance", 0) > 50:
                     strengths.append("Strong skill match")
                 
-                # Determine recommendation
-                score = candidate.get("skill_relevance", candidate.get("score", 0))
-                if score > 70:
-                    recommendation = "hire"
-                elif score > 50:
-                    recommendation = "interview"
-                else:
-                    recommendation = "pass"
-                
                 ranking.append({
                     "rank": i + 1,
                     "candidate_name": candidate.get("name", f"Candidate {i+1}"),
@@ -2597,15 +3479,13 @@ Just ask me naturally, like you're talking to a colleague!"""
             top_candidate = sorted_candidates[0] if sorted_candidates else None
             summary = f"Comparison completed using optimized analysis. "
             if top_candidate:
-                score = top_candidate.get("skill_relevance", top_candidate.get("score", 0))
-                summary += f"{top_candidate.get('name', 'Top candidate')} ranks highest with {score:.1f} points. "
+                summary += f"{top_candidate.get('name', 'Top candidate')} ranks highest with {scores[0]:.1f} points. "
             
             # Generate insights
             insights = []
-            avg_score = sum(c.get("skill_relevance", c.get("score", 0)) for c in candidate_summaries) / len(candidate_summaries)
+            avg_score = float(score_array.mean()) if score_array.size else 0.0
             insights.append(f"Average candidate score: {avg_score:.1f}")
             
-            experienced_count = sum(1 for c in candidate_summaries if c.get("experience_years", 0) > 2)
             insights.append(f"{experienced_count} out of {len(candidate_summaries)} candidates have 3+ years experience")
             
             return {
@@ -2629,114 +3509,207 @@ Just ask me naturally, like you're talking to a colleague!"""
                 "hiring_recommendation": {"top_choice": "Manual review needed", "reasoning": "Analysis system unavailable"}
             }
 
-    def _calculate_ai_enhanced_skill_score(self, candidate: Dict, target_skill: str) -> Dict:
-        """Use AI to analyze skill depth and context for more sophisticated scoring"""
+    def _skill_context(self, candidate: Dict) -> str:
+        """
+        Compact JSON of the candidate fields a skill-depth analysis needs, within SKILL_CONTEXT_TOKEN_LIMIT.
+        Whole low-priority fields are dropped to fit (so the JSON stays valid); it's the same for every target skill.
+        """
+        parsed_data = candidate.get("parsed_data", {})
+        skill_context = {key: parsed_data.get(field, default) for key, field, default in SKILL_CONTEXT_FIELDS}
+        
+        candidate_data = json_dumps(skill_context)
+        while len(skill_context) > 1 and self._count_tokens(candidate_data) > SKILL_CONTEXT_TOKEN_LIMIT:
+            skill_context.popitem()
+            candidate_data = json_dumps(skill_context)
+        # Skills or experience alone can still be over the limit
+        return self._truncate_to_tokens(candidate_data, SKILL_CONTEXT_TOKEN_LIMIT)
+
+    def _skill_depth_request(self, target_skill: str, candidate_data: str,
+                             max_tokens: int = SKILL_DEPTH_MAX_TOKENS) -> Dict:
+        """Chat completion request asking for one candidate's depth of experience with one skill"""
+        prompt = SKILL_DEPTH_TEMPLATE.substitute(candidate_data=candidate_data, target_skill=target_skill)
+        
+        return {
+            "model": self.skill_depth_model,
+            "messages": [
+                {"role": "system", "content": SKILL_DEPTH_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            "response_format": JSON_OBJECT_FORMAT,
+            "temperature": CACHEABLE_TEMPERATURE,
+            "max_tokens": max_tokens,
+            "user": self._tenant_id  # Routes repeat prefixes to the same prompt cache
+        }
+
+    def _truncated_skill_depth_retry(self, target_skill: str, candidate_data: str) -> Dict:
+        """Retry request for a skill-depth reply that was cut off at the token cap"""
+        # JSON mode only returns invalid JSON when max_tokens ran out, so the parse failure stands in for finish_reason
+        logger.info(f"Skill-depth analysis for {target_skill} hit max_tokens; retrying with a larger cap")
+        return self._skill_depth_request(target_skill, candidate_data, max_tokens=2 * SKILL_DEPTH_MAX_TOKENS)
+
+    def _calculate_ai_enhanced_skill_score(self, candidate: Dict, target_skill: str, candidate_data: Optional[str] = None) -> Dict:
+        """
+        Use AI to analyze skill depth and context for more sophisticated scoring.
+        Cache tiers: exact request (chat cache), then the same skill's analysis for a near-identical skill list.
+        """
         try:
-            parsed_data = candidate.get("parsed_data", {})
-            
-            # Prepare skill context for AI analysis
-            skill_context = {
-                "target_skill": target_skill,
-                "candidate_skills": parsed_data.get("skills", {}),
-                "work_experience": parsed_data.get("experience", {}),
-                "projects": parsed_data.get("projects", []),
-                "certifications": parsed_data.get("certifications", []),
-                "education": parsed_data.get("education", {})
-            }
-            
-            prompt = f"""
-            Analyze this candidate's depth of experience with {target_skill}. Consider:
-            1. How extensively they've used this skill in work/projects
-            2. The complexity and scale of their {target_skill} projects
-            3. Their progression and growth with this skill
-            4. Relevant certifications or formal training
-            5. Whether their education supports this skill
-            
-            Candidate Data:
-            {json.dumps(skill_context, indent=2)[:1500]}
-            
-            Return JSON analysis:
-            {{
-                "skill_depth_score": 85,
-                "confidence": 0.9,
-                "analysis": {{
-                    "skill_presence": "found|not_found",
-                    "experience_depth": "beginner|intermediate|advanced|expert",
-                    "professional_usage": "none|limited|moderate|extensive",
-                    "project_complexity": "simple|moderate|complex|enterprise",
-                    "learning_progression": "static|growing|advanced",
-                    "formal_training": "none|some|certified|expert"
-                }},
-                "evidence": {{
-                    "work_projects": ["list of relevant work experience"],
-                    "personal_projects": ["list of relevant personal projects"],
-                    "certifications": ["relevant certifications"],
-                    "education_relevance": "how education supports this skill"
-                }},
-                "reasoning": "detailed explanation of the score"
-            }}
-            """
+            candidate_data = candidate_data or self._skill_context(candidate)
+            request = self._skill_depth_request(target_skill, candidate_data)
+            key = self._chat_key(request)
+            embedding = None
+            if self._skill_semantic_threshold <= 1 and self._chat_cache.get(key) is None:
+                embedding = self._embed_text(self._skill_depth_embedding_text(candidate, target_skill))
+                similar = self._similar_skill_analysis(embedding, target_skill)
+                if similar is not None:
+                    return similar
             
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are an expert technical recruiter analyzing candidate skill depth. Be precise and evidence-based."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,
-                max_tokens=600
-            )
+            try:
+                analysis = self._parse_json_response(self._cached_chat(**request))
+            except json.JSONDecodeError:
+                request = self._truncated_skill_depth_retry(target_skill, candidate_data)
+                key = self._chat_key(request)
+                analysis = self._parse_json_response(self._cached_chat(**request))
+            self._index_skill_analysis(key, embedding, target_skill, analysis)
+            return analysis
             
-            result = response.choices[0].message.content.strip()
-            if result.startswith('```json'):
-                result = result[7:]
-            if result.endswith('```'):
-                result = result[:-3]
+        except Exception as e:
+            logger.error(f"Error in AI-enhanced skill analysis: {str(e)}")
+            return self._failed_skill_analysis(e)
+
+    async def _a_calculate_ai_enhanced_skill_score(self, candidate: Dict, target_skill: str,
+                                                   candidate_data: Optional[str] = None) -> Dict:
+        """Async variant of _calculate_ai_enhanced_skill_score"""
+        try:
+            candidate_data = candidate_data or self._skill_context(candidate)
+            request = self._skill_depth_request(target_skill, candidate_data)
+            key = self._chat_key(request)
+            embedding = None
+            if self._skill_semantic_threshold <= 1 and await asyncio.to_thread(self._chat_cache.get, key) is None:
+                embedding = await asyncio.to_thread(
+                    self._embed_text, self._skill_depth_embedding_text(candidate, target_skill)
+                )
+                similar = self._similar_skill_analysis(embedding, target_skill)
+                if similar is not None:
+                    return similar
             
-            return json.loads(result)
+            try:
+                analysis = self._parse_json_response(await self._a_cached_chat(**request))
+            except json.JSONDecodeError:
+                request = self._truncated_skill_depth_retry(target_skill, candidate_data)
+                key = self._chat_key(request)
+                analysis = self._parse_json_response(await self._a_cached_chat(**request))
+            self._index_skill_analysis(key, embedding, target_skill, analysis)
+            return analysis
             
         except Exception as e:
             logger.error(f"Error in AI-enhanced skill analysis: {str(e)}")
-            return {
-                "skill_depth_score": 0,
-                "confidence": 0.1,
-                "analysis": {"error": str(e)},
-                "evidence": {},
-                "reasoning": "AI analysis failed"
-            }
+            return self._failed_skill_analysis(e)
+
+    async def _ai_skill_analyses(self, candidate: Dict, target_skills: List[str],
+                                 semaphore: Optional[asyncio.Semaphore] = None) -> List[Dict]:
+        """AI depth analyses of one candidate for each skill, at most SKILL_DEPTH_MAX_CONCURRENCY requests in flight"""
+        semaphore = semaphore or asyncio.Semaphore(SKILL_DEPTH_MAX_CONCURRENCY)
+        candidate_data = self._skill_context(candidate)  # Serialized once, shared by every skill's prompt
+        
+        async def analyze(target_skill: str) -> Dict:
+            async with semaphore:
+                return await self._a_calculate_ai_enhanced_skill_score(candidate, target_skill, candidate_data)
+        
+        return await asyncio.gather(*(analyze(target_skill) for target_skill in target_skills))
+
+    async def _pool_ai_skill_analyses(self, candidates: List[Dict], target_skills: List[str]) -> Dict[tuple, Dict]:
+        """AI depth analyses keyed by (candidate id, skill) for every candidate, under one shared concurrency limit"""
+        semaphore = asyncio.Semaphore(SKILL_DEPTH_MAX_CONCURRENCY)
+        results = await asyncio.gather(*(
+            self._ai_skill_analyses(candidate, target_skills, semaphore) for candidate in candidates
+        ))
+        return {
+            (candidate.get("id"), target_skill): analysis
+            for candidate, analyses in zip(candidates, results)
+            for target_skill, analysis in zip(target_skills, analyses)
+        }
+
+    def _skill_depth_embedding_text(self, candidate: Dict, target_skill: str) -> str:
+        """What a skill-depth analysis is looked up by: the target skill and the candidate's listed skills"""
+        return f"{target_skill.lower()}:{self._skill_bag((candidate.get('parsed_data') or {}).get('skills'))}"
+
+    def _similar_skill_analysis(self, embedding, target_skill: str) -> Optional[Dict]:
+        """Stored analysis of the same skill for the closest earlier skill list, if it clears the similarity threshold"""
+        if embedding is None:
+            return None
+        entry = self._nearest_result(self._query_indexes["skill_depth"], embedding, self._skill_semantic_threshold)
+        # A near neighbour analysed for another skill ("react" vs "vue") says nothing about this one
+        if not isinstance(entry, dict) or entry.get("skill") != target_skill.lower():
+            return None
+        logger.info("Using cached analysis of a similar skill-depth prompt")
+        return entry.get("analysis")
+
+    def _index_skill_analysis(self, key: str, embedding, target_skill: str, analysis: Dict):
+        """Make a fresh skill-depth analysis findable by candidates with similar skills, for the same target skill"""
+        if embedding is None:
+            return
+        entry = {"skill": target_skill.lower(), "analysis": analysis}
+        self._query_results.set(key, entry, expire=CHAT_CACHE_TTL_SECONDS)
+        self._query_indexes["skill_depth"].add(key, embedding)
+
+    def _failed_skill_analysis(self, error: Exception) -> Dict:
+        """Zero-score, low-confidence stand-in for an AI skill analysis that failed"""
+        return {
+            "skill_depth_score": 0,
+            "confidence": 0.1,
+            "analysis": {"error": str(error)},
+            "evidence": {},
+            "reasoning": "AI analysis failed"
+        }
 
-    def _calculate_hybrid_skill_score(self, candidate: Dict, target_skills: List[str], use_ai: bool = False) -> float:
+    def _calculate_hybrid_skill_score(self, candidate: Dict, target_skills: List[str], use_ai: bool = False,
+                                      ai_analyses: Optional[Dict[tuple, Dict]] = None,
+                                      enhanced_score: Optional[float] = None) -> float:
         """
-        Hybrid approach: Use enhanced algorithm by default, optionally enhance with AI for critical searches
+        Hybrid approach: Use enhanced algorithm by default, optionally enhance with AI for critical searches.
+        ai_analyses holds pool-wide results by (candidate id, skill); missing pairs are analyzed here.
+        enhanced_score is the candidate's skill depth score when the caller already computed it for the pool.
         """
         # Always use the enhanced algorithm
-        enhanced_score = self._calculate_skill_depth_score(candidate, target_skills)
+        if enhanced_score is None:
+            enhanced_score = self._calculate_skill_depth_score(candidate, target_skills)
         
         if not use_ai:
             return enhanced_score
         
+        # COST OPTIMIZATION: Clear rejects and clear matches keep the algorithmic score without any AI call
+        if not self._needs_ai_skill_analysis(enhanced_score, target_skills):
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("%s - Skipping AI analysis, skill depth score %.1f is outside the borderline range",
+                             candidate.get("parsed_data", {}).get("personal_info", {}).get("full_name", "Unknown"), enhanced_score)
+            return enhanced_score
+        
         # For critical searches, enhance with AI analysis
         try:
-            candidate_name = candidate.get("parsed_data", {}).get("personal_info", {}).get("full_name", "Unknown")
-            ai_scores = []
+            debug = logger.isEnabledFor(logging.DEBUG)
+            candidate_name = candidate.get("parsed_data", {}).get("personal_info", {}).get("full_name", "Unknown") if debug else None
             
-            for target_skill in target_skills:
-                ai_analysis = self._calculate_ai_enhanced_skill_score(candidate, target_skill)
-                ai_score = ai_analysis.get("skill_depth_score", 0)
-                confidence = ai_analysis.get("confidence", 0.5)
-                
-                # Weight AI score by confidence
-                weighted_ai_score = ai_score * confidence
-                ai_scores.append(weighted_ai_score)
-                
-                logger.info(f"DEBUG: {candidate_name} - AI analysis for {target_skill}: {ai_score} (confidence: {confidence:.2f})")
+            # Skills without a pool-wide result are analyzed concurrently, so the wait is one round trip, not one per skill
+            analyses = {skill: (ai_analyses or {}).get((candidate.get("id"), skill)) for skill in target_skills}
+            missing = [skill for skill, analysis in analyses.items() if analysis is None]
+            if missing:
+                analyses.update(zip(missing, self._run_async(self._ai_skill_analyses(candidate, missing))))
             
-            avg_ai_score = sum(ai_scores) / len(ai_scores) if ai_scores else 0
+            count = len(target_skills)
+            ai_scores = np.fromiter((analyses[skill].get("skill_depth_score", 0) for skill in target_skills), dtype=np.float64, count=count)
+            confidences = np.fromiter((analyses[skill].get("confidence", 0.5) for skill in target_skills), dtype=np.float64, count=count)
+            if debug:
+                for target_skill, ai_score, confidence in zip(target_skills, ai_scores, confidences):
+                    logger.debug("%s - AI analysis for %s: %s (confidence: %.2f)", candidate_name, target_skill, ai_score, confidence)
+            
+            # Mean of the AI scores weighted by confidence
+            avg_ai_score = float(ai_scores @ confidences) / count if count else 0
             
             # Combine enhanced algorithm (70%) with AI analysis (30%)
             hybrid_score = (enhanced_score * 0.7) + (avg_ai_score * 0.3)
             
-            logger.info(f"DEBUG: {candidate_name} - Hybrid score: {hybrid_score:.1f} (enhanced: {enhanced_score:.1f}, ai: {avg_ai_score:.1f})")
+            if debug:
+                logger.debug("%s - Hybrid score: %.1f (enhanced: %.1f, ai: %.1f)", candidate_name, hybrid_score, enhanced_score, avg_ai_score)
             
             return hybrid_score
             
@@ -2744,6 +3717,11 @@ Just ask me naturally, like you're talking to a colleague!"""
             logger.error(f"Error in hybrid skill scoring: {str(e)}")
             return enhanced_score  # Fallback to enhanced algorithm
 
+    def _needs_ai_skill_analysis(self, enhanced_score: float, target_skills: List[str]) -> bool:
+        """Whether a skill depth score is borderline enough to be worth AI analysis (judged per target skill)"""
+        per_skill_score = enhanced_score / max(len(target_skills), 1)
+        return self.skill_ai_low_cut <= per_skill_score <= self.skill_ai_high_cut
+
     # COST OPTIMIZATION: Quick rule-based job matching for simple cases
     def _can_use_rule_based_matching(self, job_requirements: Dict) -> bool:
         """Determine if we can use rule-based matching instead of AI for cost savings"""
@@ -0,0 +1,401 @@
+import sqlite3
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional
+import logging
+from collections import OrderedDict
+import numpy as np
+try:
+    import orjson
+except ImportError:  # Falls back to the stdlib json module
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def json_dumps(value: Any) -> str:
+    """Compact JSON encoding, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(value, separators=(',', ':'))
+
+
+def json_loads(data: str) -> Any:
+    """Decode JSON, using orjson when it is installed (raises json.JSONDecodeError either way)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+class PersistentCache:
+    """SQLite-backed key/value cache shared by every worker process on the host"""
+
+    def __init__(self, db_path: str = "ai_cache.db", table: str = "analysis_cache", size_limit: int = 2 * 1024 ** 3):
+        self.db_path = db_path
+        self.table = table
+        self.size_limit = size_limit
+        self._init_cache()
+
+    def _init_cache(self):
+        """Initialize cache table"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                # WAL lets every worker process read while another one writes (persists on the file)
+                conn.execute("PRAGMA journal_mode=WAL")
+                cursor = conn.cursor()
+
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {self.table} (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL,
+                        expires_at REAL,
+                        stored_at REAL NOT NULL
+                    )
+                """)
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_stored ON {self.table}(stored_at)")
+
+                # Running total of stored value sizes, kept in step with every write so culling never scans the table.
+                # Resynced on startup in case the table was written without it
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {self.table}_size (
+                        id INTEGER PRIMARY KEY CHECK (id = 0),
+                        total_size INTEGER NOT NULL
+                    )
+                """)
+                cursor.execute(f"""
+                    INSERT OR REPLACE INTO {self.table}_size (id, total_size)
+                    SELECT 0, COALESCE(SUM(LENGTH(value)), 0) FROM {self.table}
+                """)
+
+                conn.commit()
+
+        except Exception as e:
+            logger.error(f"Error initializing cache table {self.table}: {str(e)}")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or expired"""
+        if key is None:
+            return default
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+
+                cursor.execute(f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,))
+                row = cursor.fetchone()
+
+                if not row:
+                    return default
+
+                value, expires_at = row
+                if expires_at is not None and expires_at < time.time():
+                    cursor.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                    cursor.execute(f"UPDATE {self.table}_size SET total_size = total_size - LENGTH(?)", (value,))
+                    conn.commit()
+                    return default
+
+                return json_loads(value)
+
+        except Exception as e:
+            logger.warning(f"Error reading cache key {key}: {str(e)}")
+            return default
+
+    def set(self, key: str, value: Any, expire: Optional[float] = None) -> bool:
+        """Store value under key, optionally expiring after `expire` seconds"""
+        try:
+            now = time.time()
+            encoded = json_dumps(value)
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+
+                cursor.execute(f"SELECT LENGTH(value) FROM {self.table} WHERE key = ?", (key,))
+                replaced = cursor.fetchone()
+                cursor.execute(f"""
+                    INSERT OR REPLACE INTO {self.table} (key, value, expires_at, stored_at)
+                    VALUES (?, ?, ?, ?)
+                """, (key, encoded, now + expire if expire else None, now))
+                cursor.execute(f"UPDATE {self.table}_size SET total_size = total_size + LENGTH(?) - ?",
+                               (encoded, replaced[0] if replaced else 0))
+
+                self._cull(cursor, now)
+                conn.commit()
+                return True
+
+        except Exception as e:
+            logger.warning(f"Error writing cache key {key}: {str(e)}")
+            return False
+
+    def _cull(self, cursor, now: float):
+        """Once over the size limit, drop expired rows, then the oldest rows until back under it"""
+        cursor.execute(f"SELECT total_size FROM {self.table}_size")
+        total_size = cursor.fetchone()[0]
+        if total_size <= self.size_limit:
+            return
+
+        # Expired rows are otherwise only dropped when read
+        cursor.execute(f"""
+            SELECT COALESCE(SUM(LENGTH(value)), 0) FROM {self.table}
+            WHERE expires_at IS NOT NULL AND expires_at < ?
+        """, (now,))
+        total_size -= cursor.fetchone()[0]
+        cursor.execute(f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at < ?", (now,))
+
+        evicted = []
+        if total_size > self.size_limit:
+            cursor.execute(f"SELECT key, LENGTH(value) FROM {self.table} ORDER BY stored_at")
+            for key, size in cursor:
+                if total_size <= self.size_limit:
+                    break
+                evicted.append((key,))
+                total_size -= size
+        cursor.executemany(f"DELETE FROM {self.table} WHERE key = ?", evicted)
+        cursor.execute(f"UPDATE {self.table}_size SET total_size = ?", (total_size,))
+
+    def clear(self):
+        """Remove every entry from the cache"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute(f"DELETE FROM {self.table}")
+                conn.execute(f"UPDATE {self.table}_size SET total_size = 0")
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Error clearing cache table {self.table}: {str(e)}")
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                return conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        except Exception as e:
+            logger.warning(f"Error counting cache table {self.table}: {str(e)}")
+            return 0
+
+
+class SemanticCache:
+    """Nearest-neighbour index of text embeddings, mapping near-duplicates to an existing cache key"""
+
+    def __init__(self, db_path: str = "ai_cache.db", table: str = "embedding_index", max_entries: int = 50_000):
+        self.db_path = db_path
+        self.table = table
+        self.max_entries = max_entries
+        self._rows: Dict[str, int] = {}  # key -> row of _vectors
+        self._keys: List[str] = []  # row -> key
+        self._vectors = None  # (capacity, dim) float32 buffer of unit vectors; rows past len(_keys) are unused
+        self._last_rowid = 0  # Highest SQLite rowid loaded; newer rows were written since (by any worker)
+        self._lock = threading.RLock()
+        self._init_index()
+
+    def _init_index(self):
+        """Initialize the embedding table and load stored vectors into memory"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {self.table} (
+                        key TEXT PRIMARY KEY,
+                        embedding BLOB NOT NULL,
+                        stored_at REAL
+                    )
+                """)
+                # Migration: indexes created before the row cap have no stored_at (they are culled first)
+                try:
+                    cursor.execute(f"ALTER TABLE {self.table} ADD COLUMN stored_at REAL")
+                except sqlite3.OperationalError as e:
+                    if "duplicate column name" not in str(e).lower():
+                        raise
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_stored ON {self.table}(stored_at)")
+
+                # Running row count, kept in step with every write so culling never counts the table
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {self.table}_count (
+                        id INTEGER PRIMARY KEY CHECK (id = 0),
+                        total_entries INTEGER NOT NULL
+                    )
+                """)
+                cursor.execute(f"""
+                    INSERT OR REPLACE INTO {self.table}_count (id, total_entries)
+                    SELECT 0, COUNT(*) FROM {self.table}
+                """)
+                self._cull(cursor)
+                conn.commit()
+
+        except Exception as e:
+            logger.error(f"Error initializing embedding index {self.table}: {str(e)}")
+        self._sync()
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _sync(self):
+        """Load rows written since the last sync, including other workers' (a write always gets a new rowid)"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                rows = conn.execute(
+                    f"SELECT rowid, key, embedding FROM {self.table} WHERE rowid > ? ORDER BY rowid",
+                    (self._last_rowid,)
+                ).fetchall()
+        except Exception as e:
+            logger.warning(f"Error syncing embedding index {self.table}: {str(e)}")
+            return
+
+        with self._lock:
+            for rowid, key, embedding in rows:
+                self._put(key, np.frombuffer(embedding, dtype=np.float32))
+                self._last_rowid = max(self._last_rowid, rowid)
+            # Rows other workers culled are still held here; reload once they could make up half the index
+            if len(self._keys) > 2 * self.max_entries:
+                self._rows, self._keys, self._vectors, self._last_rowid = {}, [], None, 0
+                self._sync()
+
+    def _put(self, key: str, vector: np.ndarray):
+        """Set key's in-memory vector, growing the buffer by doubling when it is full"""
+        if self._vectors is None:
+            self._vectors = np.empty((16, vector.shape[0]), dtype=np.float32)
+        elif vector.shape[0] != self._vectors.shape[1]:
+            return
+        row = self._rows.get(key)
+        if row is None:
+            row = len(self._keys)
+            if row == len(self._vectors):
+                grown = np.empty((2 * row, self._vectors.shape[1]), dtype=np.float32)
+                grown[:row] = self._vectors
+                self._vectors = grown
+            self._rows[key] = row
+            self._keys.append(key)
+        self._vectors[row] = vector
+
+    def _remove(self, key: str):
+        """Drop key's in-memory vector; the last row moves into its place"""
+        row = self._rows.pop(key, None)
+        if row is None:
+            return
+        last = len(self._keys) - 1
+        if row != last:
+            moved = self._keys[last]
+            self._keys[row] = moved
+            self._rows[moved] = row
+            self._vectors[row] = self._vectors[last]
+        self._keys.pop()
+
+    def nearest(self, embedding, threshold: float) -> Optional[str]:
+        """Return the key of the most similar stored embedding if its cosine similarity clears threshold"""
+        self._sync()
+        vector = self._normalize(embedding)
+        with self._lock:
+            if not self._keys or vector.shape[0] != self._vectors.shape[1]:
+                return None
+
+            similarities = self._vectors[:len(self._keys)] @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] >= threshold:
+                logger.info(f"Semantic cache hit (similarity {similarities[best]:.3f})")
+                return self._keys[best]
+            return None
+
+    def similarity(self, key: str, embedding) -> Optional[float]:
+        """Cosine similarity between an embedding and the one stored under key, or None if key isn't indexed"""
+        if key not in self._rows:
+            self._sync()
+        vector = self._normalize(embedding)
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None or vector.shape[0] != self._vectors.shape[1]:
+                return None
+            return float(self._vectors[row] @ vector)
+
+    def add(self, key: str, embedding):
+        """Index an embedding under key, evicting the oldest entries beyond max_entries"""
+        vector = self._normalize(embedding)
+        if self._vectors is not None and vector.shape[0] != self._vectors.shape[1]:
+            return
+        evicted = []
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+
+                cursor.execute(f"SELECT 1 FROM {self.table} WHERE key = ?", (key,))
+                replaced = cursor.fetchone() is not None
+                cursor.execute(f"INSERT OR REPLACE INTO {self.table} (key, embedding, stored_at) VALUES (?, ?, ?)",
+                               (key, vector.tobytes(), time.time()))
+                if not replaced:
+                    cursor.execute(f"UPDATE {self.table}_count SET total_entries = total_entries + 1")
+
+                evicted = self._cull(cursor)
+                conn.commit()
+        except Exception as e:
+            logger.warning(f"Error storing embedding for {key}: {str(e)}")
+
+        with self._lock:
+            self._put(key, vector)
+            for evicted_key in evicted:
+                self._remove(evicted_key)
+
+    def discard(self, key: str):
+        """Remove key from the index, e.g. once the result it points to has expired"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                cursor.execute(f"UPDATE {self.table}_count SET total_entries = total_entries - ?", (cursor.rowcount,))
+                conn.commit()
+        except Exception as e:
+            logger.warning(f"Error removing embedding for {key}: {str(e)}")
+
+        with self._lock:
+            self._remove(key)
+
+    def _cull(self, cursor) -> List[str]:
+        """Once over max_entries, drop the oldest rows until back at it; returns the evicted keys"""
+        cursor.execute(f"SELECT total_entries FROM {self.table}_count")
+        total_entries = cursor.fetchone()[0]
+        if total_entries <= self.max_entries:
+            return []
+
+        cursor.execute(f"SELECT key FROM {self.table} ORDER BY stored_at LIMIT ?",
+                       (total_entries - self.max_entries,))
+        evicted = [row[0] for row in cursor.fetchall()]
+        cursor.executemany(f"DELETE FROM {self.table} WHERE key = ?", [(key,) for key in evicted])
+        cursor.execute(f"UPDATE {self.table}_count SET total_entries = total_entries - ?", (len(evicted),))
+        return evicted
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class LRUCache:
+    """Bounded in-memory dict that evicts the least recently used entry"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+    def get(self, key, default: Any = None) -> Any:
+        if key not in self._data:
+            return default
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def __getitem__(self, key) -> Any:
+        value = self._data[key]
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self):
+        self._data.clear()
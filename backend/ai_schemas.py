@@ -0,0 +1,188 @@
+"""JSON schemas for OpenAI structured outputs.
+
+The model is constrained server-side to these shapes, so prompts no longer need
+to carry an example JSON skeleton. Strict mode requires every property to be
+listed as required and additionalProperties to be false.
+"""
+from typing import Dict
+
+
+def _object(properties: Dict) -> Dict:
+    """Strict-mode object schema where every property is required"""
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties.keys()),
+        "additionalProperties": False
+    }
+
+
+def _array(items: Dict) -> Dict:
+    return {"type": "array", "items": items}
+
+
+STRING = {"type": "string"}
+NUMBER = {"type": "number"}
+INTEGER = {"type": "integer"}
+BOOLEAN = {"type": "boolean"}
+STRING_LIST = _array(STRING)
+
+SKILL_CATEGORIES = _object({
+    "programming_languages": STRING_LIST,
+    "frameworks_libraries": STRING_LIST,
+    "databases": STRING_LIST,
+    "cloud_platforms": STRING_LIST,
+    "tools_technologies": STRING_LIST,
+    "soft_skills": STRING_LIST
+})
+
+# Structured data extraction half of the resume analysis
+EXTRACTION_SCHEMA = _object({
+    "personal_info": _object({
+        "full_name": STRING,
+        "first_name": STRING,
+        "last_name": STRING
+    }),
+    "contact_info": _object({
+        "email": STRING,
+        "phone": STRING,
+        "linkedin": STRING,
+        "location": STRING
+    }),
+    "professional_summary": STRING,
+    "skills": SKILL_CATEGORIES,
+    "experience": _object({
+        "total_years": NUMBER,
+        "positions": _array(_object({
+            "title": STRING,
+            "company": STRING,
+            "duration": STRING,
+            "responsibilities": STRING_LIST,
+            "technologies_used": STRING_LIST
+        }))
+    }),
+    "education": _object({
+        "degrees": _array(_object({
+            "degree": STRING,
+            "field": STRING,
+            "institution": STRING,
+            "graduation_year": STRING,
+            "gpa": {"type": ["number", "null"]}
+        }))
+    }),
+    "certifications": STRING_LIST,
+    "projects": _array(_object({
+        "name": STRING,
+        "description": STRING,
+        "technologies": STRING_LIST
+    })),
+    "languages": STRING_LIST,
+    "achievements": STRING_LIST
+})
+
+# Judgement half: fraud detection, insights and interview questions
+ASSESSMENT_SCHEMA = _object({
+    "fraud_analysis": _object({
+        "authenticity_score": INTEGER,
+        "red_flags_count": INTEGER,
+        "fraud_indicators": _array(_object({
+            "type": STRING,
+            "severity": {"type": "string", "enum": ["low", "medium", "high"]},
+            "description": STRING
+        })),
+        "ats_gaming_detected": BOOLEAN,
+        "overall_assessment": STRING,
+        "recommendation": STRING
+    }),
+    "insights": _object({
+        "strengths": STRING_LIST,
+        "areas_for_improvement": STRING_LIST,
+        "market_positioning": STRING,
+        "salary_estimate": STRING,
+        "cultural_fit_indicators": STRING_LIST,
+        "overall_score": INTEGER
+    }),
+    "interview_questions": STRING_LIST
+})
+
+# Consolidated single-call analysis
+RESUME_SCHEMA = _object({**EXTRACTION_SCHEMA["properties"], **ASSESSMENT_SCHEMA["properties"]})
+
+RESUME_BATCH_SCHEMA = _object({
+    "analyses": _array(RESUME_SCHEMA)
+})
+
+JOB_REQ_SCHEMA = _object({
+    "required_skills": SKILL_CATEGORIES,
+    "experience_requirements": _object({
+        "minimum_years": NUMBER,
+        "preferred_years": NUMBER,
+        "level": STRING,
+        "specific_experience": STRING_LIST
+    }),
+    "education_requirements": _object({
+        "minimum_degree": STRING,
+        "preferred_degree": STRING,
+        "required_fields": STRING_LIST,
+        "certifications": STRING_LIST
+    }),
+    "job_analysis": _object({
+        "department": STRING,
+        "job_type": STRING,
+        "seniority_level": STRING,
+        "key_responsibilities": STRING_LIST,
+        "growth_opportunities": STRING_LIST
+    }),
+    "salary_insights": _object({
+        "estimated_range": STRING,
+        "factors_affecting_salary": STRING_LIST
+    })
+})
+
+CANDIDATE_MATCH_SCHEMA = _object({
+    "overall_compatibility_score": NUMBER,
+    "compatibility_breakdown": _object({
+        "skills_match": _object({
+            "score": NUMBER,
+            "matched_skills": STRING_LIST,
+            "missing_skills": STRING_LIST,
+            "bonus_skills": STRING_LIST
+        }),
+        "experience_match": _object({
+            "score": NUMBER,
+            "years_comparison": STRING,
+            "level_match": STRING,
+            "relevant_experience": STRING_LIST
+        }),
+        "education_match": _object({
+            "score": NUMBER,
+            "degree_compatibility": STRING,
+            "field_relevance": STRING
+        })
+    }),
+    "strengths_for_role": STRING_LIST,
+    "concerns_for_role": STRING_LIST,
+    "interview_focus_areas": STRING_LIST,
+    "recommendation": _object({
+        "decision": {"type": "string", "enum": ["excellent_fit", "good_fit", "potential_fit", "poor_fit"]},
+        "confidence": INTEGER,
+        "reasoning": STRING,
+        "next_steps": STRING
+    }),
+    "salary_fit": _object({
+        "candidate_level_estimate": STRING,
+        "market_rate_analysis": STRING
+    })
+})
+
+
+# JSON mode for free-form prompts: the model must return a single JSON object, never markdown or prose
+JSON_OBJECT_FORMAT = {"type": "json_object"}
+
+
+def json_schema_format(name: str, schema: Dict) -> Dict:
+    """Build the response_format argument for a strict structured-output request"""
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": name, "schema": schema, "strict": True}
+    }
@@ -10,7 +10,7 @@ from candidate_ranker import CandidateRanker
 from ai_analyzer import AIAnalyzer
 from database import Database
 import logging
-from typing import Dict
+from typing import Dict, List
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -110,6 +110,8 @@ def upload_resume():
             "analysis_method": "ai_enhanced_consolidated",  # Updated to reflect new method
             "token_optimization": "phase_1_2_applied"  # Track optimization
         }
+        # Normalize the chat/search summary once here instead of on every request
+        resume_data["summary"] = ai_analyzer.build_candidate_summary(resume_data)
         
         # Save to database
         db.save_resume(resume_data)
@@ -420,23 +422,19 @@ def generate_job_matches(job_id):
             db.save_job(job_data)
             logger.info(f"Generated and saved AI requirements for job {job_id}")
         
+        # ?batch=true scores the whole pool via the Batch API: submit it and let the client poll for the results
+        if request.args.get('batch', 'false').lower() == 'true':
+            batch_id = ai_analyzer.submit_bulk_job_matches_batch(candidates, job_requirements, metadata={"job_id": job_id})
+            return jsonify({
+                "job_id": job_id,
+                "batch_id": batch_id,
+                "status": "submitted",
+                "status_url": f"/api/jobs/{job_id}/matches/batch/{batch_id}"
+            }), 202
+        
         # Generate matches using AI
         matches = ai_analyzer.generate_bulk_job_matches(candidates, job_requirements)
-        
-        # Save matches to database
-        for match in matches:
-            match_data = {
-                "job_id": job_id,
-                "candidate_id": match["candidate_id"],
-                "compatibility_score": match["compatibility_score"],
-                "match_details": {
-                    "quick_assessment": match["quick_assessment"],
-                    "top_strengths": match["top_strengths"],
-                    "main_concerns": match["main_concerns"],
-                    "recommendation": match["recommendation"]
-                }
-            }
-            db.save_job_match(match_data)
+        _save_job_matches(job_id, matches)
         
         return jsonify({
             "job_id": job_id,
@@ -449,6 +447,51 @@ def generate_job_matches(job_id):
         logger.error(f"Error generating job matches: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/jobs/<job_id>/matches/batch/<batch_id>', methods=['GET'])
+def get_batch_job_matches(job_id, batch_id):
+    """Status of a Batch API job matching run; once it has ended, its matches are merged, saved and returned"""
+    try:
+        # Ownership is checked on the batch status alone, before any result file is downloaded
+        batch_job = ai_analyzer.retrieve_batch(batch_id)
+        if (batch_job.metadata or {}).get("job_id") != job_id:
+            return jsonify({"error": "Batch not found for this job"}), 404
+        
+        matches = ai_analyzer.collect_bulk_job_matches_batch(batch_job, db.get_resumes())
+        if matches is None:
+            return jsonify({"job_id": job_id, "batch_id": batch_id, "status": batch_job.status}), 202
+        
+        # Later polls return the same matches without writing them again
+        if db.claim_job_match_batch(batch_id, job_id):
+            _save_job_matches(job_id, matches)
+        return jsonify({
+            "job_id": job_id,
+            "batch_id": batch_id,
+            "status": batch_job.status,
+            "matches": matches,
+            "total_matches": len(matches)
+        })
+        
+    except Exception as e:
+        logger.error(f"Error retrieving batch job matches: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+def _save_job_matches(job_id: str, matches: List[Dict]):
+    """Save bulk job match results to the database"""
+    for match in matches:
+        match_data = {
+            "job_id": job_id,
+            "candidate_id": match["candidate_id"],
+            "compatibility_score": match["compatibility_score"],
+            "match_details": {
+                "quick_assessment": match["quick_assessment"],
+                "top_strengths": match["top_strengths"],
+                "main_concerns": match["main_concerns"],
+                "recommendation": match["recommendation"],
+                "scored_by": match.get("scored_by")
+            }
+        }
+        db.save_job_match(match_data)
+
 @app.route('/api/jobs/<job_id>/matches', methods=['GET'])
 def get_job_matches(job_id):
     """Get existing matches for a job"""
@@ -0,0 +1,88 @@
+import sys
+import numpy as np
+from typing import Callable, Dict, Iterable, List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def candidate_years(candidate: Dict) -> float:
+    """Total years of experience (AI total_years or traditional years_experience), 0.0 when missing or malformed"""
+    experience = (candidate.get("parsed_data") or {}).get("experience") or {}
+    years = experience.get("total_years")
+    if years is None:
+        years = experience.get("years_experience")
+    try:
+        return float(years or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+class CandidatePool:
+    """Columnar (struct-of-arrays) view of candidate scores for vectorized top-K selection"""
+
+    def __init__(self, candidates: List[Dict]):
+        self.candidates = candidates
+        count = len(candidates)
+        self.scores = np.zeros(count, dtype=np.float32)
+        self.skill_relevance = np.zeros(count, dtype=np.float32)
+        self.years = np.zeros(count, dtype=np.float32)
+        self._skill_flags = None
+        self._skill_ids = None
+        self._tech_skills = None
+
+        for row, candidate in enumerate(candidates):
+            try:
+                self.scores[row] = (candidate.get("ranking_score") or {}).get("total_score") or 0
+                self.skill_relevance[row] = candidate.get("skill_relevance_score") or 0
+                self.years[row] = candidate_years(candidate)
+            except (TypeError, ValueError) as e:
+                logger.warning(f"Skipping malformed scores for candidate {candidate.get('id')}: {str(e)}")
+
+    def top_k(self, k: int, score_weight: float = 0.7, skill_weight: float = 0.3) -> List[int]:
+        """Row indices of the k best candidates by blended score, best first"""
+        count = len(self.candidates)
+        if k <= 0 or count == 0:
+            return []
+
+        blended = score_weight * self.scores + skill_weight * self.skill_relevance
+        if k < count:
+            rows = np.argpartition(-blended, k - 1)[:k]
+        else:
+            rows = np.arange(count)
+        # Only the k selected rows are fully sorted; stable so ties keep input order
+        order = np.argsort(-blended[rows], kind="stable")
+        return rows[order].tolist()
+
+    def top_candidates(self, k: int, score_weight: float = 0.7, skill_weight: float = 0.3) -> List[Dict]:
+        """The k best candidate dicts by blended score, best first"""
+        return [self.candidates[row] for row in self.top_k(k, score_weight, skill_weight)]
+
+    def tech_skills(self) -> List[List[str]]:
+        """Per-candidate programming languages and frameworks (non-empty, interned strings), built on first use"""
+        if self._tech_skills is None:
+            self._tech_skills = []
+            for candidate in self.candidates:
+                skills = (candidate.get("parsed_data") or {}).get("skills")
+                row = []
+                if isinstance(skills, dict):
+                    for category in ("programming_languages", "frameworks_libraries"):
+                        category_skills = skills.get(category)
+                        if isinstance(category_skills, list):
+                            # Interned: the same few hundred names recur across every resume and get hashed per count
+                            row.extend(sys.intern(skill) for skill in category_skills if skill and isinstance(skill, str))
+                self._tech_skills.append(row)
+        return self._tech_skills
+
+    def skill_flags(self, skill_index: Callable[[Dict], Iterable[str]]) -> Tuple[np.ndarray, Dict[str, int]]:
+        """(candidates x distinct skills) boolean matrix and the skill -> column map, built on first use"""
+        if self._skill_flags is None:
+            indexes = [skill_index(candidate) for candidate in self.candidates]
+            self._skill_ids = {}
+            for skills in indexes:
+                for skill in skills:
+                    self._skill_ids.setdefault(skill, len(self._skill_ids))
+
+            self._skill_flags = np.zeros((len(self.candidates), len(self._skill_ids)), dtype=bool)
+            for row, skills in enumerate(indexes):
+                self._skill_flags[row, [self._skill_ids[skill] for skill in skills]] = True
+        return self._skill_flags, self._skill_ids
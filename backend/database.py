@@ -32,7 +32,8 @@ class Database:
                         analysis_method TEXT DEFAULT 'traditional',
                         tags TEXT DEFAULT '[]',
                         comments TEXT DEFAULT '[]',
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        summary TEXT
                     )
                 """)
                 
@@ -68,6 +69,16 @@ class Database:
                     )
                 """)
                 
+                # Batch API job matching runs whose results have been saved (each is persisted once)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS job_match_batches (
+                        batch_id TEXT PRIMARY KEY,
+                        job_id TEXT NOT NULL,
+                        saved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        FOREIGN KEY (job_id) REFERENCES jobs(id)
+                    )
+                """)
+                
                 # Create saved searches table
                 cursor.execute("""
                     CREATE TABLE IF NOT EXISTS saved_searches (
@@ -80,6 +91,16 @@ class Database:
                     )
                 """)
                 
+                # Candidate pool version, bumped by triggers on every resume write so cached search results
+                # in any worker process can tell the pool has changed
+                cursor.execute("CREATE TABLE IF NOT EXISTS pool_version (version INTEGER NOT NULL)")
+                cursor.execute("INSERT INTO pool_version (version) SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM pool_version)")
+                for event in ("INSERT", "UPDATE", "DELETE"):
+                    cursor.execute(f"""
+                        CREATE TRIGGER IF NOT EXISTS bump_pool_version_{event.lower()} AFTER {event} ON resumes
+                        BEGIN UPDATE pool_version SET version = version + 1; END
+                    """)
+                
                 # Create indexes for better performance
                 cursor.execute("CREATE INDEX IF NOT EXISTS idx_upload_date ON resumes(upload_date)")
                 cursor.execute("CREATE INDEX IF NOT EXISTS idx_filename ON resumes(filename)")
@@ -97,6 +118,25 @@ class Database:
                     else:
                         logger.warning(f"Error adding ai_requirements column: {str(e)}")
                 
+                # Migration: One match per job and candidate, so re-saving a match replaces it
+                # (older databases may hold duplicates; keep the latest row of each pair)
+                cursor.execute("""
+                    DELETE FROM job_matches WHERE id NOT IN (
+                        SELECT MAX(id) FROM job_matches GROUP BY job_id, candidate_id
+                    )
+                """)
+                cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_job_matches_job_candidate ON job_matches(job_id, candidate_id)")
+                
+                # Migration: Add summary column (normalized candidate summary written at ingest)
+                try:
+                    cursor.execute("ALTER TABLE resumes ADD COLUMN summary TEXT")
+                    logger.info("Added summary column to resumes table")
+                except sqlite3.OperationalError as e:
+                    if "duplicate column name" in str(e).lower():
+                        logger.info("summary column already exists")
+                    else:
+                        logger.warning(f"Error adding summary column: {str(e)}")
+                
                 conn.commit()
                 logger.info("Database initialized successfully")
                 
@@ -112,8 +152,8 @@ class Database:
                 
                 cursor.execute("""
                     INSERT OR REPLACE INTO resumes 
-                    (id, filename, upload_date, parsed_data, fraud_analysis, ranking_score, ai_insights, interview_questions, analysis_method)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    (id, filename, upload_date, parsed_data, fraud_analysis, ranking_score, ai_insights, interview_questions, analysis_method, summary)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """, (
                     resume_data["id"],
                     resume_data["filename"],
@@ -123,7 +163,8 @@ class Database:
                     json.dumps(resume_data["ranking_score"]),
                     json.dumps(resume_data.get("ai_insights", {})),
                     json.dumps(resume_data.get("interview_questions", [])),
-                    resume_data.get("analysis_method", "traditional")
+                    resume_data.get("analysis_method", "traditional"),
+                    json.dumps(resume_data["summary"]) if resume_data.get("summary") else None
                 ))
                 
                 conn.commit()
@@ -174,7 +215,8 @@ class Database:
                         "ai_insights": self._safe_json_loads(row[6], {}) if row[6] else {},
                         "interview_questions": self._safe_json_loads(row[7], []) if row[7] else [],
                         "analysis_method": row[8] if len(row) > 8 else "traditional",
-                        "created_at": row[9] if len(row) > 9 else row[6]
+                        "created_at": row[9] if len(row) > 9 else row[6],
+                        "summary": self._safe_json_loads(row[12], {}) if len(row) > 12 else {}
                     }
                     
                     # Apply additional filters
@@ -207,7 +249,8 @@ class Database:
                         "ai_insights": self._safe_json_loads(row[6], {}) if row[6] else {},
                         "interview_questions": self._safe_json_loads(row[7], []) if row[7] else [],
                         "analysis_method": row[8] if len(row) > 8 else "traditional",
-                        "created_at": row[9] if len(row) > 9 else row[6]
+                        "created_at": row[9] if len(row) > 9 else row[6],
+                        "summary": self._safe_json_loads(row[12], {}) if len(row) > 12 else {}
                     }
                 
                 return None
@@ -235,6 +278,15 @@ class Database:
             logger.error(f"Error deleting resume {resume_id}: {str(e)}")
             return False
     
+    def get_pool_version(self) -> Optional[int]:
+        """Counter that changes whenever any resume is added, updated or deleted"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                return conn.execute("SELECT version FROM pool_version").fetchone()[0]
+        except Exception as e:
+            logger.error(f"Error reading candidate pool version: {str(e)}")
+            return None
+    
     def get_statistics(self) -> Dict:
         """Get database statistics"""
         try:
@@ -553,6 +605,22 @@ class Database:
             logger.error(f"Error saving job match: {str(e)}")
             return False
     
+    def claim_job_match_batch(self, batch_id: str, job_id: str) -> bool:
+        """Record a Batch API run's matches as saved; False if it was already recorded (or on error)"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "INSERT OR IGNORE INTO job_match_batches (batch_id, job_id) VALUES (?, ?)",
+                    (batch_id, job_id)
+                )
+                conn.commit()
+                return cursor.rowcount == 1
+                
+        except Exception as e:
+            logger.error(f"Error recording job match batch {batch_id}: {str(e)}")
+            return False
+    
     def get_job_matches(self, job_id: str = None, candidate_id: str = None) -> List[Dict]:
         """Get job matches by job_id or candidate_id"""
         try:
@@ -708,7 +776,8 @@ class Database:
                         "analysis_method": row[8] if len(row) > 8 else "traditional",
                         "tags": self._safe_json_loads(row[9], []) if len(row) > 9 else [],
                         "comments": self._safe_json_loads(row[10], []) if len(row) > 10 else [],
-                        "created_at": row[11] if len(row) > 11 else row[2]
+                        "created_at": row[11] if len(row) > 11 else row[2],
+                        "summary": self._safe_json_loads(row[12], {}) if len(row) > 12 else {}
                     }
                     
                     # Apply post-processing filters on parsed data
@@ -0,0 +1,60 @@
+from typing import Dict, Iterable, Set
+
+_END = ""  # Node key marking a stored skill (never a real character)
+
+
+class SkillTrie:
+    """Character tries (forward and reversed) over skill names, for finding prefix/suffix-related skills"""
+
+    def __init__(self, skills: Iterable[str] = ()):
+        self._forward: Dict = {}
+        self._reverse: Dict = {}
+        self._by_length: Dict[int, Set[str]] = {}
+        for skill in skills:
+            self.insert(skill)
+
+    def insert(self, skill: str):
+        self._add(self._forward, skill, skill)
+        self._add(self._reverse, skill[::-1], skill)
+        self._by_length.setdefault(len(skill), set()).add(skill)
+
+    @staticmethod
+    def _add(root: Dict, key: str, skill: str):
+        node = root
+        for char in key:
+            node = node.setdefault(char, {})
+        node[_END] = skill
+
+    @staticmethod
+    def _related(root: Dict, key: str) -> Set[str]:
+        """Stored skills that key starts with, plus every stored skill that starts with key"""
+        found = set()
+        node = root
+        for char in key:
+            if _END in node:
+                found.add(node[_END])
+            node = node.get(char)
+            if node is None:
+                return found
+
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for char, child in node.items():
+                if char == _END:
+                    found.add(child)
+                else:
+                    stack.append(child)
+        return found
+
+    def related(self, skill: str, max_length_gap: int = 0) -> Set[str]:
+        """
+        Stored skills sharing a prefix or suffix relation with skill (either one starting or ending with the other),
+        plus, within max_length_gap characters of its length, skills that contain it or are contained in it
+        """
+        found = self._related(self._forward, skill) | self._related(self._reverse, skill[::-1])
+        for length in range(max(1, len(skill) - max_length_gap), len(skill) + max_length_gap + 1):
+            for other in self._by_length.get(length, ()):
+                if skill in other or other in skill:
+                    found.add(other)
+        return found
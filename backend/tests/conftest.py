@@ -0,0 +1,85 @@
+import hashlib
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENAI_KEY", "test-key")
+
+import ai_analyzer  # noqa: E402
+
+
+def completion(content: str, finish_reason: str = "stop"):
+    """Chat completion response object carrying content"""
+    message = types.SimpleNamespace(content=content)
+    return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message, finish_reason=finish_reason)])
+
+
+def stream_of(content: str, size: int = 16):
+    """Streamed chat completion chunks carrying content"""
+    parts = [content[i:i + size] for i in range(0, len(content), size)] or [""]
+    for index, part in enumerate(parts):
+        finish_reason = "stop" if index == len(parts) - 1 else None
+        delta = types.SimpleNamespace(content=part)
+        yield types.SimpleNamespace(choices=[types.SimpleNamespace(delta=delta, finish_reason=finish_reason)])
+
+
+class FakeCompletions:
+    """chat.completions stand-in: responder(request kwargs) -> content string"""
+
+    def __init__(self, responder):
+        self.responder = responder
+        self.calls = []
+
+    def create(self, stream: bool = False, **kwargs):
+        self.calls.append(kwargs)
+        content = self.responder(kwargs)
+        return stream_of(content) if stream else completion(content)
+
+
+class FakeAsyncCompletions(FakeCompletions):
+    async def create(self, stream: bool = False, **kwargs):
+        return FakeCompletions.create(self, **kwargs)
+
+
+class FakeEmbeddings:
+    """Deterministic bag-of-words embeddings: texts sharing most words are near-identical vectors"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, model, input):
+        self.calls += 1
+        texts = [input] if isinstance(input, str) else input
+        return types.SimpleNamespace(data=[types.SimpleNamespace(embedding=self._embed(text)) for text in texts])
+
+    @staticmethod
+    def _embed(text: str):
+        vector = [0.0] * 256
+        for word in set(text.lower().split()):
+            vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % 256] += 1.0
+        return vector
+
+
+def fake_client(responder):
+    """OpenAI client stand-in with chat completions and embeddings"""
+    return types.SimpleNamespace(
+        chat=types.SimpleNamespace(completions=FakeCompletions(responder)),
+        embeddings=FakeEmbeddings()
+    )
+
+
+def fake_async_client(responder):
+    """AsyncOpenAI client stand-in with chat completions"""
+    return types.SimpleNamespace(chat=types.SimpleNamespace(completions=FakeAsyncCompletions(responder)))
+
+
+@pytest.fixture
+def analyzer(tmp_path, monkeypatch):
+    """AIAnalyzer whose caches live in a throwaway SQLite file"""
+    monkeypatch.setenv("AI_CACHE_PATH", str(tmp_path / "ai_cache.db"))
+    instance = ai_analyzer.AIAnalyzer()
+    yield instance
+    instance.close()
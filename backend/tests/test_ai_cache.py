@@ -0,0 +1,138 @@
+import sqlite3
+import time
+
+import numpy as np
+
+from ai_cache import LRUCache, PersistentCache, SemanticCache
+
+
+def stored_size(cache: PersistentCache) -> int:
+    with sqlite3.connect(cache.db_path) as conn:
+        return conn.execute(f"SELECT total_size FROM {cache.table}_size").fetchone()[0]
+
+
+def actual_size(cache: PersistentCache) -> int:
+    with sqlite3.connect(cache.db_path) as conn:
+        return conn.execute(f"SELECT COALESCE(SUM(LENGTH(value)), 0) FROM {cache.table}").fetchone()[0]
+
+
+def test_persistent_cache_round_trip_and_expiry(tmp_path):
+    cache = PersistentCache(str(tmp_path / "cache.db"), "entries")
+
+    cache.set("kept", {"score": 1})
+    cache.set("expired", [1, 2], expire=-1)
+
+    assert cache.get("kept") == {"score": 1}
+    assert cache.get("expired", "missing") == "missing"
+    assert "kept" in cache and len(cache) == 1
+
+
+def test_persistent_cache_tracks_total_size_through_writes(tmp_path):
+    cache = PersistentCache(str(tmp_path / "cache.db"), "entries")
+
+    cache.set("a", "x" * 10)
+    cache.set("b", "y" * 20)
+    cache.set("a", "z" * 5)  # Replacing a key swaps its size
+    cache.set("gone", "w", expire=-1)
+    cache.get("gone")  # Expired on read
+
+    assert stored_size(cache) == actual_size(cache)
+    cache.clear()
+    assert stored_size(cache) == 0
+
+
+def test_persistent_cache_culls_oldest_entries_over_the_size_limit(tmp_path):
+    cache = PersistentCache(str(tmp_path / "cache.db"), "entries", size_limit=100)
+
+    for index in range(5):
+        cache.set(f"key{index}", "v" * 30)
+        time.sleep(0.001)
+
+    assert cache.get("key0") is None and cache.get("key1") is None
+    assert cache.get("key4") == "v" * 30
+    assert actual_size(cache) <= 100
+    assert stored_size(cache) == actual_size(cache)
+
+
+def test_persistent_cache_resyncs_size_on_startup(tmp_path):
+    path = str(tmp_path / "cache.db")
+    PersistentCache(path, "entries").set("a", "x" * 10)
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE entries_size SET total_size = 0")
+
+    assert stored_size(PersistentCache(path, "entries")) == actual_size(PersistentCache(path, "entries"))
+
+
+def test_semantic_cache_nearest_and_similarity(tmp_path):
+    path = str(tmp_path / "cache.db")
+    index = SemanticCache(path, "vectors")
+    index.add("x", [1.0, 0.0, 0.0])
+    index.add("y", [0.0, 1.0, 0.0])
+
+    assert index.nearest([0.9, 0.1, 0.0], threshold=0.9) == "x"
+    assert index.nearest([0.6, 0.6, 0.0], threshold=0.9) is None
+    assert np.isclose(index.similarity("y", [0.0, 2.0, 0.0]), 1.0)
+    assert index.similarity("missing", [1.0, 0.0, 0.0]) is None
+    # Vectors are persisted and reloaded
+    assert SemanticCache(path, "vectors").nearest([1.0, 0.0, 0.0], threshold=0.99) == "x"
+
+
+def test_semantic_cache_evicts_oldest_entries_over_the_row_cap(tmp_path):
+    path = str(tmp_path / "cache.db")
+    index = SemanticCache(path, "vectors", max_entries=3)
+    for position in range(5):
+        index.add(f"k{position}", np.eye(8)[position])
+        time.sleep(0.001)
+
+    assert len(index) == 3
+    assert index.similarity("k0", np.eye(8)[0]) is None and index.similarity("k1", np.eye(8)[1]) is None
+    assert index.nearest(np.eye(8)[4], threshold=0.99) == "k4"
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0] == 3
+        assert conn.execute("SELECT total_entries FROM vectors_count").fetchone()[0] == 3
+
+
+def test_semantic_cache_grows_past_its_initial_capacity(tmp_path):
+    index = SemanticCache(str(tmp_path / "cache.db"), "vectors")
+    vectors = np.random.default_rng(0).normal(size=(40, 16))
+    for position, vector in enumerate(vectors):
+        index.add(f"k{position}", vector)
+    index.add("k3", vectors[5])  # Replacing a key keeps one row for it
+
+    assert len(index) == 40
+    assert index.nearest(vectors[17], threshold=0.99) == "k17"
+    assert np.isclose(index.similarity("k3", vectors[5]), 1.0)
+
+
+def test_semantic_cache_discard_lets_the_next_neighbour_win(tmp_path):
+    path = str(tmp_path / "cache.db")
+    index = SemanticCache(path, "vectors")
+    index.add("dead", [1.0, 0.0, 0.0])
+    index.add("live", [0.95, 0.3, 0.0])
+
+    index.discard("dead")
+
+    assert index.nearest([1.0, 0.0, 0.0], threshold=0.9) == "live"
+    assert SemanticCache(path, "vectors").nearest([1.0, 0.0, 0.0], threshold=0.9) == "live"
+
+
+def test_semantic_cache_sees_vectors_added_by_another_worker(tmp_path):
+    path = str(tmp_path / "cache.db")
+    index = SemanticCache(path, "vectors")
+    index.add("mine", [1.0, 0.0, 0.0])
+
+    SemanticCache(path, "vectors").add("theirs", [0.0, 1.0, 0.0])
+
+    assert index.nearest([0.0, 1.0, 0.0], threshold=0.99) == "theirs"
+    assert np.isclose(index.similarity("theirs", [0.0, 1.0, 0.0]), 1.0)
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache["a"] = 1
+    cache["b"] = 2
+    cache.get("a")
+    cache["c"] = 3
+
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert len(cache) == 2
@@ -0,0 +1,35 @@
+from conftest import fake_client
+from ai_schemas import json_schema_format
+
+MESSAGES = [{"role": "user", "content": "Suggest a job title"}]
+
+
+def test_deterministic_chat_is_answered_from_cache(analyzer):
+    analyzer.client = fake_client(lambda request: "Backend Engineer")
+
+    for _ in range(2):
+        assert analyzer._cached_chat(model="gpt-4o-mini", messages=MESSAGES, temperature=0) == "Backend Engineer"
+
+    assert len(analyzer.client.chat.completions.calls) == 1
+
+
+def test_sampled_chat_always_reaches_the_api(analyzer):
+    analyzer.client = fake_client(lambda request: "Backend Engineer")
+
+    for _ in range(2):
+        analyzer._cached_chat(model="gpt-4o-mini", messages=MESSAGES, temperature=0.3)
+    analyzer._cached_chat(model="gpt-4o-mini", messages=MESSAGES)  # API default temperature
+
+    assert len(analyzer.client.chat.completions.calls) == 3
+
+
+def test_strict_schema_chat_is_cached_at_any_temperature(analyzer):
+    analyzer.client = fake_client(lambda request: '{"title": "Backend Engineer"}')
+    schema = {"type": "object", "properties": {"title": {"type": "string"}},
+              "required": ["title"], "additionalProperties": False}
+
+    for _ in range(2):
+        analyzer._cached_chat(model="gpt-4o-mini", messages=MESSAGES, temperature=0.3,
+                              response_format=json_schema_format("title", schema))
+
+    assert len(analyzer.client.chat.completions.calls) == 1
@@ -0,0 +1,15 @@
+import pytest
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Jane Doe\njane@example.com", "Jane Doe"),
+    ("Éva Kovács\neva@example.com", "Éva Kovács"),
+    ("Curriculum vitae\n  Łukasz Nowak\nWarsaw", "Łukasz Nowak"),
+    ("resume\nJohn smith\nJane Doe", "Jane Doe"),
+    ("one\ntwo\nthree\nfour\nfive\nJane Doe", ""),
+])
+def test_fallback_name_is_first_line_with_two_capitalized_words(analyzer, text, expected):
+    personal_info = analyzer._fallback_analysis(text)["parsed_data"]["personal_info"]
+
+    assert personal_info["full_name"] == expected
+    assert personal_info["last_name"] == (expected.split()[-1] if expected else "")
@@ -0,0 +1,128 @@
+import json
+import types
+
+from conftest import fake_async_client, fake_client
+import ai_analyzer
+
+JOB = {
+    "required_skills": {"programming_languages": ["Python"], "frameworks_libraries": ["Django"], "databases": ["PostgreSQL"]},
+    "experience_requirements": {"minimum_years": 4}
+}
+EXTRA_SKILLS = ["Java", "Rust", "React", "Node.js", "Docker", "Kubernetes", "AWS", "Redis", "MongoDB",
+                "TypeScript", "JavaScript", "Flask", "Ruby", "Swift"]
+
+
+def candidate(candidate_id: str, languages, total_years=5):
+    return {
+        "id": candidate_id,
+        "parsed_data": {
+            "personal_info": {"full_name": candidate_id},
+            "skills": {"programming_languages": languages},
+            "experience": {"total_years": total_years}
+        },
+        "ranking_score": {"total_score": 60}
+    }
+
+
+def test_skill_coverage_ignores_extra_candidate_skills(analyzer):
+    job_skills = analyzer._skill_vector(JOB["required_skills"])
+    broad = analyzer._skill_vector({"all": ["Python", "Django", "PostgreSQL"] + EXTRA_SKILLS})
+    partial = analyzer._skill_vector({"all": ["Python"]})
+
+    assert analyzer._skill_coverage(broad, job_skills) == 100
+    assert round(analyzer._skill_coverage(partial, job_skills)) == 33
+    assert analyzer._skill_coverage(broad, analyzer._skill_vector({})) is None
+
+
+def test_broad_candidate_with_every_required_skill_is_scored_by_the_model(analyzer):
+    strong = candidate("strong", ["Python", "Django", "PostgreSQL"] + EXTRA_SKILLS)
+    weak = candidate("weak", ["Ruby"])
+
+    def score(request):
+        summary = json.loads(request["messages"][1]["content"].split("Candidates: ")[1])[0]
+        return json.dumps({"m": [{"i": summary["i"], "n": summary["n"], "c": 85, "a": "ok",
+                                  "st": [], "mc": [], "rec": "good_fit"}]})
+
+    client = fake_async_client(score)
+    analyzer._get_async_client = lambda: client
+
+    matches = analyzer._run_async(analyzer.generate_bulk_job_matches_async([strong, weak], JOB))
+
+    by_id = {match["candidate_id"]: match for match in matches}
+    assert len(client.chat.completions.calls) == 1
+    assert by_id["strong"]["recommendation"] != "poor_fit"
+    assert by_id["weak"]["recommendation"] == "poor_fit"
+
+
+def test_model_scored_matches_rank_ahead_of_similarity_scores(analyzer):
+    pool = [candidate(f"c{index}", ["Python", "Django", "PostgreSQL"] + EXTRA_SKILLS[:index]) for index in range(7)]
+
+    def low_score(request):
+        summary = json.loads(request["messages"][1]["content"].split("Candidates: ")[1])[0]
+        return json.dumps({"m": [{"i": summary["i"], "n": summary["n"], "c": 35, "a": "ok",
+                                  "st": [], "mc": [], "rec": "potential_fit"}]})
+
+    analyzer.client = fake_client(low_score)
+    analyzer._get_async_client = lambda: fake_async_client(low_score)
+
+    matches = analyzer._run_async(analyzer.generate_bulk_job_matches_async(pool, JOB))
+
+    scorers = [match["scored_by"] for match in matches]
+    assert scorers == ["llm"] * ai_analyzer.BULK_MATCH_LLM_TOP_K + ["embedding"] * 2
+    assert all(match["compatibility_score"] > 35 for match in matches[-2:])
+
+
+def batch_line(custom_id: str, content=None, status_code: int = 200) -> str:
+    body = {"choices": [{"message": {"content": content}}]} if content is not None else {"error": "server_error"}
+    return json.dumps({"custom_id": custom_id, "response": {"status_code": status_code, "body": body}})
+
+
+def test_collected_batch_merges_model_matches_and_falls_back_for_failed_shards(analyzer):
+    pool = [candidate(f"c{index}", ["Python"]) for index in range(3)]
+    output = "\n".join([
+        batch_line("shard-0", json.dumps({"m": [
+            {"i": "c0", "n": "c0", "c": 55, "a": "ok", "st": [], "mc": [], "rec": "potential_fit"},
+            {"i": "c1", "n": "c1", "c": 80, "a": "strong", "st": ["Python"], "mc": [], "rec": "good_fit"}
+        ]})),
+        batch_line("shard-1", status_code=500),
+        "",
+        json.dumps({"custom_id": "shard-2", "response": {"status_code": 200, "body": {"choices": []}}})
+    ])
+    batch = types.SimpleNamespace(id="batch_1", status="completed", output_file_id="file_1", metadata={})
+    analyzer.client = types.SimpleNamespace(
+        batches=types.SimpleNamespace(retrieve=lambda batch_id: batch),
+        files=types.SimpleNamespace(content=lambda file_id: types.SimpleNamespace(text=output))
+    )
+
+    assert analyzer._chat_batch_contents(batch).keys() == {"shard-0"}
+    matches = analyzer.collect_bulk_job_matches_batch(analyzer.retrieve_batch("batch_1"), pool)
+
+    assert [(match["candidate_id"], match["scored_by"]) for match in matches] == [
+        ("c1", "llm"), ("c0", "llm"), ("c2", "rules")
+    ]
+    assert matches[0]["top_strengths"] == ["Python"]
+
+
+def test_running_batch_has_no_matches_yet(analyzer):
+    batch = types.SimpleNamespace(id="batch_1", status="in_progress", output_file_id=None, metadata={})
+    analyzer.client = types.SimpleNamespace(batches=types.SimpleNamespace(retrieve=lambda batch_id: batch))
+
+    assert analyzer.collect_bulk_job_matches_batch(batch, [candidate("c0", ["Python"])]) is None
+
+
+def test_fallback_candidate_match_accepts_years_stored_as_strings(analyzer):
+    match = analyzer._fallback_candidate_match(
+        candidate("c1", ["Python", "Django"], total_years="2"),
+        {**JOB, "experience_requirements": {"minimum_years": "4"}}
+    )
+
+    breakdown = match["compatibility_breakdown"]
+    assert breakdown["experience_match"]["score"] == 50
+    assert breakdown["experience_match"]["years_comparison"] == "2 years vs 4 required"
+    assert breakdown["skills_match"]["score"] == 67
+    assert breakdown["skills_match"]["missing_skills"] == ["postgresql"]
+
+
+def test_candidate_years_reads_strings_and_rejects_garbage():
+    assert ai_analyzer.candidate_years({"parsed_data": {"experience": {"total_years": "5"}}}) == 5.0
+    assert ai_analyzer.candidate_years({"parsed_data": {"experience": {"total_years": "five"}}}) == 0.0
@@ -0,0 +1,55 @@
+import json
+import re
+
+from conftest import fake_client
+
+
+def interpretation_for(request) -> str:
+    """Model answer whose filters echo the years and skill named in the query"""
+    prompt = request["messages"][1]["content"]
+    years = re.search(r"(\d+) years", prompt)
+    skill = "React" if "react" in prompt.lower() else "Python"
+    return json.dumps({
+        "extracted_filters": {"min_experience": int(years.group(1)) if years else 0, "skills": [skill]},
+        "confidence": 0.9
+    })
+
+
+def test_paraphrased_search_query_reuses_the_interpretation(analyzer):
+    analyzer.client = fake_client(interpretation_for)
+    analyzer.analyze_search_query("senior python developers with 5 years of experience")
+
+    result = analyzer.analyze_search_query("senior python developers with 5 years experience")
+
+    assert len(analyzer.client.chat.completions.calls) == 1
+    assert result["extracted_filters"]["min_experience"] == 5
+
+
+def test_similar_query_with_other_numbers_or_skills_is_interpreted_fresh(analyzer):
+    analyzer.client = fake_client(interpretation_for)
+    analyzer._query_semantic_threshold = 0.5  # Near neighbours in embedding space
+    analyzer.analyze_search_query("senior python developers with 5 years of experience")
+
+    other_years = analyzer.analyze_search_query("senior python developers with 10 years of experience")
+    other_skill = analyzer.analyze_search_query("senior react developers with 5 years of experience")
+
+    assert len(analyzer.client.chat.completions.calls) == 3
+    assert other_years["extracted_filters"]["min_experience"] == 10
+    assert other_skill["extracted_filters"]["skills"] == ["React"]
+
+
+def test_expired_neighbour_is_dropped_so_a_live_one_answers(analyzer):
+    analyzer.client = fake_client(interpretation_for)
+    analyzer._query_semantic_threshold = 0.99
+    analyzer.analyze_search_query("senior python developers with 5 years of experience")
+    analyzer.analyze_search_query("python engineers with 5 years of experience in product teams")
+    analyzer._query_semantic_threshold = 0.5
+    index = analyzer._query_indexes["search_query"]
+    dead_key = index.nearest(analyzer._embed_text("senior python developers with 5 years of experience"), 0.99)
+    analyzer._query_results.set(dead_key, {"expired": True}, expire=-1)
+
+    result = analyzer.analyze_search_query("senior python developers with 5 years experience")
+
+    assert len(analyzer.client.chat.completions.calls) == 2
+    assert result["extracted_filters"]["min_experience"] == 5
+    assert index.similarity(dead_key, analyzer._embed_text("anything")) is None
@@ -0,0 +1,68 @@
+import json
+import re
+
+from conftest import fake_client
+
+TEMPLATE_BODY = " ".join(f"word{index}" for index in range(300))
+
+
+def resume(name: str, email: str, phone: str) -> str:
+    return f"{name}\n{email}\n{phone}\nSenior Python developer.\n{TEMPLATE_BODY}"
+
+
+def analysis_for(request) -> str:
+    """Model answer that echoes the name and email found in the prompt"""
+    prompt = request["messages"][1]["content"]
+    text = prompt.split("Resume text:\n", 1)[1]
+    name = text.splitlines()[0]
+    email = re.search(r"\S+@\S+", text).group(0)
+    return json.dumps({
+        "personal_info": {"full_name": name, "first_name": name.split()[0], "last_name": name.split()[-1]},
+        "contact_info": {"email": email, "phone": "", "linkedin": "", "location": ""},
+        "skills": {"programming_languages": ["Python"]},
+        "experience": {"total_years": 5, "positions": []},
+        "fraud_analysis": {"authenticity_score": 90},
+        "insights": {},
+        "interview_questions": []
+    })
+
+
+def test_reupload_of_same_candidate_reuses_analysis_with_new_contact_details(analyzer):
+    analyzer.client = fake_client(analysis_for)
+    analyzer.analyze_resume_comprehensive(resume("Jane Doe", "jane@example.com", "555-111-2222"))
+
+    result = analyzer.analyze_resume_comprehensive(resume("Jane Doe", "jane@example.com", "555-999-8888"))
+
+    assert len(analyzer.client.chat.completions.calls) == 1
+    assert result["parsed_data"]["personal_info"]["full_name"] == "Jane Doe"
+    assert result["parsed_data"]["contact_info"]["phone"] == "555-999-8888"
+
+
+def test_same_template_for_another_candidate_is_analyzed_fresh(analyzer):
+    analyzer.client = fake_client(analysis_for)
+    analyzer.analyze_resume_comprehensive(resume("Jane Doe", "jane@example.com", "555-111-2222"))
+
+    result = analyzer.analyze_resume_comprehensive(resume("John Roe", "john@example.com", "555-111-2222"))
+
+    assert len(analyzer.client.chat.completions.calls) == 2
+    assert result["parsed_data"]["personal_info"]["full_name"] == "John Roe"
+    assert result["parsed_data"]["contact_info"]["email"] == "john@example.com"
+
+
+def test_same_email_with_another_name_is_analyzed_fresh(analyzer):
+    analyzer.client = fake_client(analysis_for)
+    analyzer.analyze_resume_comprehensive(resume("Jane Doe", "shared@example.com", "555-111-2222"))
+
+    result = analyzer.analyze_resume_comprehensive(resume("John Roe", "shared@example.com", "555-111-2222"))
+
+    assert len(analyzer.client.chat.completions.calls) == 2
+    assert result["parsed_data"]["personal_info"]["full_name"] == "John Roe"
+
+
+def test_first_upload_skips_the_embedding_lookup(analyzer):
+    analyzer.client = fake_client(analysis_for)
+
+    analyzer.analyze_resume_comprehensive(resume("Jane Doe", "jane@example.com", "555-111-2222"))
+
+    # Only the embedding stored for later re-uploads; nothing earlier to compare against
+    assert analyzer.client.embeddings.calls == 1
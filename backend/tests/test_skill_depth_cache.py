@@ -0,0 +1,27 @@
+import json
+
+from conftest import fake_client
+from test_skill_ranking import candidate
+
+
+def test_similar_prompt_for_another_skill_is_analyzed_fresh(analyzer):
+    analyzer.client = fake_client(lambda request: json.dumps({"skill_depth": 70}))
+    analyzer._skill_semantic_threshold = 0.5  # Near neighbours in embedding space
+    frontend = candidate("frontend", languages=["JavaScript"], frameworks=["React", "Vue"], total_years=5)
+
+    analyzer._calculate_ai_enhanced_skill_score(frontend, "React")
+    analyzer._calculate_ai_enhanced_skill_score(frontend, "Vue")
+
+    assert len(analyzer.client.chat.completions.calls) == 2
+
+
+def test_same_skill_for_a_candidate_with_the_same_skills_reuses_the_analysis(analyzer):
+    analyzer.client = fake_client(lambda request: json.dumps({"skill_depth": 70}))
+    first = candidate("first", languages=["JavaScript"], frameworks=["React"], total_years=5)
+    second = candidate("second", languages=["JavaScript"], frameworks=["React"], total_years=6)
+
+    analyzer._calculate_ai_enhanced_skill_score(first, "React")
+    analysis = analyzer._calculate_ai_enhanced_skill_score(second, "react")
+
+    assert len(analyzer.client.chat.completions.calls) == 1
+    assert analysis == {"skill_depth": 70}
@@ -0,0 +1,69 @@
+import pytest
+
+
+def candidate(candidate_id: str, languages=(), frameworks=(), databases=(), tools=(), total_years=3):
+    return {
+        "id": candidate_id,
+        "parsed_data": {
+            "personal_info": {"full_name": candidate_id},
+            "skills": {
+                "programming_languages": list(languages),
+                "frameworks_libraries": list(frameworks),
+                "databases": list(databases),
+                "tools_technologies": list(tools)
+            },
+            "experience": {"total_years": total_years}
+        },
+        "ranking_score": {"total_score": 50}
+    }
+
+
+POOL = [
+    candidate("java-dev", languages=["Java"]),
+    candidate("go-dev", languages=["Go"]),
+    candidate("react-dev", languages=["JavaScript"], frameworks=["React"]),
+    candidate("node-dev", languages=["JavaScript"], frameworks=["Node.js"]),
+    candidate("postgres-dev", databases=["PostgreSQL"]),
+    candidate("k8s-dev", tools=["Kubernetes"]),
+]
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("golang", "go-dev"),
+    ("reactjs", "react-dev"),
+    ("react.js", "react-dev"),
+    ("nodejs", "node-dev"),
+    ("node", "node-dev"),
+    ("postgres", "postgres-dev"),
+    ("k8s", "k8s-dev"),
+])
+def test_query_skill_aliases_select_matching_candidates(analyzer, query, expected):
+    candidates = [dict(entry) for entry in POOL]
+
+    ranked = analyzer._intelligent_skill_ranking(candidates, query, {})
+
+    assert [entry["id"] for entry in ranked] == [expected]
+    assert ranked[0]["skill_relevance_score"] > 20
+
+
+def test_query_without_known_skills_keeps_input_order(analyzer):
+    candidates = [dict(entry) for entry in POOL]
+
+    ranked = analyzer._intelligent_skill_ranking(candidates, "someone friendly", {})
+
+    assert [entry["id"] for entry in ranked] == [entry["id"] for entry in POOL]
+
+
+def test_candidates_are_ranked_by_depth_in_the_queried_skills(analyzer):
+    candidates = [
+        candidate("junior", languages=["Python"], total_years=1),
+        candidate("senior", languages=["Python"], frameworks=["Django"], tools=["Docker"], total_years=9),
+        candidate("mid", languages=["Python"], total_years=4),
+        candidate("java", languages=["Java"], total_years=10),
+    ]
+
+    ranked = analyzer._intelligent_skill_ranking(candidates, "senior python developer", {})
+
+    assert [entry["id"] for entry in ranked] == ["senior", "mid", "junior", "java"]
+    scores = [entry["skill_relevance_score"] for entry in ranked]
+    assert scores == sorted(scores, reverse=True) and len(set(scores)) == len(scores)
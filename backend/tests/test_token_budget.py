@@ -0,0 +1,38 @@
+import types
+
+import ai_analyzer
+
+# Stand-in tokenizer: one token per whitespace-separated word
+WORD_ENCODING = types.SimpleNamespace(encode=str.split, decode=" ".join)
+
+
+def test_truncate_to_tokens_keeps_short_text_whole(analyzer, monkeypatch):
+    monkeypatch.setattr(ai_analyzer, "_token_encoding", lambda: WORD_ENCODING)
+
+    assert analyzer._truncate_to_tokens("three short words", 3) == "three short words"
+
+
+def test_truncate_to_tokens_cuts_at_the_token_limit(analyzer, monkeypatch):
+    monkeypatch.setattr(ai_analyzer, "_token_encoding", lambda: WORD_ENCODING)
+
+    assert analyzer._truncate_to_tokens("one two three four five", 2) == "one two"
+
+
+def test_truncate_to_tokens_estimates_four_characters_per_token_without_tiktoken(analyzer, monkeypatch):
+    monkeypatch.setattr(ai_analyzer, "_token_encoding", lambda: None)
+
+    assert analyzer._truncate_to_tokens("x" * 100, 10) == "x" * 40
+    assert analyzer._count_tokens("x" * 100) == 25
+
+
+def test_tokenizer_that_fails_to_load_falls_back_to_the_estimate(analyzer, monkeypatch):
+    def offline(model):
+        raise ConnectionError("BPE download failed")
+
+    monkeypatch.setattr(ai_analyzer, "tiktoken", types.SimpleNamespace(encoding_for_model=offline))
+    ai_analyzer._token_encoding.cache_clear()
+    try:
+        assert analyzer._count_tokens("x" * 100) == 25
+        assert analyzer._truncate_to_tokens("x" * 100, 10) == "x" * 40
+    finally:
+        ai_analyzer._token_encoding.cache_clear()